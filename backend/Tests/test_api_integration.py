@@ -1,18 +1,37 @@
 import pytest
 import os
+import asyncio
+import json
 
 # Set testing environment BEFORE any other imports
 os.environ["TESTING"] = "true"
+# Cheap bcrypt cost factor keeps the suite fast (production default is 12)
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
 
+from contextlib import contextmanager
 from fastapi.testclient import TestClient
 from main import app
-from db.database import Base, engine
+from db.database import Base, engine, async_engine, AsyncSessionLocal
+from sqlalchemy import event
 from sqlalchemy.orm import sessionmaker
-from services.auth_service import create_user, create_access_token
+from services.auth_service import create_user, create_access_token, clear_auth_caches, clear_login_throttle
+from db.migrate import run_migrations
+
+# Create the schema, as the deploy step does (the app checks it again when a TestClient starts)
+run_migrations()
 
 # Create a test database session
 SessionTesting = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async def create_test_user():
+    async with AsyncSessionLocal() as db:
+        return await create_user(
+            email="test@example.com",
+            password="testpassword",
+            full_name="Test User",
+            db=db
+        )
+
 @pytest.fixture(scope="function")
 def auth_headers():
     """Create a test user and return authentication headers"""
@@ -26,12 +45,7 @@ def auth_headers():
         
         if not test_user:
             # Create test user if it doesn't exist
-            test_user = create_user(
-                email="test@example.com",
-                password="testpassword",
-                full_name="Test User",
-                db=db
-            )
+            test_user = asyncio.run(create_test_user())
         
         # Create access token
         access_token = create_access_token(data={"sub": str(test_user.id)})
@@ -45,9 +59,39 @@ def setup_database():
     Base.metadata.create_all(bind=engine)
     yield
     Base.metadata.drop_all(bind=engine)
+    # User IDs are reused by the next test, so forget cached users
+    clear_auth_caches()
+    clear_login_throttle()
     # Close all connections to prevent hanging
     engine.dispose()
 
+@pytest.fixture(scope="function")
+def fake_redis(monkeypatch):
+    """Serve the Redis cache from an in-memory fake server for one test"""
+    import fakeredis
+    import utils.redis_cache as redis_cache
+    from utils.circuit_breaker import CircuitBreaker
+    server = fakeredis.FakeServer()
+    client = fakeredis.FakeRedis(server=server, decode_responses=True)
+    monkeypatch.setattr(redis_cache, "r", client)
+    monkeypatch.setattr(redis_cache, "r_binary", fakeredis.FakeRedis(server=server))
+    monkeypatch.setattr(redis_cache, "breaker", CircuitBreaker(failure_threshold=3, reset_timeout=60))
+    return client
+
+@contextmanager
+def count_queries(bind):
+    """Collect every SQL statement emitted on the given engine while the block runs"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(bind, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(bind, "before_cursor_execute", before_cursor_execute)
+
 # Test to check if auth_headers fixture works
 def test_auth_headers_fixture(auth_headers):
     assert "Authorization" in auth_headers
@@ -163,6 +207,62 @@ def test_add_task_to_nonexistent_elderly(setup_database, auth_headers):
         assert response.status_code == 404
         assert response.json()["detail"] == "Elderly not found"
 
+### Bulk Create Tests ###
+def test_add_elderly_bulk(setup_database, auth_headers, fake_redis):
+    with TestClient(app) as client:
+        client.post("/elderly/", json={"custom_id": 1, "name": "Alice"}, headers=auth_headers)
+        assert len(client.get("/elderly/", headers=auth_headers).json()) == 1  # Cached
+
+        batch = [{"custom_id": i, "name": f"Elderly {i}"} for i in range(2, 52)]
+        with count_queries(async_engine.sync_engine) as statements:
+            response = client.post("/elderly/bulk", json=batch, headers=auth_headers)
+        assert response.status_code == 200
+        created = response.json()
+        assert [e["custom_id"] for e in created] == list(range(2, 52))
+        assert len({e["id"] for e in created}) == 50
+        assert len([s for s in statements if s.startswith("INSERT")]) == 1
+
+        # Caches were invalidated once for the whole batch
+        assert len(client.get("/elderly/", headers=auth_headers).json()) == 51
+        assert client.get(f"/elderly/{created[-1]['id']}", headers=auth_headers).json()["name"] == "Elderly 51"
+
+        # Conflicts reject the whole batch
+        response = client.post("/elderly/bulk", json=[{"custom_id": 100, "name": "New"}, {"custom_id": 1, "name": "Dup"}], headers=auth_headers)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Elderly with these IDs already exist for this user: 1"
+        response = client.post("/elderly/bulk", json=[{"custom_id": 100, "name": "A"}, {"custom_id": 100, "name": "B"}], headers=auth_headers)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Duplicate elderly IDs in the request: 100"
+        assert client.post("/elderly/bulk", json=[], headers=auth_headers).status_code == 422
+        assert client.post("/elderly/bulk", json=[{"custom_id": 100}], headers=auth_headers).status_code == 422
+        assert len(client.get("/elderly/", headers=auth_headers).json()) == 51
+
+def test_add_tasks_and_medications_bulk(setup_database, auth_headers, fake_redis):
+    with TestClient(app) as client:
+        elderly = client.post("/elderly/", json={"custom_id": 1, "name": "Alice"}, headers=auth_headers).json()
+        assert client.get(f"/elderly/{elderly['id']}", headers=auth_headers).json()["tasks"] == []  # Cached
+
+        response = client.post(f"/elderly/{elderly['id']}/tasks/bulk", json=[
+            {"description": "Walk"}, {"description": "Lunch", "status": "done"}
+        ], headers=auth_headers)
+        assert response.status_code == 200
+        assert [(t["description"], t["status"]) for t in response.json()] == [("Walk", "pending"), ("Lunch", "done")]
+
+        response = client.post(f"/elderly/{elderly['id']}/medications/bulk", json=[
+            {"name": "Aspirin", "dosage": "100mg", "frequency": "Daily"},
+            {"name": "Vitamin D", "dosage": "1000IU", "frequency": "Daily"},
+        ], headers=auth_headers)
+        assert response.status_code == 200
+        assert [m["name"] for m in response.json()] == ["Aspirin", "Vitamin D"]
+
+        details = client.get(f"/elderly/{elderly['id']}", headers=auth_headers).json()
+        assert [t["id"] for t in details["tasks"]] == [t["id"] for t in client.get("/elderly/", headers=auth_headers).json()[0]["tasks"]]
+        assert len(details["tasks"]) == 2 and len(details["medications"]) == 2
+
+        assert client.post("/elderly/99/tasks/bulk", json=[{"description": "Walk"}], headers=auth_headers).status_code == 404
+        response = client.post(f"/elderly/{elderly['id']}/medications/bulk", json=[{"name": "", "dosage": "1", "frequency": "1"}], headers=auth_headers)
+        assert response.status_code == 422
+
 ### Medication Tests ###
 
 def test_add_medication_to_elderly_success(setup_database, auth_headers):
@@ -382,4 +482,1128 @@ def test_get_all_assignments_success(setup_database, auth_headers):
         assert len(assignments) == 1
         assert assignments[0]["caregiver_id"] == caregiver_id
         assert assignments[0]["elderly_id"] == elderly_id
-     
+
+### Query Count Tests ###
+def seed_elderly_tree(db, user_id, count):
+    """Create `count` elderly persons, each with tasks, medications and an assignment"""
+    from models.caregiver import Caregiver
+    from models.elderly import Elderly
+    from models.task import Task
+    from models.medication import Medication
+    from models.caregiver_assignments import CaregiverAssignment
+
+    caregiver = Caregiver(custom_id=1, name="John Doe", bank_name="Bank A",
+                          bank_account="12345", branch_number="001", user_id=user_id)
+    db.add(caregiver)
+    for i in range(count):
+        elderly = Elderly(custom_id=i + 1, name=f"Elderly {i}", user_id=user_id)
+        elderly.tasks = [Task(description="Take medicine"), Task(description="Walk")]
+        elderly.medications = [Medication(name="Aspirin", dosage="500mg", frequency="Once a day")]
+        db.add(elderly)
+        db.add(CaregiverAssignment(caregiver=caregiver, elderly=elderly, user_id=user_id))
+    db.commit()
+
+@pytest.mark.asyncio
+async def test_get_all_elderly_query_count_is_constant(setup_database):
+    from services.elderly_service import get_all_elderly_service
+
+    query_counts = []
+    for user_id, count in ((1, 2), (2, 20)):
+        db = SessionTesting()
+        try:
+            seed_elderly_tree(db, user_id, count)
+        finally:
+            db.close()
+        async with AsyncSessionLocal() as async_db:
+            with count_queries(async_engine.sync_engine) as statements:
+                result = await get_all_elderly_service(user_id, async_db)
+        assert len(result) == count
+        assert all(len(e.tasks) == 2 and len(e.medications) == 1 and len(e.assignments) == 1 for e in result)
+        query_counts.append(len(statements))
+
+    # One query for the elderly rows plus one per nested relationship
+    assert query_counts == [4, 4]
+
+@pytest.mark.asyncio
+async def test_get_elderly_by_id_query_count(setup_database):
+    from models.elderly import Elderly
+    from services.elderly_service import get_elderly_by_id_service
+
+    db = SessionTesting()
+    try:
+        seed_elderly_tree(db, 1, 1)
+        elderly_id = db.query(Elderly.id).scalar()
+    finally:
+        db.close()
+    async with AsyncSessionLocal() as async_db:
+        with count_queries(async_engine.sync_engine) as statements:
+            result = await get_elderly_by_id_service(elderly_id, 1, async_db)
+    assert len(result.tasks) == 2
+    assert len(statements) == 4
+
+@pytest.mark.asyncio
+async def test_get_all_caregivers_query_count_is_constant(setup_database):
+    from services.caregiver_service import get_all_caregivers_service
+
+    query_counts = []
+    for user_id, count in ((1, 2), (2, 20)):
+        db = SessionTesting()
+        try:
+            seed_elderly_tree(db, user_id, count)
+        finally:
+            db.close()
+        async with AsyncSessionLocal() as async_db:
+            with count_queries(async_engine.sync_engine) as statements:
+                result = await get_all_caregivers_service(user_id, async_db)
+        assert len(result) == 1
+        assert len(result[0].assignments) == count
+        query_counts.append(len(statements))
+
+    # One query for the caregiver rows plus one for all their assignments
+    assert query_counts == [2, 2]
+
+def test_get_caregivers_without_assignments(setup_database, auth_headers):
+    with TestClient(app) as client:
+        client.post("/caregivers/", json={
+            "custom_id": 1,
+            "name": "John Doe",
+            "bank_name": "Bank A",
+            "bank_account": "12345",
+            "branch_number": "001"
+        }, headers=auth_headers)
+
+        response = client.get("/caregivers/", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json()[0]["assignments"] == []
+
+        response = client.get("/caregivers/?include=", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json()[0]["name"] == "John Doe"
+        assert "assignments" not in response.json()[0]
+
+        response = client.get("/caregivers/?include=tasks", headers=auth_headers)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Unknown include: tasks"
+
+### Migration Tests ###
+def test_migrations_match_models():
+    from alembic import command
+    from alembic.autogenerate import compare_metadata
+    from alembic.runtime.migration import MigrationContext
+    from sqlalchemy import create_engine, inspect
+    from db.migrate import get_alembic_config
+
+    migration_engine = create_engine("sqlite://")
+    with migration_engine.begin() as connection:
+        command.upgrade(get_alembic_config(connection), "head")
+
+        # Models and migrations must describe the same schema
+        assert compare_metadata(MigrationContext.configure(connection), Base.metadata) == []
+
+        indexes = {index["name"]: index for index in inspect(connection).get_indexes("elderly")}
+        assert indexes["ix_elderly_user_id_custom_id"]["column_names"] == ["user_id", "custom_id"]
+        assert indexes["ix_elderly_user_id_custom_id"]["unique"]
+
+def test_unique_index_migration_lists_duplicate_custom_ids():
+    from alembic import command
+    from sqlalchemy import create_engine, text
+    from db.migrate import get_alembic_config
+
+    migration_engine = create_engine("sqlite://")
+    with migration_engine.begin() as connection:
+        command.upgrade(get_alembic_config(connection), "0001")
+        connection.execute(text(
+            "INSERT INTO elderly (id, custom_id, name, user_id) VALUES "
+            "(1, 5, 'Alice', 1), (2, 5, 'Alice again', 1), (3, 5, 'Other tenant', 2), (4, 6, 'Bob', 1)"
+        ))
+        with pytest.raises(RuntimeError) as error:
+            command.upgrade(get_alembic_config(connection), "head")
+    assert "Cannot create a unique index on elderly (user_id, custom_id)" in str(error.value)
+    assert str(error.value).endswith("\n  user_id=1 custom_id=5: ids 1, 2")
+
+### Pagination Tests ###
+def test_get_elderly_paginated(setup_database, auth_headers):
+    with TestClient(app) as client:
+        for i in range(5):
+            client.post("/elderly/", json={"custom_id": i + 1, "name": f"Elderly {i}"}, headers=auth_headers)
+
+        names = []
+        page_sizes = []
+        cursor = None
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = client.get("/elderly/", params=params, headers=auth_headers)
+            assert response.status_code == 200
+            names.extend(e["name"] for e in response.json())
+            page_sizes.append(len(response.json()))
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        assert page_sizes == [2, 2, 1]
+        assert names == [f"Elderly {i}" for i in range(5)]
+
+        # Without limit/cursor the whole collection is returned
+        response = client.get("/elderly/", headers=auth_headers)
+        assert len(response.json()) == 5
+        assert "X-Next-Cursor" not in response.headers
+
+def test_get_paginated_invalid_cursor(setup_database, auth_headers):
+    with TestClient(app) as client:
+        for endpoint in ("/elderly/", "/caregivers/", "/caregiver-assignments/"):
+            response = client.get(endpoint, params={"cursor": "not-a-cursor"}, headers=auth_headers)
+            assert response.status_code == 400
+            assert response.json()["detail"] == "Invalid cursor"
+
+def test_get_assignments_paginated(setup_database, auth_headers):
+    with TestClient(app) as client:
+        caregiver_id = client.post("/caregivers/", json={
+            "custom_id": 101,
+            "name": "John Doe",
+            "bank_name": "Bank A",
+            "bank_account": "12345",
+            "branch_number": "001"
+        }, headers=auth_headers).json()["id"]
+        for i in range(3):
+            elderly_id = client.post("/elderly/", json={"custom_id": i + 1, "name": f"Elderly {i}"}, headers=auth_headers).json()["id"]
+            client.post("/caregiver-assignments/", json={"caregiver_id": caregiver_id, "elderly_id": elderly_id}, headers=auth_headers)
+
+        first = client.get("/caregiver-assignments/", params={"limit": 2}, headers=auth_headers)
+        assert len(first.json()) == 2
+        second = client.get("/caregiver-assignments/", params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]}, headers=auth_headers)
+        assert len(second.json()) == 1
+        assert "X-Next-Cursor" not in second.headers
+
+        caregivers = client.get("/caregivers/", params={"limit": 1, "include": ""}, headers=auth_headers)
+        assert caregivers.status_code == 200
+        assert "assignments" not in caregivers.json()[0]
+
+### Admin Tests ###
+def test_pool_stats_requires_admin_token(monkeypatch):
+    with TestClient(app) as client:
+        monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+        response = client.get("/admin/pool-stats")
+        assert response.status_code == 403
+        assert response.json()["detail"] == "Admin endpoints are disabled"
+
+        monkeypatch.setenv("ADMIN_TOKEN", "secret")
+        response = client.get("/admin/pool-stats", headers={"X-Admin-Token": "wrong"})
+        assert response.status_code == 403
+        assert response.json()["detail"] == "Invalid admin token"
+
+def test_pool_stats(setup_database, auth_headers, monkeypatch):
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    with TestClient(app) as client:
+        client.get("/elderly/", headers=auth_headers)
+        response = client.get("/admin/pool-stats", headers={"X-Admin-Token": "secret"})
+        assert response.status_code == 200
+        stats = response.json()["sync"]
+        assert stats["pool_class"] == "InstrumentedQueuePool"
+        assert stats["checked_out"] == 0
+        assert stats["wait_time_seconds"]["count"] >= 1
+        assert stats["wait_time_seconds"]["buckets"]["+Inf"] == stats["wait_time_seconds"]["count"]
+
+def test_metrics(setup_database, auth_headers, fake_redis, monkeypatch, tmp_path):
+    import utils.metrics as metrics
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(metrics, "METRICS_DIR", str(tmp_path))
+    with TestClient(app) as client:
+        assert client.get("/metrics").status_code == 403
+
+        elderly = client.post("/elderly/", json={"custom_id": 1, "name": "Alice"}, headers=auth_headers).json()
+        client.get(f"/elderly/{elderly['id']}", headers=auth_headers)
+        client.get(f"/elderly/{elderly['id']}", headers=auth_headers)
+        response = client.get("/metrics", headers={"X-Admin-Token": "secret"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+    samples = {}
+    for line in response.text.splitlines():
+        if not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    # Latency is labelled with the route template, not the path
+    assert samples['http_request_duration_seconds_count{method="GET",route="/elderly/{elderly_id}",status="200"}'] >= 2
+    assert samples['db_queries_per_request_count{route="/elderly/{elderly_id}"}'] >= 2
+    assert samples['cache_requests_total{family="elderly_{id}",result="miss"}'] >= 1
+    assert sum(samples.get(f'cache_requests_total{{family="elderly_{{id}}",result="{r}"}}', 0) for r in ("l1_hit", "l2_hit")) >= 1
+    assert 'password_hash_duration_seconds_count{operation="hash"}' in samples
+    assert len(list(tmp_path.glob("worker_*.json"))) == 1  # Written when the worker stopped
+
+def test_render_prometheus_format(monkeypatch, tmp_path):
+    import utils.metrics as metrics
+    from utils.metrics import MetricFamily, Counter, Histogram, render_prometheus
+
+    monkeypatch.setattr(metrics, "METRICS_DIR", str(tmp_path))
+    requests = MetricFamily("requests_total", "Requests", "counter", ("path",), Counter)
+    requests.labels('a"b').inc(2)
+    latency = MetricFamily("latency_seconds", "Latency", "histogram", (), lambda: Histogram((0.1, 1.0)))
+    latency.labels().observe(0.5)
+    assert render_prometheus([requests, latency]).splitlines() == [
+        "# HELP requests_total Requests",
+        "# TYPE requests_total counter",
+        'requests_total{path="a\\"b"} 2.0',
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{le="0.1"} 0',
+        'latency_seconds_bucket{le="1.0"} 1',
+        'latency_seconds_bucket{le="+Inf"} 1',
+        "latency_seconds_sum 0.5",
+        "latency_seconds_count 1",
+    ]
+
+def test_metrics_of_all_workers_are_added_up(monkeypatch, tmp_path):
+    import os
+    import json
+    import utils.metrics as metrics
+    from utils.metrics import MetricFamily, Counter, Histogram, render_prometheus
+
+    requests = MetricFamily("requests_total", "Requests", "counter", ("path",), Counter)
+    requests.labels("/a").inc(2)
+    latency = MetricFamily("latency_seconds", "Latency", "histogram", (), lambda: Histogram((0.1, 1.0)))
+    latency.labels().observe(0.5)
+
+    # Without a shared directory every worker reports its own series, labelled with its PID
+    monkeypatch.setattr(metrics, "METRICS_DIR", "")
+    assert f'requests_total{{path="/a",worker="{os.getpid()}"}} 2.0' in render_prometheus([requests, latency])
+
+    # Another worker (running or exited) wrote its values to the directory
+    (tmp_path / "worker_1_abc.json").write_text(json.dumps({
+        "requests_total": [[["/a"], 3.0], [["/b"], 1.0]],
+        "latency_seconds": [[[], {"counts": [1, 0, 1], "sum": 2.05, "count": 2}]],
+    }))
+    monkeypatch.setattr(metrics, "METRICS_DIR", str(tmp_path))
+    lines = render_prometheus([requests, latency]).splitlines()
+    assert 'requests_total{path="/a"} 5.0' in lines
+    assert 'requests_total{path="/b"} 1.0' in lines
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in lines
+    assert "latency_seconds_count 3" in lines
+
+### Authentication Cache Tests ###
+def test_current_user_is_cached(setup_database, auth_headers):
+    with TestClient(app) as client:
+        assert client.get("/auth/me", headers=auth_headers).status_code == 200
+        with count_queries(engine) as statements:
+            response = client.get("/auth/me", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json()["email"] == "test@example.com"
+        assert statements == []
+
+def test_deactivated_user_is_not_served_from_cache(setup_database, auth_headers):
+    from models.user import User
+
+    with TestClient(app) as client:
+        assert client.get("/elderly/", headers=auth_headers).status_code == 200
+
+        db = SessionTesting()
+        try:
+            user = db.query(User).filter(User.email == "test@example.com").first()
+            user.is_active = False
+            db.commit()
+        finally:
+            db.close()
+
+        response = client.get("/elderly/", headers=auth_headers)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Inactive user"
+
+def test_user_changes_by_another_worker_evict_the_cached_user(setup_database, auth_headers, fake_redis):
+    import time
+    from sqlalchemy import text
+    from utils.redis_cache import INVALIDATION_CHANNEL
+
+    with TestClient(app) as client:
+        assert client.get("/elderly/", headers=auth_headers).status_code == 200
+
+        # Another worker deactivates the user: this worker's session sees no ORM event
+        db = SessionTesting()
+        try:
+            user_id = db.execute(text("SELECT id FROM users WHERE email = 'test@example.com'")).scalar()
+            db.execute(text("UPDATE users SET is_active = 0 WHERE id = :id"), {"id": user_id})
+            db.commit()
+        finally:
+            db.close()
+        fake_redis.delete(f"user_{user_id}_principal")
+        assert client.get("/elderly/", headers=auth_headers).status_code == 200  # Still cached in this worker
+
+        # ...and publishes the user's tag, as invalidate_user_cache does
+        fake_redis.publish(INVALIDATION_CHANNEL, f'["user:{user_id}"]')
+        deadline = time.monotonic() + 5
+        while client.get("/elderly/", headers=auth_headers).status_code == 200:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        assert client.get("/elderly/", headers=auth_headers).json()["detail"] == "Inactive user"
+
+### Login Tests ###
+def test_login_success(setup_database, auth_headers):
+    with TestClient(app) as client:
+        response = client.post("/auth/login", json={"email": "test@example.com", "password": "testpassword"})
+        assert response.status_code == 200
+        assert response.json()["email"] == "test@example.com"
+        me = client.get("/auth/me", headers={"Authorization": f"Bearer {response.json()['access_token']}"})
+        assert me.status_code == 200
+
+def test_login_is_throttled_after_repeated_failures(setup_database, auth_headers, monkeypatch):
+    import services.auth_service as auth_service
+    monkeypatch.setattr(auth_service, "LOGIN_MAX_FAILURES_PER_EMAIL", 3)
+
+    with TestClient(app) as client:
+        for _ in range(3):
+            response = client.post("/auth/login", json={"email": "test@example.com", "password": "wrong"})
+            assert response.status_code == 401
+
+        # Even the right password is rejected until the window ends
+        response = client.post("/auth/login", json={"email": "Test@example.com", "password": "testpassword"})
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) > 0
+
+def test_login_failure_counters_always_expire(fake_redis):
+    from utils.rate_limit import FixedWindowCounter
+
+    counter = FixedWindowCounter("test_failures", 300)
+    assert counter.hit("a@example.com") == 1
+    assert 0 < fake_redis.ttl("test_failures_a@example.com") <= 300
+
+    # A counter left without a TTL (e.g. by an interrupted EXPIRE) gets one on the next hit
+    fake_redis.set("test_failures_b@example.com", 7)
+    assert counter.hit("b@example.com") == 8
+    assert 0 < fake_redis.ttl("test_failures_b@example.com") <= 300
+
+### PDF Report Tests ###
+def test_generate_pdf_is_cached_and_supports_etag(setup_database, auth_headers, monkeypatch, tmp_path):
+    import services.caregiver_service as caregiver_service
+    import utils.pdf_cache as pdf_cache
+    monkeypatch.setattr(pdf_cache, "PDF_CACHE_DIR", str(tmp_path))
+    renders = []
+    render = caregiver_service.render_caregiver_pdf
+    monkeypatch.setattr(caregiver_service, "render_caregiver_pdf", lambda *args: renders.append(args) or render(*args))
+
+    with TestClient(app) as client:
+        caregiver = client.post("/caregivers/", json={
+            "custom_id": 1, "name": "John Doe", "bank_name": "Bank A",
+            "bank_account": "12345", "branch_number": "001"
+        }, headers=auth_headers).json()
+
+        response = client.get(f"/caregivers/{caregiver['id']}/generate-pdf", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/pdf"
+        assert response.content.startswith(b"%PDF")
+        assert 'filename="caregiver_1_report.pdf"' in response.headers["content-disposition"]
+        etag = response.headers["etag"]
+        assert not os.path.exists("caregiver_1_report.pdf")
+
+        # Unchanged report: served from the cache, or not at all if the client has it
+        again = client.get(f"/caregivers/{caregiver['id']}/generate-pdf", headers=auth_headers)
+        assert again.content == response.content
+        not_modified = client.get(f"/caregivers/{caregiver['id']}/generate-pdf",
+                                  headers={**auth_headers, "If-None-Match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+        assert len(renders) == 1
+
+        # New salary data: new content hash, so the old ETag no longer matches
+        client.put(f"/caregivers/{caregiver['id']}/update-salary", json={
+            "salary_price": 100, "salary_amount": 10, "saturday_price": 0,
+            "saturday_amount": 0, "allowance_price": 0, "allowance_amount": 0
+        }, headers=auth_headers)
+        changed = client.get(f"/caregivers/{caregiver['id']}/generate-pdf",
+                             headers={**auth_headers, "If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["etag"] != etag
+        assert len(renders) == 2
+
+def test_generate_reports_batch(setup_database, auth_headers, monkeypatch, tmp_path):
+    import io
+    import zipfile
+    import utils.pdf_cache as pdf_cache
+    monkeypatch.setattr(pdf_cache, "PDF_CACHE_DIR", str(tmp_path))
+
+    with TestClient(app) as client:
+        ids = []
+        for custom_id in (3, 1, 2):
+            ids.append(client.post("/caregivers/", json={
+                "custom_id": custom_id, "name": f"Caregiver {custom_id}", "bank_name": "Bank A",
+                "bank_account": "12345", "branch_number": "001"
+            }, headers=auth_headers).json()["id"])
+
+        response = client.post("/caregivers/reports/batch", json={}, headers=auth_headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/zip"
+        archive = zipfile.ZipFile(io.BytesIO(response.content))
+        assert sorted(archive.namelist()) == [f"caregiver_{i}_report.pdf" for i in (1, 2, 3)]
+        assert all(archive.read(name).startswith(b"%PDF") for name in archive.namelist())
+
+        # The single report endpoint reuses what the batch rendered
+        single = client.get(f"/caregivers/{ids[0]}/generate-pdf", headers=auth_headers)
+        assert single.content == archive.read("caregiver_3_report.pdf")
+
+        response = client.post("/caregivers/reports/batch",
+                               json={"caregiver_ids": ids[:2], "format": "pdf"}, headers=auth_headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/pdf"
+        assert b"/Count 2" in response.content
+
+        response = client.post("/caregivers/reports/batch", json={"caregiver_ids": [ids[0], 999]}, headers=auth_headers)
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Caregivers not found: 999"
+
+def test_batch_reports_read_the_pdf_cache_in_one_round_trip(setup_database, auth_headers, fake_redis, monkeypatch):
+    import io
+    import zipfile
+    import services.caregiver_service as caregiver_service
+    import utils.redis_cache as redis_cache
+
+    with TestClient(app) as client:
+        for custom_id in (1, 2, 3):
+            client.post("/caregivers/", json={
+                "custom_id": custom_id, "name": f"Caregiver {custom_id}", "bank_name": "Bank A",
+                "bank_account": "12345", "branch_number": "001"
+            }, headers=auth_headers)
+        first = zipfile.ZipFile(io.BytesIO(client.post("/caregivers/reports/batch", json={}, headers=auth_headers).content))
+
+        async def render(chunk, report_date):
+            raise AssertionError("a cached report was rendered again")
+
+        reads = []
+        mget = redis_cache.r_binary.mget
+        monkeypatch.setattr(redis_cache.r_binary, "mget", lambda keys: reads.append(keys) or mget(keys))
+        monkeypatch.setattr(caregiver_service, "_render_report_chunk", render)
+        response = client.post("/caregivers/reports/batch", json={}, headers=auth_headers)
+        assert response.status_code == 200
+
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    assert sorted(archive.namelist()) == sorted(first.namelist())
+    assert all(archive.read(name) == first.read(name) for name in archive.namelist())
+    assert len(reads) == 1 and len(reads[0]) == 3
+
+### Cache Tag Tests ###
+def test_tagged_entry_is_invalidated_by_tag(fake_redis):
+    from utils.redis_cache import lookup_tagged, invalidate_tags
+
+    entry = lookup_tagged("view", ["tenant:1:elderly", "elderly:1"])
+    assert not entry.hit
+    entry.store({"name": "Alice"})
+    assert lookup_tagged("view", ["tenant:1:elderly", "elderly:1"]).value == {"name": "Alice"}
+
+    # Unrelated tags leave the entry alone
+    invalidate_tags("tenant:2:elderly", "elderly:2")
+    assert lookup_tagged("view", ["tenant:1:elderly", "elderly:1"]).hit
+
+    # A value computed before an invalidation is never served after it
+    stale = lookup_tagged("view", ["tenant:1:elderly", "elderly:1"])
+    invalidate_tags("elderly:1")
+    stale.store({"name": "Old"})
+    assert not lookup_tagged("view", ["tenant:1:elderly", "elderly:1"]).hit
+
+def test_cached_views_follow_writes(setup_database, auth_headers, fake_redis):
+    from utils.redis_cache import get_cache_stats
+
+    with TestClient(app) as client:
+        elderly = client.post("/elderly/", json={"custom_id": 1, "name": "Alice"}, headers=auth_headers).json()
+        caregiver = client.post("/caregivers/", json={
+            "custom_id": 1, "name": "John Doe", "bank_name": "Bank A",
+            "bank_account": "12345", "branch_number": "001"
+        }, headers=auth_headers).json()
+        first = client.get("/elderly/", headers=auth_headers)
+        assert first.status_code == 200
+
+        # Second read is a cache hit, served by this worker's L1 as the same JSON body
+        l1_hits = get_cache_stats()["l1"]["hits"]
+        with count_queries(async_engine.sync_engine) as statements:
+            cached = client.get("/elderly/", headers=auth_headers)
+        assert statements == []
+        assert cached.content == first.content
+        assert cached.headers["content-type"] == "application/json"
+        assert cached.json()[0]["tasks"] == []
+        assert get_cache_stats()["l1"]["hits"] == l1_hits + 1
+
+        client.post(f"/elderly/{elderly['id']}/tasks", json={"description": "Walk", "status": "pending"}, headers=auth_headers)
+        assert len(client.get("/elderly/", headers=auth_headers).json()[0]["tasks"]) == 1
+
+        client.post("/caregiver-assignments/", json={"caregiver_id": caregiver["id"], "elderly_id": elderly["id"]}, headers=auth_headers)
+        assert len(client.get(f"/caregivers/{caregiver['id']}", headers=auth_headers).json()["assignments"]) == 1
+
+        # Deleting the elderly person also removes the assignment from the cached caregiver views
+        client.delete(f"/elderly/{elderly['id']}", headers=auth_headers)
+        assert client.get(f"/caregivers/{caregiver['id']}", headers=auth_headers).json()["assignments"] == []
+        assert client.get("/caregivers/", headers=auth_headers).json()[0]["assignments"] == []
+        assert client.get("/caregiver-assignments/", headers=auth_headers).json() == []
+
+        # Pages keep their cursor when served from the cache
+        client.post("/elderly/", json={"custom_id": 2, "name": "Bob"}, headers=auth_headers)
+        client.post("/elderly/", json={"custom_id": 3, "name": "Carol"}, headers=auth_headers)
+        page = client.get("/elderly/?limit=1", headers=auth_headers)
+        again = client.get("/elderly/?limit=1", headers=auth_headers)
+        assert again.content == page.content
+        assert again.headers["X-Next-Cursor"] == page.headers["X-Next-Cursor"]
+
+def test_conditional_get_with_etag(setup_database, auth_headers, fake_redis):
+    with TestClient(app) as client:
+        elderly = client.post("/elderly/", json={"custom_id": 1, "name": "Alice"}, headers=auth_headers).json()
+        caregiver = client.post("/caregivers/", json={
+            "custom_id": 1, "name": "John Doe", "bank_name": "Bank A",
+            "bank_account": "12345", "branch_number": "001"
+        }, headers=auth_headers).json()
+
+        for url in ["/elderly/", "/elderly/?limit=1", f"/elderly/{elderly['id']}",
+                    f"/elderly/{elderly['id']}/medications", "/caregivers/", f"/caregivers/{caregiver['id']}"]:
+            first = client.get(url, headers=auth_headers)
+            etag = first.headers["ETag"]
+            assert first.headers["Cache-Control"] == "private, no-cache"
+
+            # A matching If-None-Match is answered without loading the view
+            with count_queries(async_engine.sync_engine) as statements:
+                response = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+            assert statements == []
+            assert response.status_code == 304
+            assert response.content == b""
+            assert response.headers["ETag"] == etag
+
+        # Views of other URLs have other ETags
+        assert client.get("/elderly/?limit=1", headers=auth_headers).headers["ETag"] != \
+            client.get("/elderly/", headers=auth_headers).headers["ETag"]
+
+        # A write changes the ETag of the views it affects, and only those
+        list_etag = client.get("/elderly/", headers=auth_headers).headers["ETag"]
+        caregivers_etag = client.get("/caregivers/", headers=auth_headers).headers["ETag"]
+        client.post(f"/elderly/{elderly['id']}/tasks", json={"description": "Walk", "status": "pending"}, headers=auth_headers)
+        response = client.get("/elderly/", headers={**auth_headers, "If-None-Match": list_etag})
+        assert response.status_code == 200
+        assert len(response.json()[0]["tasks"]) == 1
+        assert response.headers["ETag"] != list_etag
+        assert client.get("/caregivers/", headers={**auth_headers, "If-None-Match": caregivers_etag}).status_code == 304
+
+def test_no_etag_without_redis(setup_database, auth_headers):
+    with TestClient(app) as client:
+        client.post("/elderly/", json={"custom_id": 1, "name": "Alice"}, headers=auth_headers)
+        response = client.get("/elderly/", headers={**auth_headers, "If-None-Match": "*"})
+        assert response.status_code == 200
+        assert "ETag" not in response.headers
+
+def test_tag_generations_do_not_repeat_after_redis_loses_them(fake_redis):
+    from utils.redis_cache import get_tag_generations, invalidate_tags
+
+    first = get_tag_generations(["elderly:1"])
+    invalidate_tags("elderly:1")
+    assert get_tag_generations(["elderly:1"]) == [first[0] + 1]
+
+    fake_redis.flushall()
+    assert get_tag_generations(["elderly:1"]) not in (first, [first[0] + 1])
+
+def test_l1_cache_is_invalidated_by_other_workers(fake_redis):
+    import time
+    import utils.redis_cache as redis_cache
+    from utils.redis_cache import lookup_tagged, get_cache_stats, INVALIDATION_CHANNEL
+
+    redis_cache.start_invalidation_listener()
+    try:
+        assert get_cache_stats()["l1"]["enabled"]
+
+        before = get_cache_stats()
+        lookup_tagged("view", ["elderly:1"]).store(b'{"name":"Alice"}')
+        assert lookup_tagged("view", ["elderly:1"]).value == b'{"name":"Alice"}'
+        stats = get_cache_stats()
+        assert stats["l1"]["hits"] == before["l1"]["hits"] + 1
+        assert stats["l2"]["hits"] == before["l2"]["hits"]
+
+        # Another worker invalidated the tag: this worker drops its L1 entry
+        fake_redis.publish(INVALIDATION_CHANNEL, '["elderly:1"]')
+        deadline = time.monotonic() + 5
+        while get_cache_stats()["l2"]["hits"] == before["l2"]["hits"]:
+            assert time.monotonic() < deadline
+            assert lookup_tagged("view", ["elderly:1"]).value == b'{"name":"Alice"}'
+            time.sleep(0.01)
+    finally:
+        redis_cache.stop_invalidation_listener()
+    assert not get_cache_stats()["l1"]["enabled"]
+
+### Cache Stampede Tests ###
+@pytest.mark.asyncio
+async def test_concurrent_misses_compute_once(fake_redis):
+    from fastapi import HTTPException
+    from utils.redis_cache import get_or_compute, get_cache_stats, invalidate_tags
+
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return b"[1]"
+
+    coalesced = get_cache_stats()["stampede"]["coalesced"]
+    results = await asyncio.gather(*(get_or_compute("view", ["elderly:1"], load) for _ in range(10)))
+    assert results == [b"[1]"] * 10
+    assert len(calls) == 1
+    assert get_cache_stats()["stampede"]["coalesced"] == coalesced + 9
+
+    # Errors (e.g. a 404) reach every waiting request, and the lock is released
+    async def fail():
+        await asyncio.sleep(0.05)
+        raise HTTPException(status_code=404, detail="Elderly not found")
+
+    invalidate_tags("elderly:1")
+    results = await asyncio.gather(*(get_or_compute("view", ["elderly:1"], fail) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(r, HTTPException) and r.status_code == 404 for r in results)
+    assert fake_redis.keys("lock:*") == []
+
+@pytest.mark.asyncio
+async def test_miss_waits_for_the_worker_holding_the_lock(fake_redis):
+    from utils.redis_cache import get_or_compute, lookup_tagged
+
+    entry = lookup_tagged("view", ["elderly:1"])
+    fake_redis.set("lock:view:0", "other-worker", px=10000)
+
+    async def other_worker():
+        await asyncio.sleep(0.1)
+        entry.store(b"from the other worker")
+        fake_redis.delete("lock:view:0")
+
+    async def load():
+        raise AssertionError("the entry was computed twice")
+
+    task = asyncio.create_task(other_worker())
+    assert await get_or_compute("view", ["elderly:1"], load) == b"from the other worker"
+    await task
+
+@pytest.mark.asyncio
+async def test_slow_redis_does_not_block_the_event_loop(fake_redis, monkeypatch):
+    import time
+    import redis
+    from utils.redis_cache import get_or_compute, invalidate_tags_async
+
+    execute = redis.client.Pipeline.execute
+
+    def slow_execute(self, *args, **kwargs):
+        time.sleep(0.2)  # Redis answers just before the socket timeout
+        return execute(self, *args, **kwargs)
+
+    monkeypatch.setattr(redis.client.Pipeline, "execute", slow_execute)
+
+    ticks = 0
+
+    async def other_requests():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    async def load():
+        return b"[1]"
+
+    task = asyncio.create_task(other_requests())
+    try:
+        assert await get_or_compute("view", ["elderly:1"], load) == b"[1]"
+        await invalidate_tags_async("elderly:1")
+    finally:
+        task.cancel()
+    assert ticks >= 20  # About 60 while the pipelines wait; none if they blocked the loop
+
+@pytest.mark.asyncio
+async def test_stale_entries_and_early_recomputation(fake_redis, monkeypatch):
+    import random
+    from utils.redis_cache import get_or_compute, lookup_tagged, invalidate_tags
+
+    async def load():
+        return b"new"
+
+    # Expired, but kept for stale_ttl: served while another worker recomputes it
+    lookup_tagged("view", ["elderly:1"]).store(b"old", ttl=0, stale_ttl=60)
+    fake_redis.set("lock:view:0", "other-worker", px=10000)
+    assert await get_or_compute("view", ["elderly:1"], load) == b"old"
+    fake_redis.delete("lock:view:0")
+    assert await get_or_compute("view", ["elderly:1"], load) == b"new"
+
+    # Invalidated entries are never served, stale or not
+    lookup_tagged("view", ["elderly:1"]).store(b"old", ttl=0, stale_ttl=60)
+    invalidate_tags("elderly:1")
+    entry = lookup_tagged("view", ["elderly:1"])
+    assert not entry.hit and entry.value is None
+
+    # A fresh entry that is slow to compute is recomputed ahead of its expiry
+    entry.store(b"fresh", ttl=60, delta=1000)
+    monkeypatch.setattr(random, "random", lambda: 0.5)
+    assert lookup_tagged("view", ["elderly:1"], beta=0).hit
+    early = lookup_tagged("view", ["elderly:1"], beta=1.0)
+    assert not early.hit and early.stale and early.value == b"fresh"
+
+def test_empty_and_not_found_results_are_cached(setup_database, auth_headers, fake_redis):
+    with TestClient(app) as client:
+        # A tenant without residents is a cache hit like any other
+        assert client.get("/elderly/", headers=auth_headers).json() == []
+        with count_queries(async_engine.sync_engine) as statements:
+            assert client.get("/elderly/", headers=auth_headers).json() == []
+            assert client.get("/caregiver-assignments/", headers=auth_headers).json() == []
+            assert client.get("/caregiver-assignments/", headers=auth_headers).json() == []
+        assert len(statements) == 1
+
+        # Probing an unknown ID reaches the database once
+        alice = client.post("/elderly/", json={"custom_id": 1, "name": "Alice"}, headers=auth_headers).json()
+        unknown = alice["id"] + 1
+        assert client.get(f"/elderly/{unknown}", headers=auth_headers).status_code == 404
+        with count_queries(async_engine.sync_engine) as statements:
+            response = client.get(f"/elderly/{unknown}", headers=auth_headers)
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Elderly not found"
+        assert statements == []
+
+        # Creating the ID drops the cached "not found"
+        bob = client.post("/elderly/", json={"custom_id": 2, "name": "Bob"}, headers=auth_headers).json()
+        assert bob["id"] == unknown
+        assert client.get(f"/elderly/{unknown}", headers=auth_headers).json()["name"] == "Bob"
+
+### Cache Warm-up Tests ###
+def test_login_records_last_login_and_warms_the_cache(setup_database, auth_headers, fake_redis, monkeypatch):
+    import time
+    import services.cache_warmup_service as cache_warmup_service
+    from models.user import User
+    from utils.redis_cache import lookup_tagged
+    from utils.cache_tags import tenant_tag
+
+    monkeypatch.setattr(cache_warmup_service, "CACHE_WARMUP", True)
+    with TestClient(app) as client:
+        response = client.post("/auth/login", json={"email": "test@example.com", "password": "testpassword"})
+        assert response.status_code == 200
+        user_id = response.json()["user_id"]
+
+        # The tenant's lists are loaded in the background after the login
+        views = [
+            (f"user_{user_id}_elderly_list", tenant_tag(user_id, "elderly")),
+            (f"user_{user_id}_caregiver_list", tenant_tag(user_id, "caregivers")),
+            (f"user_{user_id}_caregiver_assignments_list", tenant_tag(user_id, "assignments")),
+        ]
+        deadline = time.monotonic() + 5
+        while not all(lookup_tagged(key, [tag]).hit for key, tag in views):
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+    db = SessionTesting()
+    try:
+        assert db.get(User, user_id).last_login_at is not None
+    finally:
+        db.close()
+
+def test_login_keeps_the_cached_user(setup_database, auth_headers, monkeypatch):
+    import services.auth_service as auth_service
+    from models.user import User
+
+    evicted = []
+    monkeypatch.setattr(auth_service, "invalidate_user_cache", evicted.append)
+    with TestClient(app) as client:
+        for _ in range(2):
+            response = client.post("/auth/login", json={"email": "test@example.com", "password": "testpassword"})
+            assert response.status_code == 200
+    assert evicted == []
+
+    db = SessionTesting()
+    try:
+        assert db.get(User, response.json()["user_id"]).last_login_at is not None
+    finally:
+        db.close()
+
+@pytest.mark.asyncio
+async def test_startup_warms_the_most_recently_active_tenants(setup_database, fake_redis, monkeypatch):
+    from datetime import datetime, timedelta
+    from models.user import User
+    from services.cache_warmup_service import warm_recent_tenants
+    from utils.redis_cache import lookup_tagged
+    from utils.cache_tags import tenant_tag
+
+    db = SessionTesting()
+    try:
+        now = datetime.utcnow()
+        for i, last_login_at in enumerate([now - timedelta(days=2), now, now - timedelta(days=1), None]):
+            db.add(User(email=f"user{i}@example.com", hashed_password="x", last_login_at=last_login_at))
+        db.commit()
+        user_ids = [u.id for u in db.query(User).order_by(User.id)]
+    finally:
+        db.close()
+
+    monkeypatch.setattr("services.cache_warmup_service.CACHE_WARMUP_CONCURRENCY", 1)
+    assert await warm_recent_tenants(limit=2) == 2
+    warmed = [lookup_tagged(f"user_{u}_elderly_list", [tenant_tag(u, "elderly")]).hit for u in user_ids]
+    assert warmed == [False, True, True, False]
+
+### Request Timing Tests ###
+def test_server_timing_header(setup_database, auth_headers, fake_redis, monkeypatch, caplog):
+    import utils.request_timing as request_timing
+
+    with TestClient(app) as client:
+        client.post("/elderly/", json={"custom_id": 1, "name": "Alice"}, headers=auth_headers)
+
+        # Off: no header and no timing overhead
+        assert "Server-Timing" not in client.get("/elderly/", headers=auth_headers).headers
+
+        monkeypatch.setattr(request_timing, "REQUEST_TIMING", True)
+        monkeypatch.setattr(request_timing.logger, "propagate", True)
+        client.post("/elderly/", json={"custom_id": 2, "name": "Bob"}, headers=auth_headers)
+        with caplog.at_level("INFO", logger="request_timing"):
+            response = client.get("/elderly/", headers=auth_headers)
+        phases = {metric.split(";")[0] for metric in response.headers["Server-Timing"].split(", ")}
+        assert {"auth", "cache", "db", "serialize", "total"} <= phases
+
+        line = json.loads(caplog.records[-1].getMessage())
+        assert line["path"] == "/elderly/" and line["status"] == 200
+        assert line["total_ms"] >= line["db_ms"] > 0
+
+### Response Compression Tests ###
+def test_negotiate_encoding():
+    from utils.compression import negotiate_encoding
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("gzip;q=0, deflate") is None
+    assert negotiate_encoding("*") in ("br", "gzip")
+
+@pytest.mark.parametrize("coding", ["gzip", "br"])
+def test_responses_are_compressed(setup_database, auth_headers, fake_redis, coding):
+    if coding == "br":
+        pytest.importorskip("brotli")
+    with TestClient(app) as client:
+        for i in range(30):
+            client.post("/elderly/", json={"custom_id": i, "name": f"Elderly {i}"}, headers=auth_headers)
+        plain = client.get("/elderly/", headers={**auth_headers, "Accept-Encoding": "identity"})
+        assert "Content-Encoding" not in plain.headers
+
+        response = client.get("/elderly/", headers={**auth_headers, "Accept-Encoding": coding})
+        assert response.headers["Content-Encoding"] == coding
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert int(response.headers["Content-Length"]) < len(plain.content) / 3
+        assert response.content == plain.content  # Decoded by the client
+
+        # The compressed body gets a weak ETag, which still matches
+        assert response.headers["ETag"] == "W/" + plain.headers["ETag"]
+        again = client.get("/elderly/", headers={**auth_headers, "Accept-Encoding": coding, "If-None-Match": response.headers["ETag"]})
+        assert again.status_code == 304
+        assert again.headers["ETag"] == response.headers["ETag"]
+
+        # Small bodies are sent as they are
+        small = client.get("/", headers={"Accept-Encoding": coding})
+        assert "Content-Encoding" not in small.headers
+        assert small.json() == {"message": "Welcome to the Elder Care Management System!"}
+
+def test_streamed_responses_are_compressed():
+    from fastapi import FastAPI
+    from fastapi.responses import StreamingResponse
+    from utils.compression import CompressionMiddleware
+
+    streaming_app = FastAPI()
+    streaming_app.add_middleware(CompressionMiddleware)
+    lines = [json.dumps({"id": i, "name": f"Elderly {i}"}).encode() + b"\n" for i in range(1000)]
+
+    @streaming_app.get("/export")
+    def export():
+        return StreamingResponse(iter(lines), media_type="application/x-ndjson")
+
+    with TestClient(streaming_app) as client:
+        response = client.get("/export", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Content-Length" not in response.headers
+        assert response.content == b"".join(lines)
+
+### Cache Serialization Tests ###
+@pytest.mark.parametrize("serializer", ["json", "orjson", "msgpack"])
+@pytest.mark.parametrize("compression", ["none", "zstd", "lz4"])
+def test_cache_codec_round_trip(serializer, compression):
+    from utils.serializers import Codec
+
+    codec = Codec(serializer=serializer, compression=compression, compress_min_bytes=64)
+    large = [{"id": i, "name": "Alice", "tasks": []} for i in range(50)]
+    for value in ({"id": 1}, large, b'[{"id":1}]' * 50):
+        data = codec.encode(value)
+        # Readable whatever the reader's own settings are
+        assert Codec().decode(data) == value
+    if compression != "none":
+        assert len(codec.encode(large)) < len(Codec(serializer=serializer).encode(large))
+
+### Redis Outage Tests ###
+def test_circuit_breaker_opens_and_retries():
+    import time
+    from utils.circuit_breaker import CircuitBreaker
+
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.state == "half_open" and breaker.allow()
+    breaker.record_failure()  # Failed retry: skip for another interval
+    assert breaker.state == "open"
+
+    time.sleep(0.06)
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+def test_cache_is_skipped_while_redis_is_down(setup_database, auth_headers, fake_redis, monkeypatch):
+    import time
+    import utils.redis_cache as redis_cache
+    from utils.redis_cache import get_cache_stats, lookup_tagged
+
+    server = fake_redis.connection_pool.connection_kwargs["server"]
+    server.connected = False
+    failures = []
+    record_failure = redis_cache.breaker.record_failure
+    monkeypatch.setattr(redis_cache.breaker, "record_failure", lambda: failures.append(1) or record_failure())
+
+    with TestClient(app) as client:
+        # The API keeps working from the database while the cache fails
+        for _ in range(5):
+            assert client.get("/elderly/", headers=auth_headers).status_code == 200
+        assert get_cache_stats()["l2"]["circuit"] == "open"
+        assert len(failures) == 3  # Redis was only tried until the circuit opened
+
+    # Redis is back: after the retry interval the cache is used again
+    server.connected = True
+    monkeypatch.setattr(redis_cache.breaker, "reset_timeout", 0.05)
+    time.sleep(0.06)
+    lookup_tagged("view", ["elderly:1"]).store("value")
+    assert lookup_tagged("view", ["elderly:1"]).value == "value"
+    assert get_cache_stats()["l2"]["circuit"] == "closed"
+
+### CSV Import Tests ###
+def test_import_elderly_csv(setup_database, auth_headers, fake_redis, monkeypatch):
+    monkeypatch.setattr("services.import_service.IMPORT_BATCH_ROWS", 2)  # Several batches
+    with TestClient(app) as client:
+        client.post("/elderly/", json={"custom_id": 1, "name": "Alice"}, headers=auth_headers)
+        assert len(client.get("/elderly/", headers=auth_headers).json()) == 1  # Cached
+
+        content = "﻿custom_id,name,notes\n2,Bob,x\n1,Existing,\nabc,Bad ID,\n3,Carol,\n2,Bob again,\n4,Dave,\n"
+        response = client.post("/import/elderly", files={"file": ("elderly.csv", content.encode(), "text/csv")}, headers=auth_headers)
+        assert response.status_code == 200
+        report = response.json()
+        assert (report["imported"], report["failed"]) == (3, 3)
+        assert [e["row"] for e in report["errors"]] == [3, 4, 6]
+        assert report["errors"][0]["errors"] == ["custom_id: Elderly with this ID already exists for this user"]
+        assert report["errors"][1]["errors"][0].startswith("custom_id: ")
+        assert report["errors"][2]["errors"] == ["custom_id: Elderly with this ID already exists for this user"]
+
+        # Caches were invalidated
+        elderly = client.get("/elderly/", headers=auth_headers).json()
+        assert sorted((e["custom_id"], e["name"]) for e in elderly) == [(1, "Alice"), (2, "Bob"), (3, "Carol"), (4, "Dave")]
+
+def test_import_rejects_rows_with_the_wrong_number_of_fields(setup_database, auth_headers):
+    with TestClient(app) as client:
+        content = "custom_id,name\n1,Alice,EXTRA\n2\n3,Carol\n4,Dave,\n"
+        response = client.post("/import/elderly", files={"file": ("elderly.csv", content.encode(), "text/csv")}, headers=auth_headers)
+        assert response.status_code == 200
+        report = response.json()
+        assert (report["imported"], report["failed"]) == (1, 3)
+        assert report["errors"] == [
+            {"row": 2, "errors": ["Row has 3 fields, the header has 2"]},
+            {"row": 3, "errors": ["Row has 1 fields, the header has 2"]},
+            {"row": 5, "errors": ["Row has 3 fields, the header has 2"]},
+        ]
+        assert [e["name"] for e in client.get("/elderly/", headers=auth_headers).json()] == ["Carol"]
+
+def test_import_rejects_unusable_files(setup_database, auth_headers):
+    with TestClient(app) as client:
+        for content, detail in [
+            (b"", "The CSV file is empty"),
+            (b"custom_id\n1\n", "Missing CSV columns: name"),
+            (b"\xff\xfe\x00c", None),
+        ]:
+            response = client.post("/import/elderly", files={"file": ("elderly.csv", content, "text/csv")}, headers=auth_headers)
+            assert response.status_code == 400
+            if detail:
+                assert response.json()["detail"] == detail
+        assert client.post("/import/residents", files={"file": ("x.csv", b"custom_id,name\n", "text/csv")}, headers=auth_headers).status_code == 422
+        assert client.get("/elderly/", headers=auth_headers).json() == []
+
+def test_import_caregivers_csv(setup_database, auth_headers, fake_redis):
+    with TestClient(app) as client:
+        content = "custom_id,name,bank_name,bank_account,branch_number\n1,Eve,Bank,123,001\n2,Frank,,,\n"
+        response = client.post("/import/caregivers", files={"file": ("caregivers.csv", content.encode(), "text/csv")}, headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json() == {"imported": 2, "failed": 0, "errors": []}  # Empty strings are valid bank details
+
+        caregivers = client.get("/caregivers/", headers=auth_headers).json()
+        assert [c["name"] for c in sorted(caregivers, key=lambda c: c["custom_id"])] == ["Eve", "Frank"]
+        caregiver = client.get(f"/caregivers/{caregivers[0]['id']}", headers=auth_headers).json()
+        assert caregiver["salary"] == {"price": 0, "amount": 0, "total": 0}  # Column defaults are applied
+
+### Data Export Tests ###
+def _seed_export_data(client, auth_headers):
+    elderly = client.post("/elderly/bulk", json=[{"custom_id": i, "name": f"Elderly {i}"} for i in range(1, 4)], headers=auth_headers).json()
+    client.post(f"/elderly/{elderly[0]['id']}/tasks/bulk", json=[{"description": f"Task {i}"} for i in range(5)], headers=auth_headers)
+    client.post(f"/elderly/{elderly[1]['id']}/medications", json={"name": "Aspirin", "dosage": "100mg", "frequency": "Daily"}, headers=auth_headers)
+    caregiver = client.post("/caregivers/", json={
+        "custom_id": 1, "name": "Eve", "bank_name": "Bank", "bank_account": "123", "branch_number": "001"
+    }, headers=auth_headers).json()
+    client.post("/caregiver-assignments/", json={"caregiver_id": caregiver["id"], "elderly_id": elderly[0]["id"]}, headers=auth_headers)
+
+    # Another tenant's data is never exported
+    from models.elderly import Elderly
+    from models.task import Task
+    with SessionTesting() as db:
+        other = Elderly(custom_id=1, name="Other tenant", user_id=999)
+        db.add(other)
+        db.flush()
+        db.add(Task(description="Other task", elderly_id=other.id))
+        db.commit()
+    return elderly
+
+def test_export_ndjson(setup_database, auth_headers, monkeypatch):
+    monkeypatch.setattr("services.export_service.EXPORT_BATCH_ROWS", 2)  # Several round trips per entity
+    with TestClient(app) as client:
+        elderly = _seed_export_data(client, auth_headers)
+        response = client.get("/export", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert response.headers["content-disposition"].startswith('attachment; filename="export_all_')
+        assert response.headers["cache-control"] == "private, no-store"
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        counts = {}
+        for row in rows:
+            counts[row["type"]] = counts.get(row["type"], 0) + 1
+        assert counts == {"elderly": 3, "tasks": 5, "medications": 1, "caregivers": 1, "assignments": 1}
+        assert rows[0] == {"type": "elderly", "id": elderly[0]["id"], "custom_id": 1, "name": "Elderly 1"}
+        caregiver = next(row for row in rows if row["type"] == "caregivers")
+        assert caregiver["salary"] == {"price": 0, "amount": 0, "total": 0}
+
+        response = client.get("/export?entity=tasks", headers=auth_headers)
+        tasks = [json.loads(line) for line in response.text.splitlines()]
+        assert [t["description"] for t in tasks] == [f"Task {i}" for i in range(5)]
+        assert "type" not in tasks[0]
+
+def test_export_csv(setup_database, auth_headers):
+    import csv
+    with TestClient(app) as client:
+        # Empty exports still have a header row
+        response = client.get("/export?format=csv&entity=assignments", headers=auth_headers)
+        assert response.text.splitlines() == ["id,caregiver_id,elderly_id"]
+
+        _seed_export_data(client, auth_headers)
+        response = client.get("/export?format=csv&entity=caregivers", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "text/csv; charset=utf-8"
+        rows = list(csv.DictReader(response.text.splitlines()))
+        assert [(r["name"], r["bank_account"]) for r in rows] == [("Eve", "123")]
+        assert json.loads(rows[0]["salary"]) == {"price": 0, "amount": 0, "total": 0}
+
+        assert client.get("/export?format=csv", headers=auth_headers).status_code == 400
+        assert client.get("/export?format=xml&entity=tasks", headers=auth_headers).status_code == 422
+        assert client.get("/export").status_code == 401
+
+def test_export_parquet(setup_database, auth_headers, monkeypatch):
+    import io
+    pq = pytest.importorskip("pyarrow.parquet")
+    monkeypatch.setattr("services.export_service.EXPORT_BATCH_ROWS", 2)
+    with TestClient(app) as client:
+        _seed_export_data(client, auth_headers)
+        response = client.get("/export?format=parquet&entity=tasks", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/vnd.apache.parquet"
+        parquet = pq.ParquetFile(io.BytesIO(response.content))
+        assert parquet.metadata.num_row_groups == 3  # One per batch of rows
+        table = parquet.read()
+        assert table.column_names == ["id", "elderly_id", "description", "status"]
+        assert table.column("description").to_pylist() == [f"Task {i}" for i in range(5)]
+        assert set(table.column("status").to_pylist()) == {"pending"}
+
+        caregivers = pq.read_table(io.BytesIO(client.get("/export?format=parquet&entity=caregivers", headers=auth_headers).content))
+        assert str(caregivers.schema.field("total_bank").type) == "double"
+        assert json.loads(caregivers.column("salary")[0].as_py()) == {"price": 0, "amount": 0, "total": 0}
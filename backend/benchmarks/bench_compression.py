@@ -0,0 +1,79 @@
+"""
+Micro-benchmark of response rendering and compression for a large elderly list.
+
+The elderly list of a tenant with --elderly residents (each with tasks,
+medications and assignments) is rendered the way FastAPI renders a
+response_model, with the stdlib json encoder (JSONResponse, the previous
+default) and with orjson (ORJSONResponse, the default now), from the dumped
+models. Cached list views send a body serialized by Pydantic (dump_json, which
+includes dumping the models), shown for reference; it is only built on a cache miss.
+
+The body is then compressed with gzip and brotli at a few levels, showing the
+bytes on the wire and the CPU time per response. GZIP_LEVEL and BROTLI_QUALITY
+pick the levels the API uses (see utils/compression.py).
+
+Usage (from the backend/ directory):
+    python -m benchmarks.bench_compression
+    python -m benchmarks.bench_compression --elderly 5000 --repeat 20
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+from schemas.elderly import ElderlySchema
+from benchmarks.bench_serializers import build_elderly
+import utils.compression as compression
+from utils.compression import CODINGS
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--elderly", type=int, default=1000, help="Elderly persons in the list")
+    parser.add_argument("--tasks", type=int, default=5, help="Tasks per elderly person")
+    parser.add_argument("--medications", type=int, default=3, help="Medications per elderly person")
+    parser.add_argument("--assignments", type=int, default=2, help="Assignments per elderly person")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed runs per measurement (the best one is shown)")
+    return parser.parse_args()
+
+def best_ms(func, repeat: int) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat)) * 1000
+
+def main():
+    args = parse_args()
+    adapter = TypeAdapter(list[ElderlySchema])
+    elderly = build_elderly(args)
+    content = adapter.dump_python(elderly, mode="json")  # What FastAPI passes to the response class
+
+    print(f"{args.elderly} elderly with {args.tasks} tasks, {args.medications} medications, {args.assignments} assignments each")
+    print(f"{'rendering':<28} {'KiB':>8} {'ms':>8}")
+    body = None
+    for name, render in [
+        ("stdlib json (JSONResponse)", lambda: JSONResponse(content).body),
+        ("orjson (ORJSONResponse)", lambda: ORJSONResponse(content).body),
+        ("pydantic (cached views)", lambda: adapter.dump_json(elderly)),
+    ]:
+        body = render()
+        print(f"{name:<28} {len(body) / 1024:>8.0f} {best_ms(render, args.repeat):>8.2f}")
+
+    print()
+    print(f"{'compression':<28} {'KiB':>8} {'ms':>8} {'ratio':>7}")
+    print(f"{'none':<28} {len(body) / 1024:>8.0f} {0:>8.2f} {1:>7.1f}")
+    levels = {"gzip": ("GZIP_LEVEL", [1, 6, 9]), "br": ("BROTLI_QUALITY", [1, 4, 6, 11])}
+    for coding, (compress, _) in CODINGS.items():
+        setting, values = levels[coding]
+        for level in values:
+            setattr(compression, setting, level)
+            try:
+                data = compress(body)
+            except ImportError as e:
+                print(f"skipped {coding}: {e.name} is not installed")
+                break
+            elapsed = best_ms(lambda: compress(body), args.repeat)
+            print(f"{f'{coding} ({setting}={level})':<28} {len(data) / 1024:>8.0f} {elapsed:>8.2f} {len(body) / len(data):>7.1f}")
+
+if __name__ == "__main__":
+    main()
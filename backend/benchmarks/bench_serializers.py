@@ -0,0 +1,91 @@
+"""
+Micro-benchmark of the cache serializers and compression for a large elderly list.
+
+A tenant with --elderly residents (each with tasks, medications and
+assignments) is cached in two ways:
+- models: the list of model dicts is encoded with the serializer; a hit
+  decodes it, rebuilds the ElderlySchema models and serializes the response
+  (what the services did before cached views kept their response body)
+- body:   the JSON response body is cached; a hit only decodes the cache
+  value and the bytes are sent as they are (what the services do now)
+
+For each combination the table shows the cached size, the time to encode a
+value on a miss and the time to turn a cache hit into a response body.
+Redis is not involved, so the numbers are pure CPU cost per request.
+
+Usage (from the backend/ directory):
+    python -m benchmarks.bench_serializers
+    python -m benchmarks.bench_serializers --elderly 2000 --repeat 20
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic import TypeAdapter
+from schemas.elderly import ElderlySchema
+from utils.serializers import Codec, SERIALIZERS, COMPRESSORS
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--elderly", type=int, default=500, help="Elderly persons in the cached list")
+    parser.add_argument("--tasks", type=int, default=5, help="Tasks per elderly person")
+    parser.add_argument("--medications", type=int, default=3, help="Medications per elderly person")
+    parser.add_argument("--assignments", type=int, default=2, help="Assignments per elderly person")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed runs per measurement (the best one is shown)")
+    parser.add_argument("--compress-min-bytes", type=int, default=16384, help="CACHE_COMPRESS_MIN_BYTES")
+    return parser.parse_args()
+
+def build_elderly(args) -> list[ElderlySchema]:
+    """One tenant's elderly list with nested collections."""
+    return [
+        ElderlySchema(
+            id=e, custom_id=e, name=f"Elderly {e}", user_id=1,
+            tasks=[{"id": e * 100 + t, "description": f"Task {t} for elderly {e}", "status": "pending"}
+                   for t in range(args.tasks)],
+            medications=[{"id": e * 100 + m, "name": f"Medication {m}", "dosage": "10mg", "frequency": "Twice a day"}
+                         for m in range(args.medications)],
+            assignments=[{"id": e * 100 + a, "caregiver_id": a + 1, "elderly_id": e, "user_id": 1}
+                         for a in range(args.assignments)],
+        )
+        for e in range(1, args.elderly + 1)
+    ]
+
+def best_ms(func, repeat: int) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat)) * 1000
+
+def main():
+    args = parse_args()
+    adapter = TypeAdapter(list[ElderlySchema])
+    elderly = build_elderly(args)
+    body = adapter.dump_json(elderly)
+    print(f"{args.elderly} elderly, response body {len(body) / 1024:.0f} KiB")
+    print(f"{'cached':>7} {'serializer':>10} {'compression':>11}  {'size KiB':>8} {'encode ms':>9} {'hit ms':>7}")
+
+    available = []
+    for serializer in SERIALIZERS:
+        for compression in COMPRESSORS:
+            try:
+                available.append(Codec(serializer, compression, args.compress_min_bytes))
+            except ValueError as e:
+                print(f"skipped {serializer}/{compression}: {e}")
+
+    for codec in available:
+        data = codec.encode([e.model_dump() for e in elderly])
+        encode = best_ms(lambda: codec.encode([e.model_dump() for e in elderly]), args.repeat)
+        hit = best_ms(lambda: adapter.dump_json([ElderlySchema(**e) for e in codec.decode(data)]), args.repeat)
+        print(f"{'models':>7} {codec.serializer:>10} {codec.compression:>11}  {len(data) / 1024:>8.0f} {encode:>9.2f} {hit:>7.2f}")
+
+    # The serializer does not matter for bytes values, only the compression does
+    for codec in available:
+        if codec.serializer != "orjson":
+            continue
+        data = codec.encode(body)
+        encode = best_ms(lambda: codec.encode(adapter.dump_json(elderly)), args.repeat)
+        hit = best_ms(lambda: codec.decode(data), args.repeat)
+        print(f"{'body':>7} {'-':>10} {codec.compression:>11}  {len(data) / 1024:>8.0f} {encode:>9.2f} {hit:>7.2f}")
+
+if __name__ == "__main__":
+    main()
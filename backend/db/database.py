@@ -1,6 +1,10 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from db.pool_stats import InstrumentedQueuePool, InstrumentedAsyncAdaptedQueuePool
 import os
 
 # Use SQLite for tests, PostgreSQL for production
@@ -11,10 +15,76 @@ else:
     if DATABASE_URL is None:
         raise ValueError("DATABASE_URL environment variable is required for production")
 
-engine = create_engine(DATABASE_URL)
+# Connection pool settings (tune per deployment, e.g. on Railway)
+# - DB_POOL_SIZE: connections kept open in the pool
+# - DB_MAX_OVERFLOW: extra connections allowed during bursts
+# - DB_POOL_TIMEOUT: seconds to wait for a free connection before failing
+# - DB_POOL_RECYCLE: seconds after which a connection is replaced (avoids server-side idle drops)
+# - DB_POOL_PRE_PING: test connections before use so stale ones are replaced transparently
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+engine = create_engine(
+    DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def to_async_url(url: str) -> str:
+    """
+    Convert a sync database URL to its async driver equivalent.
+    
+    - postgresql:// (or postgres://) -> postgresql+asyncpg://
+    - sqlite:// -> sqlite+aiosqlite://
+    
+    Args:
+        url: Sync database URL (as used by DATABASE_URL)
+        
+    Returns:
+        str: URL for create_async_engine
+    """
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "postgresql":
+        query = dict(parsed.query)
+        # asyncpg expects "ssl" instead of libpq's "sslmode"
+        if "sslmode" in query:
+            query["ssl"] = query.pop("sslmode")
+        parsed = parsed.set(drivername="postgresql+asyncpg", query=query)
+    elif parsed.get_backend_name() == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    return parsed.render_as_string(hide_password=False)
+
+ASYNC_DATABASE_URL = to_async_url(DATABASE_URL)
+
+# Async engine used by the request handlers (asyncpg in production, aiosqlite in tests).
+# Tests open a new event loop per TestClient, so pooled connections are not reused there.
+if os.getenv("TESTING"):
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=NullPool)
+else:
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+
+# expire_on_commit=False: attributes stay readable after commit without an implicit (sync) refresh
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 def get_db():
@@ -23,3 +93,7 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
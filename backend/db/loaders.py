@@ -0,0 +1,74 @@
+from sqlalchemy.orm import selectinload, joinedload
+from models.elderly import Elderly
+from models.caregiver import Caregiver
+
+# Loader strategies that can be chosen per endpoint.
+# - "selectin": one extra SELECT ... WHERE parent_id IN (...) per relationship.
+#   Best for lists, the query count stays constant no matter how many parents are loaded.
+# - "joined": relationships are loaded in the same SELECT using LEFT OUTER JOINs.
+#   Best for a single row with small collections (one round trip).
+LOADER_STRATEGIES = {
+    "selectin": selectinload,
+    "joined": joinedload,
+}
+
+def _loader(strategy: str):
+    """
+    Resolve a loader strategy name to its SQLAlchemy loader function.
+
+    Args:
+        strategy: Name of the loader strategy ("selectin" or "joined")
+
+    Returns:
+        Callable: The SQLAlchemy loader option factory
+
+    Raises:
+        ValueError: If the strategy name is unknown
+    """
+    try:
+        return LOADER_STRATEGIES[strategy]
+    except KeyError:
+        raise ValueError(f"Unknown loader strategy: {strategy}")
+
+def elderly_tree_options(strategy: str = "selectin") -> list:
+    """
+    Loader options that build the whole ElderlySchema tree
+    (tasks, medications and assignments) without lazy loading.
+
+    Args:
+        strategy: Name of the loader strategy ("selectin" or "joined")
+
+    Returns:
+        list: Loader options to pass to Query.options()
+    """
+    loader = _loader(strategy)
+    return [
+        loader(Elderly.tasks),
+        loader(Elderly.medications),
+        loader(Elderly.assignments),
+    ]
+
+def elderly_medications_options(strategy: str = "joined") -> list:
+    """
+    Loader options for endpoints that only need an elderly person's medications.
+
+    Args:
+        strategy: Name of the loader strategy ("selectin" or "joined")
+
+    Returns:
+        list: Loader options to pass to Query.options()
+    """
+    return [_loader(strategy)(Elderly.medications)]
+
+def caregiver_tree_options(strategy: str = "selectin") -> list:
+    """
+    Loader options that build the whole CaregiverResponse tree (assignments)
+    without lazy loading.
+
+    Args:
+        strategy: Name of the loader strategy ("selectin" or "joined")
+
+    Returns:
+        list: Loader options to pass to Query.options()
+    """
+    return [_loader(strategy)(Caregiver.assignments)]
@@ -0,0 +1,70 @@
+import os
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect, text
+from db.database import engine
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+# Revision that matches the schema created by Base.metadata.create_all before migrations existed
+BASELINE_REVISION = "0001"
+
+# Migrations run when a worker starts (see main.py). Set MIGRATE_ON_STARTUP=false to run
+# them as a separate deploy step instead: python -m db.migrate
+MIGRATE_ON_STARTUP = os.getenv("MIGRATE_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+
+# PostgreSQL advisory lock held while migrating, so workers that start at the same time
+# migrate one after the other (the later ones find the schema up to date)
+MIGRATION_LOCK_ID = 72616403
+
+def get_alembic_config(connection=None) -> Config:
+    """
+    Build the Alembic configuration used by the application.
+    
+    Args:
+        connection: Optional open connection for Alembic to run on
+        
+    Returns:
+        Config: Alembic configuration pointing at backend/migrations
+    """
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(os.path.dirname(ALEMBIC_INI), "migrations"))
+    config.attributes["configure_logger"] = False  # Keep the application's logging setup
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+def run_migrations(revision: str = "head"):
+    """
+    Upgrade the database schema to the given revision.
+    
+    Databases created before migrations were introduced (tables exist but
+    there is no alembic_version table) are stamped with the baseline revision
+    first, so only the newer migrations are applied to them. On PostgreSQL
+    concurrent callers (e.g. workers starting together) wait for each other.
+    
+    Args:
+        revision: Target revision (default is "head")
+    """
+    with engine.connect() as connection:
+        postgres = connection.dialect.name == "postgresql"
+        if postgres:
+            # Session-level lock: it outlives the per-migration commits
+            connection.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        try:
+            tables = inspect(connection).get_table_names()
+            config = get_alembic_config(connection)
+            if "alembic_version" not in tables and "users" in tables:
+                command.stamp(config, BASELINE_REVISION)
+            # Alembic runs each migration in its own transaction (some build indexes
+            # outside of one, see 0002), so none may be open here
+            connection.commit()
+            command.upgrade(config, revision)
+        finally:
+            if postgres:
+                connection.rollback()
+                connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+                connection.commit()
+
+if __name__ == "__main__":
+    run_migrations()
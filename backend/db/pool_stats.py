@@ -0,0 +1,67 @@
+import time
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from utils.metrics import Histogram
+
+# Upper bounds (seconds) for the connection checkout wait histogram
+WAIT_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class InstrumentedPoolMixin:
+    """
+    Pool mixin that records how long each checkout waited for a connection
+    and how many checkouts timed out because the pool was exhausted.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_time = Histogram(WAIT_TIME_BUCKETS)
+        self.timeouts = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.wait_time.observe(time.perf_counter() - start)
+
+    def recreate(self):
+        # Keep the collected statistics when the engine is disposed
+        pool = super().recreate()
+        pool.wait_time = self.wait_time
+        pool.timeouts = self.timeouts
+        return pool
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    """QueuePool with checkout statistics (sync engine)."""
+
+class InstrumentedAsyncAdaptedQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool with checkout statistics (async engine)."""
+
+def get_pool_stats(engine) -> dict:
+    """
+    Snapshot of the engine's connection pool.
+    
+    Args:
+        engine: SQLAlchemy engine (pass AsyncEngine.sync_engine for async engines)
+        
+    Returns:
+        dict: Pool configuration, current usage and checkout wait statistics
+    """
+    pool = engine.pool
+    stats = {"pool_class": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+        })
+    if isinstance(pool, InstrumentedPoolMixin):
+        stats["timeouts"] = pool.timeouts
+        stats["wait_time_seconds"] = pool.wait_time.snapshot()
+    return stats
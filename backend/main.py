@@ -1,19 +1,49 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from db.database import Base, engine
-from routes import caregivers, elderly, caregiver_assignments, auth
+from fastapi.concurrency import run_in_threadpool
+from db.migrate import MIGRATE_ON_STARTUP, run_migrations
+from routes import caregivers, elderly, caregiver_assignments, auth, admin, imports, exports
+from utils.pagination import NEXT_CURSOR_HEADER
+from utils.redis_cache import start_invalidation_listener, stop_invalidation_listener
+from utils.metrics import start_metrics_writer, stop_metrics_writer
+from services.cache_warmup_service import CACHE_WARMUP, warm_recent_tenants
+from utils.request_timing import RequestTimingMiddleware, SERVER_TIMING_HEADER, instrument_engine
+from utils.compression import CompressionMiddleware
+from db.database import engine, async_engine
 from dotenv import load_dotenv
 import os
 
 load_dotenv()
 
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Bring the database schema up to date (replaces Base.metadata.create_all). Workers
+    # starting together take turns; with MIGRATE_ON_STARTUP=false a deploy step does it
+    if MIGRATE_ON_STARTUP:
+        await run_in_threadpool(run_migrations)
+    # Keep this worker's in-process cache coherent with the other workers
+    start_invalidation_listener()
+    # Share this worker's metrics with the one that answers the next scrape (METRICS_DIR)
+    start_metrics_writer()
+    # Refill the cache of recently active tenants (after a deploy or a Redis flush)
+    # in the background, so the worker starts serving right away
+    warmup = asyncio.create_task(warm_recent_tenants()) if CACHE_WARMUP else None
+    yield
+    if warmup:
+        warmup.cancel()
+    stop_invalidation_listener()
+    stop_metrics_writer()
 
 app = FastAPI(
     title="Elder Care Management System",
     description="A system for managing caregivers, medications, tasks, and daily operations for elderly individuals.",
     version="1.0.0",
-    redirect_slashes=False  # Disable automatic trailing slash redirects
+    redirect_slashes=False,  # Disable automatic trailing slash redirects
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,  # Renders responses with orjson instead of the stdlib json encoder
 )
 
 # Add CORS middleware
@@ -30,6 +60,7 @@ if "*" in allowed_origins:
         allow_credentials=False,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, SERVER_TIMING_HEADER],
     )
 else:
     app.add_middleware(
@@ -38,12 +69,26 @@ else:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, SERVER_TIMING_HEADER],
     )
 
+# gzip/brotli compression of JSON and other text responses, negotiated with Accept-Encoding
+app.add_middleware(CompressionMiddleware)
+
+# Per-phase request timings (auth, cache, db, serialize) as a Server-Timing header and a
+# log line per request, while REQUEST_TIMING is on. Added last so it times the whole stack.
+app.add_middleware(RequestTimingMiddleware)
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
 app.include_router(caregivers.router, prefix="/caregivers", tags=["caregivers"])
 app.include_router(elderly.router, prefix="/elderly", tags=["elderly"])
 app.include_router(caregiver_assignments.router, prefix="/caregiver-assignments", tags=["caregiver-assignments"])
+app.include_router(imports.router, prefix="/import", tags=["import"])
+app.include_router(exports.router, prefix="/export", tags=["export"])
 app.include_router(auth.router)
+app.include_router(admin.router)
+app.include_router(admin.metrics_router)
 
 @app.get("/")
 def read_root():
@@ -0,0 +1,49 @@
+from logging.config import fileConfig
+from alembic import context
+from db.database import Base, engine
+
+# Import every model so Base.metadata knows about all tables (used by --autogenerate)
+from models import user, elderly, caregiver, caregiver_assignments, task, medication  # noqa: F401
+
+config = context.config
+
+# Skip logging setup when migrations run from the application (see db/migrate.py)
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+def run_migrations_offline():
+    """
+    Run migrations in 'offline' mode (emit SQL to stdout instead of executing it).
+    """
+    context.configure(
+        url=str(engine.url),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    """
+    Run migrations against the application's database engine.
+    Reuses a connection passed in by db/migrate.py when available.
+    """
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(connection=connection, target_metadata=target_metadata, transaction_per_migration=True)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
+    with engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata, transaction_per_migration=True)
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
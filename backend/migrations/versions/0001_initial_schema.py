@@ -0,0 +1,92 @@
+"""Initial schema (tables as created by Base.metadata.create_all before migrations)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# JSONB on PostgreSQL, plain JSON elsewhere (SQLite in tests)
+JSONType = sa.JSON().with_variant(postgresql.JSONB(), "postgresql")
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+        sa.Column("full_name", sa.String()),
+        sa.Column("is_active", sa.Boolean()),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "elderly",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("custom_id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+    )
+    op.create_index("ix_elderly_id", "elderly", ["id"])
+
+    op.create_table(
+        "caregivers",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("custom_id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("bank_name", sa.String(), nullable=False),
+        sa.Column("bank_account", sa.String(), nullable=False),
+        sa.Column("branch_number", sa.String(), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("salary", JSONType),
+        sa.Column("saturday", JSONType),
+        sa.Column("allowance", JSONType),
+        sa.Column("total_bank", sa.Float()),
+    )
+    op.create_index("ix_caregivers_id", "caregivers", ["id"])
+
+    op.create_table(
+        "tasks",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("description", sa.String(), nullable=False),
+        sa.Column("status", sa.String()),
+        sa.Column("elderly_id", sa.Integer(), sa.ForeignKey("elderly.id")),
+    )
+    op.create_index("ix_tasks_id", "tasks", ["id"])
+
+    op.create_table(
+        "medications",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("dosage", sa.String(), nullable=False),
+        sa.Column("frequency", sa.String(), nullable=False),
+        sa.Column("elderly_id", sa.Integer(), sa.ForeignKey("elderly.id", ondelete="CASCADE"), nullable=False),
+    )
+    op.create_index("ix_medications_id", "medications", ["id"])
+
+    op.create_table(
+        "caregiver_assignments",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("caregiver_id", sa.Integer(), sa.ForeignKey("caregivers.id"), nullable=False),
+        sa.Column("elderly_id", sa.Integer(), sa.ForeignKey("elderly.id"), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+    )
+    op.create_index("ix_caregiver_assignments_id", "caregiver_assignments", ["id"])
+
+
+def downgrade():
+    op.drop_table("caregiver_assignments")
+    op.drop_table("medications")
+    op.drop_table("tasks")
+    op.drop_table("caregivers")
+    op.drop_table("elderly")
+    op.drop_table("users")
@@ -0,0 +1,100 @@
+"""Composite (user_id, custom_id) unique indexes and foreign-key indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# Duplicate (user_id, custom_id) groups listed when the unique indexes cannot be created
+MAX_LISTED_DUPLICATES = 20
+
+
+def _check_no_duplicate_custom_ids(table_name: str):
+    """
+    Fail with the conflicting rows if a user has several rows with the same custom_id.
+    The application checked for duplicates before inserting, but concurrent requests
+    could still add them; such rows have to be merged or renumbered by hand.
+    """
+    if op.get_context().as_sql:
+        return  # Offline mode: there are no rows to look at
+    table = sa.table(table_name, sa.column("id"), sa.column("user_id"), sa.column("custom_id"))
+    duplicates = (
+        sa.select(table.c.user_id, table.c.custom_id)
+        .group_by(table.c.user_id, table.c.custom_id)
+        .having(sa.func.count() > 1)
+        .order_by(table.c.user_id, table.c.custom_id)
+        .limit(MAX_LISTED_DUPLICATES)
+        .subquery()
+    )
+    rows = op.get_bind().execute(
+        sa.select(table.c.user_id, table.c.custom_id, table.c.id)
+        .join(duplicates, sa.and_(table.c.user_id == duplicates.c.user_id, table.c.custom_id == duplicates.c.custom_id))
+        .order_by(table.c.user_id, table.c.custom_id, table.c.id)
+    ).all()
+    if not rows:
+        return
+    groups = {}
+    for user_id, custom_id, row_id in rows:
+        groups.setdefault((user_id, custom_id), []).append(str(row_id))
+    listed = "\n".join(
+        f"  user_id={user_id} custom_id={custom_id}: ids {', '.join(ids)}"
+        for (user_id, custom_id), ids in groups.items()
+    )
+    raise RuntimeError(
+        f"Cannot create a unique index on {table_name} (user_id, custom_id): these users have "
+        f"several rows with the same custom_id (first {MAX_LISTED_DUPLICATES} listed). "
+        f"Merge or renumber them, then run the migrations again.\n{listed}"
+    )
+
+
+def _create_index(name: str, table_name: str, columns: list[str], unique: bool = False):
+    if op.get_context().dialect.name != "postgresql":
+        op.create_index(name, table_name, columns, unique=unique)
+        return
+    # CONCURRENTLY does not block writes while the index is built, but it cannot run
+    # inside a transaction. A failed build leaves an invalid index, dropped on the next run.
+    with op.get_context().autocommit_block():
+        op.drop_index(name, table_name=table_name, postgresql_concurrently=True, if_exists=True)
+        op.create_index(name, table_name, columns, unique=unique, postgresql_concurrently=True)
+
+
+def _drop_index(name: str, table_name: str):
+    if op.get_context().dialect.name != "postgresql":
+        op.drop_index(name, table_name=table_name)
+        return
+    with op.get_context().autocommit_block():
+        op.drop_index(name, table_name=table_name, postgresql_concurrently=True)
+
+
+def upgrade():
+    _check_no_duplicate_custom_ids("elderly")
+    _check_no_duplicate_custom_ids("caregivers")
+
+    # Tenant lookups and duplicate custom_id checks filter on (user_id, custom_id).
+    # user_id is the leading column, so these also serve plain user_id filters.
+    _create_index("ix_elderly_user_id_custom_id", "elderly", ["user_id", "custom_id"], unique=True)
+    _create_index("ix_caregivers_user_id_custom_id", "caregivers", ["user_id", "custom_id"], unique=True)
+
+    # Foreign keys used to load nested collections and for tenant filtering
+    _create_index("ix_tasks_elderly_id", "tasks", ["elderly_id"])
+    _create_index("ix_medications_elderly_id", "medications", ["elderly_id"])
+    _create_index("ix_caregiver_assignments_caregiver_id", "caregiver_assignments", ["caregiver_id"])
+    _create_index("ix_caregiver_assignments_elderly_id", "caregiver_assignments", ["elderly_id"])
+    _create_index("ix_caregiver_assignments_user_id", "caregiver_assignments", ["user_id"])
+
+
+def downgrade():
+    _drop_index("ix_caregiver_assignments_user_id", "caregiver_assignments")
+    _drop_index("ix_caregiver_assignments_elderly_id", "caregiver_assignments")
+    _drop_index("ix_caregiver_assignments_caregiver_id", "caregiver_assignments")
+    _drop_index("ix_medications_elderly_id", "medications")
+    _drop_index("ix_tasks_elderly_id", "tasks")
+    _drop_index("ix_caregivers_user_id_custom_id", "caregivers")
+    _drop_index("ix_elderly_user_id_custom_id", "elderly")
@@ -0,0 +1,24 @@
+"""Track the last login of each user
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The most recently active tenants get their cache warmed at startup
+    op.add_column("users", sa.Column("last_login_at", sa.DateTime()))
+    op.create_index("ix_users_last_login_at", "users", ["last_login_at"])
+
+
+def downgrade():
+    op.drop_index("ix_users_last_login_at", table_name="users")
+    op.drop_column("users", "last_login_at")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.dialects.sqlite import JSON as SQLiteJSON
 from db.database import Base
@@ -17,6 +17,10 @@ class Caregiver(Base):
     Each caregiver belongs to a specific user (family/care facility).
     """
     __tablename__ = "caregivers"
+    __table_args__ = (
+        # Tenant lookups and the duplicate custom_id check both filter on (user_id, custom_id)
+        Index("ix_caregivers_user_id_custom_id", "user_id", "custom_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True, index=True)  # Auto-incrementing primary key
     custom_id = Column(Integer, nullable=False)  # User-specified ID (can be same across users)
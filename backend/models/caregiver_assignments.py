@@ -10,9 +10,9 @@ class CaregiverAssignment(Base):
     __tablename__ = "caregiver_assignments"
 
     id = Column(Integer, primary_key=True, index=True)
-    caregiver_id = Column(Integer, ForeignKey("caregivers.id"), nullable=False)  # Links to caregiver
-    elderly_id = Column(Integer, ForeignKey("elderly.id"), nullable=False)  # Links to elderly
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # Links to user who owns this data
+    caregiver_id = Column(Integer, ForeignKey("caregivers.id"), nullable=False, index=True)  # Links to caregiver
+    elderly_id = Column(Integer, ForeignKey("elderly.id"), nullable=False, index=True)  # Links to elderly
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)  # Links to user who owns this data
 
     caregiver = relationship("Caregiver", back_populates="assignments")
     elderly = relationship("Elderly", back_populates="assignments")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from db.database import Base
 
@@ -8,6 +8,10 @@ class Elderly(Base):
     Each elderly person belongs to a specific user (family/care facility).
     """
     __tablename__ = "elderly"
+    __table_args__ = (
+        # Tenant lookups and the duplicate custom_id check both filter on (user_id, custom_id)
+        Index("ix_elderly_user_id_custom_id", "user_id", "custom_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True, index=True)  # Auto-incrementing primary key
     custom_id = Column(Integer, nullable=False)  # User-specified ID (can be same across users)
@@ -8,5 +8,5 @@ class Task(Base):
     id = Column(Integer, primary_key=True, index=True)
     description = Column(String, nullable=False)
     status = Column(String, default="pending")
-    elderly_id = Column(Integer, ForeignKey("elderly.id"))
+    elderly_id = Column(Integer, ForeignKey("elderly.id"), index=True)
     elderly = relationship("Elderly", back_populates="tasks")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy import Column, Integer, String, Boolean, DateTime
 from db.database import Base
 
 class User(Base):
@@ -13,3 +13,4 @@ class User(Base):
     hashed_password = Column(String, nullable=False)  # Encrypted password for security
     full_name = Column(String)  # Display name for the user
     is_active = Column(Boolean, default=True)  # Enable/disable user account
+    last_login_at = Column(DateTime, index=True)  # UTC; picks the tenants whose cache is warmed at startup
@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from db.database import engine, async_engine
+from db.pool_stats import get_pool_stats
+from utils.redis_cache import get_cache_stats
+from utils.metrics import render_prometheus
+from services.auth_service import require_admin
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+# /metrics sits at the conventional path for Prometheus scrapers, behind the same guard
+metrics_router = APIRouter(tags=["admin"], dependencies=[Depends(require_admin)])
+
+@router.get("/pool-stats")
+def pool_stats():
+    """
+    Report the database connection pool state.
+    
+    Requires the X-Admin-Token header (see ADMIN_TOKEN).
+    
+    Returns:
+        dict: For the sync pool (authentication) and the async pool (request
+        handlers): pool size, checked-out and overflow connections, checkout
+        timeouts and a histogram of how long checkouts waited (seconds)
+    """
+    return {
+        "sync": get_pool_stats(engine),
+        "async": get_pool_stats(async_engine.sync_engine),
+    }
+
+@router.get("/cache-stats")
+def cache_stats():
+    """
+    Report hit/miss counters of this worker's cache tiers.
+    
+    Requires the X-Admin-Token header (see ADMIN_TOKEN).
+    
+    Returns:
+        dict: For the in-process L1 cache: whether it is active, hits, misses,
+        current size and capacity; for Redis (L2): availability, hits and misses
+    """
+    return get_cache_stats()
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Expose the metrics in the Prometheus text format: of all workers with
+    METRICS_DIR set, otherwise of this worker (labelled with its PID).
+    
+    Requires the X-Admin-Token header (see ADMIN_TOKEN).
+    
+    Returns:
+        PlainTextResponse: Request latency per route, SQL statements and time per
+        request, cache lookups per key family and result, PDF render and bcrypt durations
+    """
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header
-from sqlalchemy.orm import Session
-from db.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.database import get_async_db
 from services.auth_service import login_user, create_user, get_current_user
 from models.user import User
 from schemas.auth import RegisterRequest, LoginRequest, LoginResponse, UserResponse
@@ -8,16 +8,16 @@ from schemas.auth import RegisterRequest, LoginRequest, LoginResponse, UserRespo
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
 @router.post("/register", response_model=UserResponse)
-def register_user(
+async def register_user(
     register_data: RegisterRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Register a new user account.
     
     Args:
         register_data: RegisterRequest containing email, password, and full_name
-        db: Database session
+        db: Async database session
         
     Returns:
         UserResponse: The created user information
@@ -25,24 +25,30 @@ def register_user(
     Raises:
         HTTPException: If user already exists
     """
-    return create_user(email=register_data.email, password=register_data.password, full_name=register_data.full_name, db=db)
+    return await create_user(email=register_data.email, password=register_data.password, full_name=register_data.full_name, db=db)
 
 @router.post("/login", response_model=LoginResponse)
-def login(login_data: LoginRequest, db: Session = Depends(get_db)):
+async def login(login_data: LoginRequest, request: Request, db: AsyncSession = Depends(get_async_db)):
     """
     Authenticate user and return JWT token.
     
+    Password verification runs in a dedicated process pool, so a burst of
+    logins does not stall other endpoints. Repeated failures for the same
+    email or client IP are answered with 429 and a Retry-After header.
+    
     Args:
         login_data: LoginRequest containing email and password
-        db: Database session
+        request: The incoming request (used for the client IP)
+        db: Async database session
         
     Returns:
         LoginResponse: Contains access token and user information
         
     Raises:
-        HTTPException: If authentication fails
+        HTTPException: If authentication fails or too many attempts failed
     """
-    return login_user(login_data=login_data, db=db)
+    client_ip = request.client.host if request.client else None
+    return await login_user(login_data=login_data, db=db, client_ip=client_ip)
 
 @router.get("/me", response_model=UserResponse)
 def get_current_user_info(current_user: User = Depends(get_current_user)):
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from db.database import get_db
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.database import get_async_db
 from models.caregiver import Caregiver  
 from models.elderly import Elderly 
 from models.caregiver_assignments import CaregiverAssignment
@@ -9,19 +10,21 @@ from schemas.caregiver_assignment import CaregiverAssignmentCreate, CaregiverAss
 from services.caregiver_assignment_service import (
     create_assignment_service,
     get_all_assignments_service,
+    get_assignments_page_service,
     delete_assignment_service
 )
 from services.auth_service import get_current_user
+from utils.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, set_next_cursor_header
 
 router = APIRouter()
 
 # ==================== CAREGIVER ASSIGNMENT OPERATIONS ====================
 
 @router.post("/", response_model=CaregiverAssignmentResponse)
-def create_assignment(
+async def create_assignment(
     assignment: CaregiverAssignmentCreate, 
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create a new caregiver assignment for the current user.
@@ -31,7 +34,7 @@ def create_assignment(
     
     Args:
         assignment: CaregiverAssignmentCreate schema containing assignment data
-        db: Database session (injected by FastAPI)
+        db: Async database session (injected by FastAPI)
         current_user: Current authenticated user (injected by FastAPI)
         
     Returns:
@@ -40,12 +43,14 @@ def create_assignment(
     Raises:
         HTTPException: If caregiver or elderly not found, or assignment already exists
     """
-    return create_assignment_service(assignment, current_user.id, db)
+    return await create_assignment_service(assignment, current_user.id, db)
 
 @router.get("/", response_model=list[CaregiverAssignmentResponse])
-def get_all_assignments(
+async def get_all_assignments(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="Page size (enables pagination)"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Retrieve all caregiver assignments for the current user.
@@ -54,21 +59,41 @@ def get_all_assignments(
     - First request: Data fetched from database and cached
     - Subsequent requests: Data served from Redis cache
     - Cache TTL: 300 seconds (5 minutes)
+    - The cached JSON body is sent as is, without re-validating the models
+    
+    Pagination (optional):
+    - Without "limit" and "cursor" the whole collection is returned (legacy behaviour)
+    - With "limit" (and later "cursor") one page is returned, ordered by ID
+    - The cursor for the next page is sent in the "X-Next-Cursor" response header
+      (the header is absent on the last page)
+    - Every page is cached separately
     
     Args:
-        db: Database session (injected by FastAPI)
+        limit: Maximum number of assignments per page
+        cursor: Cursor of the page to fetch
+        db: Async database session (injected by FastAPI)
         current_user: Current authenticated user (injected by FastAPI)
         
     Returns:
-        list[CaregiverAssignmentResponse]: List of all assignments for the current user
+        list[CaregiverAssignmentResponse]: List of all assignments for the current user (or one page of them)
+        
+    Raises:
+        HTTPException: If the cursor is malformed
     """
-    return get_all_assignments_service(current_user.id, db)
+    if limit is None and cursor is None:
+        body = await get_all_assignments_service(current_user.id, db, as_json=True)
+        return Response(content=body, media_type="application/json")
+
+    body, next_cursor = await get_assignments_page_service(current_user.id, db, limit or DEFAULT_PAGE_LIMIT, cursor, as_json=True)
+    response = Response(content=body, media_type="application/json")
+    set_next_cursor_header(response, next_cursor)
+    return response
 
 @router.delete("/{assignment_id}")
-def delete_assignment(
+async def delete_assignment(
     assignment_id: int, 
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete a caregiver assignment for the current user.
@@ -78,7 +103,7 @@ def delete_assignment(
     
     Args:
         assignment_id: ID of the assignment to delete
-        db: Database session (injected by FastAPI)
+        db: Async database session (injected by FastAPI)
         current_user: Current authenticated user (injected by FastAPI)
         
     Returns:
@@ -87,4 +112,4 @@ def delete_assignment(
     Raises:
         HTTPException: If assignment not found or doesn't belong to current user
     """
-    return delete_assignment_service(assignment_id, current_user.id, db)
+    return await delete_assignment_service(assignment_id, current_user.id, db)
@@ -1,31 +1,39 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from fastapi.responses import FileResponse
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.caregiver import Caregiver
 from models.caregiver_assignments import CaregiverAssignment
 from models.user import User
-from schemas.caregiver import CaregiverCreate, CaregiverUpdateSalary, CaregiverResponse
-from db.database import get_db
-from utils.pdf_generator import generate_caregiver_pdf
+from schemas.caregiver import CaregiverCreate, CaregiverUpdateSalary, CaregiverResponse, CaregiverReportBatchRequest
+from db.database import get_async_db
+from utils.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, set_next_cursor_header
+from utils.etags import view_etag, etag_headers, not_modified
+from utils.cache_tags import tenant_tag, caregiver_tag
 from services.caregiver_service import (
     add_caregiver_service,
     get_all_caregivers_service,
+    get_caregivers_page_service,
     get_caregiver_by_id_service,
     update_caregiver_salary_service,
     generate_caregiver_pdf_service,
+    generate_caregiver_reports_batch_service,
     delete_caregiver_service
 )
 from services.auth_service import get_current_user
 
 router = APIRouter()
 
+# Nested collections that can be requested with ?include= on the list endpoint
+CAREGIVER_INCLUDES = {"assignments"}
+
 # ==================== CAREGIVER CRUD OPERATIONS ====================
 
 @router.post("/", response_model=CaregiverResponse)
-def add_caregiver(
+async def add_caregiver(
     caregiver: CaregiverCreate, 
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create a new caregiver.
@@ -35,7 +43,7 @@ def add_caregiver(
     
     Args:
         caregiver: CaregiverCreate schema containing caregiver data
-        db: Database session (injected by FastAPI)
+        db: Async database session (injected by FastAPI)
         current_user: Current authenticated user (injected by FastAPI)
         
     Returns:
@@ -44,12 +52,19 @@ def add_caregiver(
     Raises:
         HTTPException: If caregiver with same ID already exists
     """
-    return add_caregiver_service(caregiver, current_user.id, db)
+    return await add_caregiver_service(caregiver, current_user.id, db)
 
-@router.get("/", response_model=list[CaregiverResponse])
-def get_caregivers(
+@router.get("/", response_model=list[CaregiverResponse], response_model_exclude_unset=True)
+async def get_caregivers(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="Page size (enables pagination)"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    include: str = Query(
+        "assignments",
+        description="Comma-separated nested collections to include. Pass an empty value to skip them."
+    ),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Retrieve all caregivers for the current user.
@@ -58,21 +73,64 @@ def get_caregivers(
     - First request: Data fetched from database and cached
     - Subsequent requests: Data served from Redis cache
     - Cache TTL: 300 seconds (5 minutes)
+    - The cached JSON body is sent as is, without re-validating the models
+    - Every response carries an ETag (while Redis is available)
+    - Requests with a matching If-None-Match header get 304 Not Modified,
+      without loading the caregivers
+    
+    Nested assignments are included by default. List screens that only show
+    names and totals can call "/caregivers/?include=" to skip them, which
+    avoids loading assignments and shrinks the response.
+    
+    Pagination (optional):
+    - Without "limit" and "cursor" the whole collection is returned (legacy behaviour)
+    - With "limit" (and later "cursor") one page is returned, ordered by ID
+    - The cursor for the next page is sent in the "X-Next-Cursor" response header
+      (the header is absent on the last page)
+    - Every page is cached separately
     
     Args:
-        db: Database session (injected by FastAPI)
+        request: The incoming request (used for If-None-Match)
+        limit: Maximum number of caregivers per page
+        cursor: Cursor of the page to fetch
+        include: Comma-separated nested collections to include
+        db: Async database session (injected by FastAPI)
         current_user: Current authenticated user (injected by FastAPI)
         
     Returns:
-        list[CaregiverResponse]: List of all caregivers for the current user
+        list[CaregiverResponse]: List of all caregivers for the current user (or one page of them),
+        or 304 if the client's copy is current
+        
+    Raises:
+        HTTPException: If an unknown collection is requested or the cursor is malformed
     """
-    return get_all_caregivers_service(current_user.id, db)
+    includes = {field.strip() for field in include.split(",") if field.strip()}
+    unknown = includes - CAREGIVER_INCLUDES
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown include: {', '.join(sorted(unknown))}")
+    include_assignments = "assignments" in includes
+    etag = await view_etag(request, current_user.id, [tenant_tag(current_user.id, "caregivers")])
+    response = not_modified(request, etag)
+    if response is not None:
+        return response
+
+    if limit is None and cursor is None:
+        body = await get_all_caregivers_service(current_user.id, db, include_assignments=include_assignments, as_json=True)
+        return Response(content=body, media_type="application/json", headers=etag_headers(etag))
+
+    body, next_cursor = await get_caregivers_page_service(
+        current_user.id, db, limit or DEFAULT_PAGE_LIMIT, cursor, include_assignments=include_assignments, as_json=True
+    )
+    response = Response(content=body, media_type="application/json", headers=etag_headers(etag))
+    set_next_cursor_header(response, next_cursor)
+    return response
 
 @router.get("/{caregiver_id}", response_model=CaregiverResponse)
-def get_caregiver_by_id(
+async def get_caregiver_by_id(
     caregiver_id: int, 
+    request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Retrieve a specific caregiver by ID (for current user only).
@@ -81,26 +139,36 @@ def get_caregiver_by_id(
     - First request: Data fetched from database and cached
     - Subsequent requests: Data served from Redis cache
     - Cache TTL: 300 seconds (5 minutes)
+    - The cached JSON body is sent as is, without re-validating the models
+    - Every response carries an ETag (while Redis is available)
+    - Requests with a matching If-None-Match header get 304 Not Modified,
+      without loading the caregiver
     
     Args:
         caregiver_id: ID of the caregiver to retrieve
-        db: Database session (injected by FastAPI)
+        request: The incoming request (used for If-None-Match)
+        db: Async database session (injected by FastAPI)
         current_user: Current authenticated user (injected by FastAPI)
         
     Returns:
-        CaregiverResponse: The caregiver data
+        CaregiverResponse: The caregiver data, or 304 if the client's copy is current
         
     Raises:
         HTTPException: If caregiver not found or doesn't belong to current user
     """
-    return get_caregiver_by_id_service(caregiver_id, current_user.id, db)
+    etag = await view_etag(request, current_user.id, [caregiver_tag(caregiver_id)])
+    response = not_modified(request, etag)
+    if response is not None:
+        return response
+    body = await get_caregiver_by_id_service(caregiver_id, current_user.id, db, as_json=True)
+    return Response(content=body, media_type="application/json", headers=etag_headers(etag))
 
 @router.put("/{id}/update-salary", response_model=CaregiverResponse)
-def update_salary(
+async def update_salary(
     id: int, 
     salary_update: CaregiverUpdateSalary, 
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update caregiver salary information (for current user only).
@@ -111,7 +179,7 @@ def update_salary(
     Args:
         id: ID of the caregiver to update
         salary_update: CaregiverUpdateSalary schema containing salary data
-        db: Database session (injected by FastAPI)
+        db: Async database session (injected by FastAPI)
         current_user: Current authenticated user (injected by FastAPI)
         
     Returns:
@@ -120,13 +188,14 @@ def update_salary(
     Raises:
         HTTPException: If caregiver not found or doesn't belong to current user
     """
-    return update_caregiver_salary_service(id, salary_update, current_user.id, db)
+    return await update_caregiver_salary_service(id, salary_update, current_user.id, db)
 
 @router.get("/{id}/generate-pdf")
-def generate_pdf_for_caregiver(
+async def generate_pdf_for_caregiver(
     id: int, 
+    request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Generate PDF for a specific caregiver (for current user only).
@@ -134,25 +203,74 @@ def generate_pdf_for_caregiver(
     This endpoint uses Redis caching for improved performance.
     Caregiver data is retrieved from cache if available.
     
+    The PDF is rendered in memory and cached by content (Redis, or local disk
+    without Redis), so it is only rendered again when the report changes.
+    - Every response carries an ETag
+    - Requests with a matching If-None-Match header get 304 Not Modified
+    
     Args:
         id: ID of the caregiver
-        db: Database session (injected by FastAPI)
+        request: The incoming request (used for If-None-Match)
+        db: Async database session (injected by FastAPI)
         current_user: Current authenticated user (injected by FastAPI)
         
     Returns:
-        FileResponse: The generated PDF file
+        Response: The PDF as an attachment, or 304 if the client's copy is current
         
     Raises:
         HTTPException: If caregiver not found or doesn't belong to current user
     """
-    filename = generate_caregiver_pdf_service(id, current_user.id, db)
-    return FileResponse(filename, media_type="application/pdf", filename=filename)
+    filename, etag, pdf = await generate_caregiver_pdf_service(
+        id, current_user.id, db, if_none_match=request.headers.get("if-none-match")
+    )
+    # private: the report contains bank details; no-cache: revalidate with the ETag every time
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if pdf is None:
+        return Response(status_code=304, headers=headers)
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return Response(content=pdf, media_type="application/pdf", headers=headers)
+
+@router.post("/reports/batch")
+async def generate_reports_batch(
+    batch: CaregiverReportBatchRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Generate the salary reports of all (or selected) caregivers in one request.
+    
+    Reports are rendered in parallel worker processes and streamed back:
+    - format "zip" (default): one PDF per caregiver, cached reports are reused
+    - format "pdf": a single PDF with one page per caregiver
+    
+    Args:
+        batch: CaregiverReportBatchRequest with optional caregiver IDs and the output format
+        db: Async database session (injected by FastAPI)
+        current_user: Current authenticated user (injected by FastAPI)
+        
+    Returns:
+        StreamingResponse: The ZIP archive or PDF as an attachment
+        
+    Raises:
+        HTTPException: If a requested caregiver is not found or the user has no caregivers
+    """
+    filename, media_type, body = await generate_caregiver_reports_batch_service(
+        current_user.id, db, batch.caregiver_ids, batch.format
+    )
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Cache-Control": "private, no-store",  # Contains bank details
+        },
+    )
 
 @router.delete("/{id}")
-def delete_caregiver(
+async def delete_caregiver(
     id: int, 
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete a caregiver by ID (for current user only).
@@ -162,7 +280,7 @@ def delete_caregiver(
     
     Args:
         id: ID of the caregiver to delete
-        db: Database session (injected by FastAPI)
+        db: Async database session (injected by FastAPI)
         current_user: Current authenticated user (injected by FastAPI)
         
     Returns:
@@ -171,4 +289,4 @@ def delete_caregiver(
     Raises:
         HTTPException: If caregiver not found or doesn't belong to current user
     """
-    return delete_caregiver_service(id, current_user.id, db)
+    return await delete_caregiver_service(id, current_user.id, db)
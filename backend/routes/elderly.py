@@ -1,25 +1,32 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.elderly import Elderly
 from models.task import Task
 from models.medication import Medication
 from models.caregiver_assignments import CaregiverAssignment
 from models.user import User
 from schemas.medication import MedicationCreate, MedicationResponse
-from schemas.elderly import ElderlySchema, ElderlyCreate
+from schemas.elderly import ElderlySchema, ElderlyCreate, ElderlyBulkCreate, TaskBulkCreate, MedicationBulkCreate
 from schemas.task import TaskSchema, TaskCreate
-from db.database import get_db
-from utils.redis_cache import get_from_cache, set_in_cache, delete_from_cache
+from db.database import get_async_db
+from utils.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, set_next_cursor_header
+from utils.etags import view_etag, etag_headers, not_modified
+from utils.cache_tags import tenant_tag, elderly_tag
 from services.auth_service import get_current_user
 from services.elderly_service import (
     get_all_elderly_service, 
+    get_elderly_page_service,
     add_elderly_service, 
+    add_elderly_bulk_service,
     delete_elderly_service,
     get_elderly_by_id_service,
     add_task_to_elderly_service,
+    add_tasks_bulk_service,
     delete_task_from_elderly_service,
     update_task_status_service,
     add_medication_to_elderly_service,
+    add_medications_bulk_service,
     get_medications_for_elderly_service,
     delete_medication_from_elderly_service
 )
@@ -29,10 +36,10 @@ router = APIRouter()
 # ==================== ELDERLY CRUD OPERATIONS ====================
 
 @router.post("/", response_model=ElderlySchema)
-def add_elderly(
+async def add_elderly(
     elderly: ElderlyCreate, 
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create a new elderly person.
@@ -42,7 +49,7 @@ def add_elderly(
     
     Args:
         elderly: ElderlyCreate schema containing elderly data
-        db: Database session (injected by FastAPI)
+        db: Async database session (injected by FastAPI)
         
     Returns:
         ElderlySchema: The created elderly person
@@ -50,12 +57,40 @@ def add_elderly(
     Raises:
         HTTPException: If elderly with same ID already exists
     """
-    return add_elderly_service(elderly, current_user.id, db)
+    return await add_elderly_service(elderly, current_user.id, db)
+
+@router.post("/bulk", response_model=list[ElderlySchema])
+async def add_elderly_bulk(
+    elderly_list: ElderlyBulkCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Create many elderly persons in one request (up to 1000), all or none.
+    
+    The whole batch is validated first; custom_id conflicts are checked with one
+    query and the rows are inserted in a single transaction, with one cache
+    invalidation for the batch.
+    
+    Args:
+        elderly_list: List of ElderlyCreate schemas
+        db: Async database session (injected by FastAPI)
+        
+    Returns:
+        list[ElderlySchema]: The created elderly persons, in request order
+        
+    Raises:
+        HTTPException: If a custom_id is repeated in the batch or already exists
+    """
+    return await add_elderly_bulk_service(elderly_list, current_user.id, db)
 
 @router.get("/", response_model=list[ElderlySchema])
-def get_all_elderly(
+async def get_all_elderly(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="Page size (enables pagination)"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Retrieve all elderly persons.
@@ -64,20 +99,50 @@ def get_all_elderly(
     - First request: Data fetched from database and cached
     - Subsequent requests: Data served from Redis cache
     - Cache TTL: 300 seconds (5 minutes)
+    - The cached JSON body is sent as is, without re-validating the models
+    - Every response carries an ETag (while Redis is available)
+    - Requests with a matching If-None-Match header get 304 Not Modified,
+      without loading the elderly persons
+    
+    Pagination (optional):
+    - Without "limit" and "cursor" the whole collection is returned (legacy behaviour)
+    - With "limit" (and later "cursor") one page is returned, ordered by ID
+    - The cursor for the next page is sent in the "X-Next-Cursor" response header
+      (the header is absent on the last page)
+    - Every page is cached separately
     
     Args:
-        db: Database session (injected by FastAPI)
+        request: The incoming request (used for If-None-Match)
+        limit: Maximum number of elderly persons per page
+        cursor: Cursor of the page to fetch
+        db: Async database session (injected by FastAPI)
         
     Returns:
-        list[ElderlySchema]: List of all elderly persons
+        list[ElderlySchema]: List of all elderly persons (or one page of them), or 304 if the client's copy is current
+        
+    Raises:
+        HTTPException: If the cursor is malformed
     """
-    return get_all_elderly_service(current_user.id, db)
+    etag = await view_etag(request, current_user.id, [tenant_tag(current_user.id, "elderly")])
+    response = not_modified(request, etag)
+    if response is not None:
+        return response
+
+    if limit is None and cursor is None:
+        body = await get_all_elderly_service(current_user.id, db, as_json=True)
+        return Response(content=body, media_type="application/json", headers=etag_headers(etag))
+
+    body, next_cursor = await get_elderly_page_service(current_user.id, db, limit or DEFAULT_PAGE_LIMIT, cursor, as_json=True)
+    response = Response(content=body, media_type="application/json", headers=etag_headers(etag))
+    set_next_cursor_header(response, next_cursor)
+    return response
 
 @router.get("/{elderly_id}", response_model=ElderlySchema)
-def get_elderly_by_id(
+async def get_elderly_by_id(
     elderly_id: int, 
+    request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Retrieve a specific elderly person by ID.
@@ -86,24 +151,34 @@ def get_elderly_by_id(
     - First request: Data fetched from database and cached
     - Subsequent requests: Data served from Redis cache
     - Cache TTL: 300 seconds (5 minutes)
+    - The cached JSON body is sent as is, without re-validating the models
+    - Every response carries an ETag (while Redis is available)
+    - Requests with a matching If-None-Match header get 304 Not Modified,
+      without loading the elderly person
     
     Args:
         elderly_id: ID of the elderly person to retrieve
-        db: Database session (injected by FastAPI)
+        request: The incoming request (used for If-None-Match)
+        db: Async database session (injected by FastAPI)
         
     Returns:
-        ElderlySchema: The elderly person data
+        ElderlySchema: The elderly person data, or 304 if the client's copy is current
         
     Raises:
         HTTPException: If elderly person not found
     """
-    return get_elderly_by_id_service(elderly_id, current_user.id, db)
+    etag = await view_etag(request, current_user.id, [elderly_tag(elderly_id)])
+    response = not_modified(request, etag)
+    if response is not None:
+        return response
+    body = await get_elderly_by_id_service(elderly_id, current_user.id, db, as_json=True)
+    return Response(content=body, media_type="application/json", headers=etag_headers(etag))
 
 @router.delete("/{elderly_id}")
-def delete_elderly(
+async def delete_elderly(
     elderly_id: int, 
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete an elderly person by ID.
@@ -113,7 +188,7 @@ def delete_elderly(
     
     Args:
         elderly_id: ID of the elderly person to delete
-        db: Database session (injected by FastAPI)
+        db: Async database session (injected by FastAPI)
         
     Returns:
         dict: Success message
@@ -121,16 +196,16 @@ def delete_elderly(
     Raises:
         HTTPException: If elderly person not found
     """
-    return delete_elderly_service(elderly_id, current_user.id, db)
+    return await delete_elderly_service(elderly_id, current_user.id, db)
 
 # ==================== TASK OPERATIONS ====================
 
 @router.post("/{elderly_id}/tasks", response_model=TaskSchema)
-def add_task_to_elderly(
+async def add_task_to_elderly(
     elderly_id: int, 
     task: TaskCreate, 
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Add a new task for an elderly person.
@@ -141,7 +216,7 @@ def add_task_to_elderly(
     Args:
         elderly_id: ID of the elderly person
         task: TaskCreate schema containing task data
-        db: Database session (injected by FastAPI)
+        db: Async database session (injected by FastAPI)
         
     Returns:
         TaskSchema: The created task
@@ -149,14 +224,39 @@ def add_task_to_elderly(
     Raises:
         HTTPException: If elderly person not found
     """
-    return add_task_to_elderly_service(elderly_id, task, current_user.id, db)
+    return await add_task_to_elderly_service(elderly_id, task, current_user.id, db)
+
+@router.post("/{elderly_id}/tasks/bulk", response_model=list[TaskSchema])
+async def add_tasks_bulk(
+    elderly_id: int, 
+    tasks: TaskBulkCreate, 
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Add many tasks for an elderly person in one request (up to 1000), all or none.
+    
+    The tasks are inserted in a single transaction, with one cache invalidation.
+    
+    Args:
+        elderly_id: ID of the elderly person
+        tasks: List of TaskCreate schemas
+        db: Async database session (injected by FastAPI)
+        
+    Returns:
+        list[TaskSchema]: The created tasks, ordered by ID
+        
+    Raises:
+        HTTPException: If elderly person not found
+    """
+    return await add_tasks_bulk_service(elderly_id, tasks, current_user.id, db)
 
 @router.delete("/{elderly_id}/tasks/{task_id}")
-def delete_task_from_elderly(
+async def delete_task_from_elderly(
     elderly_id: int, 
     task_id: int, 
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete a task for an elderly person.
@@ -167,7 +267,7 @@ def delete_task_from_elderly(
     Args:
         elderly_id: ID of the elderly person
         task_id: ID of the task to delete
-        db: Database session (injected by FastAPI)
+        db: Async database session (injected by FastAPI)
         
     Returns:
         dict: Success message
@@ -175,15 +275,15 @@ def delete_task_from_elderly(
     Raises:
         HTTPException: If task not found
     """
-    return delete_task_from_elderly_service(elderly_id, task_id, current_user.id, db)
+    return await delete_task_from_elderly_service(elderly_id, task_id, current_user.id, db)
 
 @router.put("/{elderly_id}/tasks/{task_id}/status", response_model=TaskSchema)
-def update_task_status(
+async def update_task_status(
     elderly_id: int, 
     task_id: int, 
     new_status: str, 
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update the status of a task for an elderly person.
@@ -195,7 +295,7 @@ def update_task_status(
         elderly_id: ID of the elderly person
         task_id: ID of the task to update
         new_status: New status for the task
-        db: Database session (injected by FastAPI)
+        db: Async database session (injected by FastAPI)
         
     Returns:
         TaskSchema: The updated task
@@ -203,16 +303,16 @@ def update_task_status(
     Raises:
         HTTPException: If task not found
     """
-    return update_task_status_service(elderly_id, task_id, new_status, current_user.id, db)
+    return await update_task_status_service(elderly_id, task_id, new_status, current_user.id, db)
 
 # ==================== MEDICATION OPERATIONS ====================
 
 @router.post("/{elderly_id}/medications", response_model=MedicationResponse)
-def add_medication_to_elderly(
+async def add_medication_to_elderly(
     elderly_id: int, 
     medication: MedicationCreate, 
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Add a new medication for an elderly person.
@@ -223,7 +323,7 @@ def add_medication_to_elderly(
     Args:
         elderly_id: ID of the elderly person
         medication: MedicationCreate schema containing medication data
-        db: Database session (injected by FastAPI)
+        db: Async database session (injected by FastAPI)
         
     Returns:
         MedicationResponse: The created medication
@@ -231,13 +331,39 @@ def add_medication_to_elderly(
     Raises:
         HTTPException: If elderly person not found
     """
-    return add_medication_to_elderly_service(elderly_id, medication, current_user.id, db)
+    return await add_medication_to_elderly_service(elderly_id, medication, current_user.id, db)
+
+@router.post("/{elderly_id}/medications/bulk", response_model=list[MedicationResponse])
+async def add_medications_bulk(
+    elderly_id: int, 
+    medications: MedicationBulkCreate, 
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Add many medications for an elderly person in one request (up to 1000), all or none.
+    
+    The medications are inserted in a single transaction, with one cache invalidation.
+    
+    Args:
+        elderly_id: ID of the elderly person
+        medications: List of MedicationCreate schemas
+        db: Async database session (injected by FastAPI)
+        
+    Returns:
+        list[MedicationResponse]: The created medications, ordered by ID
+        
+    Raises:
+        HTTPException: If elderly person not found
+    """
+    return await add_medications_bulk_service(elderly_id, medications, current_user.id, db)
 
 @router.get("/{elderly_id}/medications", response_model=list[MedicationResponse])
-def get_medications_for_elderly(
+async def get_medications_for_elderly(
     elderly_id: int, 
+    request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Retrieve all medications for an elderly person.
@@ -246,25 +372,35 @@ def get_medications_for_elderly(
     - First request: Data fetched from database and cached
     - Subsequent requests: Data served from Redis cache
     - Cache TTL: 300 seconds (5 minutes)
+    - The cached JSON body is sent as is, without re-validating the models
+    - Every response carries an ETag (while Redis is available)
+    - Requests with a matching If-None-Match header get 304 Not Modified,
+      without loading the medications
     
     Args:
         elderly_id: ID of the elderly person
-        db: Database session (injected by FastAPI)
+        request: The incoming request (used for If-None-Match)
+        db: Async database session (injected by FastAPI)
         
     Returns:
-        list[MedicationResponse]: List of medications for the elderly person
+        list[MedicationResponse]: List of medications for the elderly person, or 304 if the client's copy is current
         
     Raises:
         HTTPException: If elderly person not found
     """
-    return get_medications_for_elderly_service(elderly_id, current_user.id, db)
+    etag = await view_etag(request, current_user.id, [elderly_tag(elderly_id)])
+    response = not_modified(request, etag)
+    if response is not None:
+        return response
+    body = await get_medications_for_elderly_service(elderly_id, current_user.id, db, as_json=True)
+    return Response(content=body, media_type="application/json", headers=etag_headers(etag))
 
 @router.delete("/{elderly_id}/medications/{medication_id}")
-def delete_medication_from_elderly(
+async def delete_medication_from_elderly(
     elderly_id: int, 
     medication_id: int, 
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete a medication for an elderly person.
@@ -275,7 +411,7 @@ def delete_medication_from_elderly(
     Args:
         elderly_id: ID of the elderly person
         medication_id: ID of the medication to delete
-        db: Database session (injected by FastAPI)
+        db: Async database session (injected by FastAPI)
         
     Returns:
         dict: Success message with medication name
@@ -283,4 +419,4 @@ def delete_medication_from_elderly(
     Raises:
         HTTPException: If medication not found
     """
-    return delete_medication_from_elderly_service(elderly_id, medication_id, current_user.id, db)
+    return await delete_medication_from_elderly_service(elderly_id, medication_id, current_user.id, db)
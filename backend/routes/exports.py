@@ -0,0 +1,46 @@
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from models.user import User
+from services.auth_service import get_current_user
+from services.export_service import export_service
+
+router = APIRouter()
+
+@router.get("")  # GET /export
+async def export_data(
+    format: Literal["ndjson", "csv", "parquet"] = "ndjson",
+    entity: Optional[Literal["elderly", "tasks", "medications", "caregivers", "assignments"]] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Download the current user's data, e.g. for backups or analytics.
+    
+    - format "ndjson" (default): one JSON object per line; without an entity,
+      all entities are exported with their name in a "type" field
+    - format "csv": one entity with a header row
+    - format "parquet": one entity as a columnar Parquet file
+    
+    The data is streamed from a server-side cursor in batches, so exports of
+    large tenants (millions of tasks) use constant memory.
+    
+    Args:
+        format: "ndjson", "csv" or "parquet"
+        entity: Entity to export (all of them if omitted; NDJSON only)
+        current_user: Current authenticated user (injected by FastAPI)
+        
+    Returns:
+        StreamingResponse: The export as an attachment
+        
+    Raises:
+        HTTPException: If CSV or Parquet is requested without an entity
+    """
+    filename, media_type, body = await export_service(current_user.id, format, entity)
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Cache-Control": "private, no-store",  # Contains bank details
+        },
+    )
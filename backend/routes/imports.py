@@ -0,0 +1,41 @@
+from typing import Literal
+from fastapi import APIRouter, Depends, File, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.user import User
+from schemas.imports import ImportReport
+from db.database import get_async_db
+from services.auth_service import get_current_user
+from services.import_service import import_csv_service
+
+router = APIRouter()
+
+@router.post("/{kind}", response_model=ImportReport)
+async def import_csv(
+    kind: Literal["elderly", "caregivers"],
+    file: UploadFile = File(..., description="UTF-8 CSV file with a header row"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Import elderly persons or caregivers from a CSV file (e.g. a spreadsheet export).
+    
+    The header row names the columns of ElderlyCreate ("custom_id,name") or
+    CaregiverCreate ("custom_id,name,bank_name,bank_account,branch_number");
+    other columns are ignored. Rows are validated and saved in batches (COPY on
+    PostgreSQL), so files with many thousands of rows use constant memory.
+    Invalid rows and rows whose custom_id already exists are skipped and
+    reported; the other rows are imported.
+    
+    Args:
+        kind: "elderly" or "caregivers"
+        file: The CSV file (multipart upload)
+        db: Async database session (injected by FastAPI)
+        current_user: Current authenticated user (injected by FastAPI)
+        
+    Returns:
+        ImportReport: Rows imported and failed, with the errors of the first failed rows
+        
+    Raises:
+        HTTPException: If the file is empty, not UTF-8 CSV, or misses a required column
+    """
+    return await import_csv_service(kind, file.file, current_user.id, db)
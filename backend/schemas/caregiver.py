@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Dict,List
+from typing import Dict, List, Literal, Optional
 from schemas.caregiver_assignment import CaregiverAssignmentResponse
 
 class CaregiverCreate(BaseModel):
@@ -20,7 +20,8 @@ class CaregiverUpdateSalary(BaseModel):
     allowance_amount: int
 
 
-class CaregiverResponse(BaseModel):
+# Caregiver data without nested collections (used by list screens)
+class CaregiverSummary(BaseModel):
     id: int
     custom_id: int  # User-specified ID
     name: str
@@ -32,6 +33,14 @@ class CaregiverResponse(BaseModel):
     saturday: Dict[str, float]
     allowance: Dict[str, float]
     total_bank: float
-    assignments: List[CaregiverAssignmentResponse] = []
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class CaregiverResponse(CaregiverSummary):
+    assignments: List[CaregiverAssignmentResponse] = []
+
+
+class CaregiverReportBatchRequest(BaseModel):
+    caregiver_ids: Optional[List[int]] = None  # Caregivers to include (all of the user's caregivers if omitted)
+    format: Literal["zip", "pdf"] = "zip"  # One PDF per caregiver in a ZIP, or a single multi-page PDF
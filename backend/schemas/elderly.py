@@ -1,7 +1,7 @@
-from pydantic import BaseModel, ConfigDict
-from typing import List
-from schemas.task import TaskSchema
-from schemas.medication import MedicationResponse
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Annotated, List
+from schemas.task import TaskSchema, TaskCreate
+from schemas.medication import MedicationResponse, MedicationCreate
 from schemas.caregiver_assignment import CaregiverAssignmentResponse
 
 class ElderlySchema(BaseModel):
@@ -19,3 +19,10 @@ class ElderlyCreate(BaseModel):
     custom_id: int  # User-specified ID (can be same across users)
     name: str
     # user_id is automatically added by backend from logged-in user
+
+# Request bodies of the bulk endpoints (POST /elderly/bulk, /elderly/{id}/tasks/bulk,
+# /elderly/{id}/medications/bulk): a list of the single-item schemas
+MAX_BULK_ITEMS = 1000  # Upper bound for the items of one bulk request
+ElderlyBulkCreate = Annotated[List[ElderlyCreate], Field(min_length=1, max_length=MAX_BULK_ITEMS)]
+TaskBulkCreate = Annotated[List[TaskCreate], Field(min_length=1, max_length=MAX_BULK_ITEMS)]
+MedicationBulkCreate = Annotated[List[MedicationCreate], Field(min_length=1, max_length=MAX_BULK_ITEMS)]
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from typing import List
+
+class ImportRowError(BaseModel):
+    row: int  # Line number in the CSV file (the header is line 1; 0 if the file could not be read further)
+    errors: List[str]
+
+class ImportReport(BaseModel):
+    imported: int  # Rows saved
+    failed: int  # Rows rejected (all of them, even beyond the listed errors)
+    errors: List[ImportRowError]  # The first IMPORT_MAX_ERRORS rejected rows
@@ -1,46 +1,52 @@
 import os
+import hmac
+import time
 from datetime import datetime, timedelta
 from typing import Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import event, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
 from fastapi import HTTPException, status, Header, Depends
 from db.database import get_db
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from models.user import User
 from schemas.auth import LoginRequest, LoginResponse, UserResponse
+from utils.redis_cache import get_from_cache, set_in_cache, delete_from_cache, invalidate_tags, local_tag_snapshot, run_in_redis_thread, run_redis_nowait
+from utils.cache_tags import user_tag
+from utils.ttl_cache import TTLCache
+from utils.rate_limit import FixedWindowCounter
+from utils.request_timing import timed
+from services.cache_warmup_service import schedule_tenant_warmup
+from utils.passwords import verify_password_async, get_password_hash_async
 
 # JWT Configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "fallback")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Login throttling: failed attempts are counted per email and per client IP in a
+# fixed window; once a limit is reached further attempts get 429 until the window ends.
+# The per-IP limit is higher because a whole care facility may share one address.
+LOGIN_THROTTLE_WINDOW = int(os.getenv("LOGIN_THROTTLE_WINDOW", "300"))
+LOGIN_MAX_FAILURES_PER_EMAIL = int(os.getenv("LOGIN_MAX_FAILURES_PER_EMAIL", "5"))
+LOGIN_MAX_FAILURES_PER_IP = int(os.getenv("LOGIN_MAX_FAILURES_PER_IP", "50"))
+_email_failures = FixedWindowCounter("login_failures_email", LOGIN_THROTTLE_WINDOW)
+_ip_failures = FixedWindowCounter("login_failures_ip", LOGIN_THROTTLE_WINDOW)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """
-    Verify a plain password against its hash.
-    
-    Args:
-        plain_password: The plain text password
-        hashed_password: The hashed password from database
-        
-    Returns:
-        bool: True if password matches, False otherwise
-    """
-    return pwd_context.verify(plain_password, hashed_password)
+# last_login_at only orders tenants for the cache warm-up, so it is written at most
+# once per LAST_LOGIN_UPDATE_INTERVAL seconds per user
+LAST_LOGIN_UPDATE_INTERVAL = int(os.getenv("LAST_LOGIN_UPDATE_INTERVAL", "300"))
 
-def get_password_hash(password: str) -> str:
-    """
-    Hash a password using bcrypt.
-    
-    Args:
-        password: The plain text password
-        
-    Returns:
-        str: The hashed password
-    """
-    return pwd_context.hash(password)
+# Authenticated user cache (in-process LRU in front of Redis), keyed by user ID.
+# Changes to a user clear both tiers in this process; other workers see them
+# once their in-process entry expires, so the TTL is kept short.
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "30"))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "1024"))
+_user_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+
+# Decoded tokens are kept until they expire, so the signature is checked once per token
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+_token_cache = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
@@ -79,49 +85,201 @@ def verify_token(token: str) -> Optional[dict]:
     except JWTError:
         return None
 
-def authenticate_user(email: str, password: str, db: Session) -> Optional[User]:
+def verify_token_cached(token: str) -> Optional[dict]:
+    """
+    Verify and decode a JWT token, reusing the result for repeated tokens.
+    Valid payloads are memoized until the token's own expiry.
+    
+    Args:
+        token: The JWT token to verify
+        
+    Returns:
+        dict: The decoded token payload, or None if invalid
+    """
+    payload = _token_cache.get(token)
+    if payload is not None:
+        return payload
+
+    payload = verify_token(token)
+    if payload is None:
+        return None
+    remaining = payload.get("exp", 0) - time.time()
+    if remaining > 0:
+        _token_cache.set(token, payload, ttl=remaining)
+    return payload
+
+def get_user_principal(user_id: int, db: Session) -> Optional[dict]:
+    """
+    Load the fields of a user needed to authorize a request.
+    Looks in the in-process cache first, then Redis, then the database.
+    
+    Args:
+        user_id: ID of the user
+        db: Database session
+        
+    Returns:
+        dict: id, email, full_name and is_active, or None if the user does not exist
+    """
+    # Entries are dropped once the user's tag is invalidated, also by another worker
+    snapshot = local_tag_snapshot([user_tag(user_id)])
+    entry = _user_cache.get(user_id)
+    if entry is not None and entry[0] == snapshot:
+        return entry[1]
+
+    cache_key = f"user_{user_id}_principal"
+    principal = get_from_cache(cache_key)
+    if principal is None:
+        user = db.query(User).filter(User.id == user_id).first()
+        if user is None:
+            return None
+        principal = {
+            "id": user.id,
+            "email": user.email,
+            "full_name": user.full_name,
+            "is_active": user.is_active,
+        }
+        set_in_cache(cache_key, principal, ttl=USER_CACHE_TTL)
+
+    _user_cache.set(user_id, (snapshot, principal))
+    return principal
+
+def invalidate_user_cache(user_id: int):
+    """
+    Drop a user from the authenticated user cache (both tiers), in every worker:
+    the user's tag is published on the invalidation channel.
+    
+    Args:
+        user_id: ID of the user that changed
+    """
+    _user_cache.delete(user_id)
+    # Also called from ORM events of async sessions, which run on the event loop
+    run_redis_nowait(_drop_shared_principal, user_id)
+
+def _drop_shared_principal(user_id: int):
+    delete_from_cache(f"user_{user_id}_principal")
+    invalidate_tags(user_tag(user_id))
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target):
+    # Deactivating, editing or deleting a user must not be hidden by the cache
+    invalidate_user_cache(target.id)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("changed_users", set()).add(target.id)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session):
+    # Again once committed: another worker may have reloaded the old row in between
+    for user_id in session.info.pop("changed_users", ()):
+        invalidate_user_cache(user_id)
+
+def clear_auth_caches():
+    """Empty the in-process user and token caches (used by tests)."""
+    _user_cache.clear()
+    _token_cache.clear()
+
+async def authenticate_user(email: str, password: str, db: AsyncSession) -> Optional[User]:
     """
     Authenticate a user by email and password.
+    The bcrypt check runs in the password process pool.
     
     Args:
         email: User's email address
         password: User's plain text password
-        db: Database session
+        db: Async database session
         
     Returns:
         User: The authenticated user, or None if authentication fails
     """
-    user = db.query(User).filter(User.email == email).first()
+    user = await db.scalar(select(User).where(User.email == email))
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
         return None
     if not user.is_active:
         return None
     return user
 
-def login_user(login_data: LoginRequest, db: Session) -> LoginResponse:
+def _check_login_throttle(email: str, client_ip: Optional[str]):
+    """
+    Reject the login attempt if the email or client IP has too many recent failures.
+    
+    Args:
+        email: Normalized email address of the attempt
+        client_ip: IP address of the client (None if unknown)
+        
+    Raises:
+        HTTPException: 429 with a Retry-After header if a limit is reached
+    """
+    checks = [(_email_failures, email, LOGIN_MAX_FAILURES_PER_EMAIL)]
+    if client_ip:
+        checks.append((_ip_failures, client_ip, LOGIN_MAX_FAILURES_PER_IP))
+    for counter, key, limit in checks:
+        failures, retry_after = counter.get(key)
+        if failures >= limit:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many failed login attempts, try again later",
+                headers={"Retry-After": str(retry_after or LOGIN_THROTTLE_WINDOW)},
+            )
+
+def _record_login_failure(email: str, client_ip: Optional[str]):
+    _email_failures.hit(email)
+    if client_ip:
+        _ip_failures.hit(client_ip)
+
+def clear_login_throttle():
+    """Forget in-process failed login counts (used by tests)."""
+    _email_failures.clear()
+    _ip_failures.clear()
+
+async def login_user(login_data: LoginRequest, db: AsyncSession, client_ip: Optional[str] = None) -> LoginResponse:
     """
     Authenticate user and return login response with JWT token.
     
+    Failed attempts are counted per email and per client IP; when either
+    limit is reached the attempt is rejected before any bcrypt work is done.
+    A successful login records last_login_at and, with CACHE_WARMUP enabled,
+    prefetches the tenant's lists into the cache in the background.
+    
     Args:
         login_data: LoginRequest containing email and password
-        db: Database session
+        db: Async database session
+        client_ip: IP address of the client, used for throttling
         
     Returns:
         LoginResponse: Contains access token and user information
         
     Raises:
-        HTTPException: If authentication fails
+        HTTPException: If authentication fails or too many attempts failed
     """
-    user = authenticate_user(login_data.email, login_data.password, db)
+    email_key = login_data.email.lower()
+    # The counters live in Redis; read and update them in the Redis thread pool
+    await run_in_redis_thread(_check_login_throttle, email_key, client_ip)
+
+    user = await authenticate_user(login_data.email, login_data.password, db)
     if not user:
+        await run_in_redis_thread(_record_login_failure, email_key, client_ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    await run_in_redis_thread(_email_failures.reset, email_key)
+
+    # Remembered so the most recently active tenants can be warmed at startup. A core
+    # UPDATE fires no mapper events: a login timestamp must not evict the user's
+    # cached principal in every worker like a real change to the user does
+    now = datetime.utcnow()
+    if user.last_login_at is None or now - user.last_login_at >= timedelta(seconds=LAST_LOGIN_UPDATE_INTERVAL):
+        await db.execute(
+            update(User).where(User.id == user.id).values(last_login_at=now).execution_options(synchronize_session=False)
+        )
+        await db.commit()
+    schedule_tenant_warmup(user.id)  # Prefetch the tenant's lists while the client loads
+
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -137,10 +295,15 @@ def login_user(login_data: LoginRequest, db: Session) -> LoginResponse:
         full_name=user.full_name
     )
 
+@timed("auth")
 def get_current_user(authorization: str = Header(None) ,db: Session = Depends(get_db)) -> User:
     """
     Get current user from JWT token.
     
+    The decoded token and the user are cached (see verify_token_cached and
+    get_user_principal), so most requests need no database round trip.
+    The returned User is not attached to a session.
+    
     Args:
         token: JWT token from request header
         db: Database session
@@ -170,7 +333,7 @@ def get_current_user(authorization: str = Header(None) ,db: Session = Depends(ge
     except:
         raise credentials_exception
     
-    payload = verify_token(token)
+    payload = verify_token_cached(token)
     if payload is None:
         raise credentials_exception
     
@@ -178,24 +341,25 @@ def get_current_user(authorization: str = Header(None) ,db: Session = Depends(ge
     if user_id is None:
         raise credentials_exception
     
-    user = db.query(User).filter(User.id == int(user_id)).first()
-    if user is None:
+    principal = get_user_principal(int(user_id), db)
+    if principal is None:
         raise credentials_exception
     
-    if not user.is_active:
+    if not principal["is_active"]:
         raise HTTPException(status_code=400, detail="Inactive user")
     
-    return user
+    return User(**principal)
 
-def create_user(email: str, password: str, full_name: str, db: Session) -> UserResponse:
+async def create_user(email: str, password: str, full_name: str, db: AsyncSession) -> UserResponse:
     """
     Create a new user (for manual user creation).
+    The password is hashed in the password process pool.
     
     Args:
         email: User's email address
         password: User's plain text password
         full_name: User's full name
-        db: Database session
+        db: Async database session
         
     Returns:
         UserResponse: The created user information
@@ -204,12 +368,12 @@ def create_user(email: str, password: str, full_name: str, db: Session) -> UserR
         HTTPException: If user already exists
     """
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == email).first()
+    existing_user = await db.scalar(select(User.id).where(User.email == email))
     if existing_user:
         raise HTTPException(status_code=400, detail="User with this email already exists")
     
     # Create new user
-    hashed_password = get_password_hash(password)
+    hashed_password = await get_password_hash_async(password)
     new_user = User(
         email=email,
         hashed_password=hashed_password,
@@ -218,8 +382,7 @@ def create_user(email: str, password: str, full_name: str, db: Session) -> UserR
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
     
     return UserResponse(
         id=new_user.id,
@@ -227,3 +390,22 @@ def create_user(email: str, password: str, full_name: str, db: Session) -> UserR
         full_name=new_user.full_name,
         is_active=new_user.is_active
     )
+
+def require_admin(x_admin_token: str = Header(None)) -> None:
+    """
+    Guard for operational endpoints (pool stats, metrics).
+    
+    Admin endpoints are disabled unless the ADMIN_TOKEN environment variable
+    is set; requests must send the same value in the X-Admin-Token header.
+    
+    Args:
+        x_admin_token: Token from the X-Admin-Token request header
+        
+    Raises:
+        HTTPException: If admin endpoints are disabled or the token is wrong
+    """
+    admin_token = os.getenv("ADMIN_TOKEN")
+    if not admin_token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin endpoints are disabled")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, admin_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin token")
@@ -0,0 +1,99 @@
+import os
+import asyncio
+from typing import Optional
+from sqlalchemy import select
+from db.database import AsyncSessionLocal
+from models.user import User
+from services.elderly_service import get_all_elderly_service
+from services.caregiver_service import get_all_caregivers_service
+from services.caregiver_assignment_service import get_all_assignments_service
+from utils.redis_cache import redis_available
+
+# Cache warm-up settings
+# - CACHE_WARMUP: prefetch a tenant's lists into the cache when they log in, and the
+#   lists of the most recently active tenants at startup (off by default)
+# - CACHE_WARMUP_TENANTS: tenants warmed at startup, by most recent login
+# - CACHE_WARMUP_CONCURRENCY: tenants warmed at the same time per worker, by login and
+#   startup warm-ups together; each one holds a database connection, so keep this well
+#   below DB_POOL_SIZE. Login warm-ups beyond it are skipped (the first request fills
+#   the cache as usual); startup warm-ups wait for a free slot.
+CACHE_WARMUP = os.getenv("CACHE_WARMUP", "false").lower() in ("1", "true", "yes")
+CACHE_WARMUP_TENANTS = int(os.getenv("CACHE_WARMUP_TENANTS", "50"))
+CACHE_WARMUP_CONCURRENCY = int(os.getenv("CACHE_WARMUP_CONCURRENCY", "2"))
+
+_login_warmups = set()  # Running login warm-up tasks (also keeps them from being garbage collected)
+_warmup_slots: tuple = (None, None)  # (event loop, semaphore) shared by login and startup warm-ups
+
+def _slots() -> asyncio.Semaphore:
+    """The warm-up slots of this worker (one semaphore per event loop)."""
+    global _warmup_slots
+    loop = asyncio.get_running_loop()
+    if _warmup_slots[0] is not loop:
+        _warmup_slots = (loop, asyncio.Semaphore(max(CACHE_WARMUP_CONCURRENCY, 1)))
+    return _warmup_slots[1]
+
+async def _warm_in_slot(user_id: int) -> bool:
+    async with _slots():
+        return await warm_tenant_cache(user_id)
+
+async def warm_tenant_cache(user_id: int) -> bool:
+    """
+    Load a tenant's elderly, caregiver and assignment lists into the cache.
+    Lists that are cached already cost one cache read each.
+
+    Args:
+        user_id: ID of the tenant (user)
+
+    Returns:
+        bool: True if the lists were loaded, False if warming failed or Redis is unavailable
+    """
+    if not redis_available():
+        return False  # Nothing would be cached
+    try:
+        async with AsyncSessionLocal() as db:
+            await get_all_elderly_service(user_id, db, as_json=True)
+            await get_all_caregivers_service(user_id, db, as_json=True)
+            await get_all_assignments_service(user_id, db, as_json=True)
+    except Exception:
+        return False  # Best effort: the tenant's first request loads the lists instead
+    return True
+
+def schedule_tenant_warmup(user_id: int):
+    """
+    Warm a tenant's cache in the background (e.g. right after they log in).
+    Does nothing unless CACHE_WARMUP is enabled, or when CACHE_WARMUP_CONCURRENCY
+    warm-ups (login or startup) are already running in this worker.
+
+    Args:
+        user_id: ID of the tenant (user)
+    """
+    if not CACHE_WARMUP or _slots().locked() or len(_login_warmups) >= CACHE_WARMUP_CONCURRENCY:
+        return
+    task = asyncio.create_task(_warm_in_slot(user_id))
+    _login_warmups.add(task)
+    task.add_done_callback(_login_warmups.discard)
+
+async def warm_recent_tenants(limit: Optional[int] = None) -> int:
+    """
+    Warm the cache of the tenants who logged in most recently (e.g. after a deploy
+    or a Redis flush), in the CACHE_WARMUP_CONCURRENCY slots shared with login
+    warm-ups.
+
+    Args:
+        limit: Number of tenants to warm (CACHE_WARMUP_TENANTS if None)
+
+    Returns:
+        int: Number of tenants whose lists were loaded
+    """
+    limit = CACHE_WARMUP_TENANTS if limit is None else limit
+    if limit <= 0 or not redis_available():
+        return 0
+    async with AsyncSessionLocal() as db:
+        user_ids = (await db.scalars(
+            select(User.id)
+            .where(User.last_login_at.is_not(None), User.is_active.is_not(False))
+            .order_by(User.last_login_at.desc())
+            .limit(limit)
+        )).all()
+
+    return sum(await asyncio.gather(*(_warm_in_slot(user_id) for user_id in user_ids)))
@@ -1,12 +1,22 @@
-from sqlalchemy.orm import Session
+from typing import Optional
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 from schemas.caregiver_assignment import CaregiverAssignmentCreate, CaregiverAssignmentResponse
 from models.caregiver import Caregiver
 from models.elderly import Elderly
 from models.caregiver_assignments import CaregiverAssignment
-from utils.redis_cache import get_from_cache, set_in_cache, delete_from_cache
+from utils.redis_cache import get_or_compute, invalidate_tags_async
+from utils.cache_tags import tenant_tag, elderly_tag, caregiver_tag
+from utils.pagination import decode_cursor, fetch_keyset_page, pack_page, unpack_page
+from utils.request_timing import timed
 
-def create_assignment_service(assignment: CaregiverAssignmentCreate, user_id: int, db: Session) -> CaregiverAssignmentResponse:
+# Cached views hold the serialized response body, so a cache hit is sent to the
+# client as is. This adapter serializes it (and parses it for internal callers).
+_assignment_list_json = TypeAdapter(list[CaregiverAssignmentResponse])
+
+async def create_assignment_service(assignment: CaregiverAssignmentCreate, user_id: int, db: AsyncSession) -> CaregiverAssignmentResponse:
     """
     Create a new caregiver assignment with Redis cache invalidation.
     Automatically assigns the assignment to the current user for data isolation.
@@ -17,7 +27,7 @@ def create_assignment_service(assignment: CaregiverAssignmentCreate, user_id: in
     Args:
         assignment: CaregiverAssignmentCreate schema containing assignment data
         user_id: ID of the current user (for data isolation)
-        db: Database session
+        db: Async database session
         
     Returns:
         CaregiverAssignmentResponse: The created assignment
@@ -26,24 +36,23 @@ def create_assignment_service(assignment: CaregiverAssignmentCreate, user_id: in
         HTTPException: If caregiver or elderly not found, or assignment already exists for this user
     """
     # Verify caregiver exists and belongs to the user
-    caregiver = db.query(Caregiver).filter(Caregiver.id == assignment.caregiver_id, Caregiver.user_id == user_id).first()
+    caregiver = await db.scalar(select(Caregiver.id).where(Caregiver.id == assignment.caregiver_id, Caregiver.user_id == user_id))
     if not caregiver:
         raise HTTPException(status_code=404, detail="Caregiver not found")
     
     # Verify elderly exists and belongs to the user
-    elderly = db.query(Elderly).filter(Elderly.id == assignment.elderly_id, Elderly.user_id == user_id).first()
+    elderly = await db.scalar(select(Elderly.id).where(Elderly.id == assignment.elderly_id, Elderly.user_id == user_id))
     if not elderly:
         raise HTTPException(status_code=404, detail="Elderly not found")
     
     # Check if the assignment already exists for THIS USER
-    existing_assignment = (
-        db.query(CaregiverAssignment)
-        .filter(
+    existing_assignment = await db.scalar(
+        select(CaregiverAssignment.id)
+        .where(
             CaregiverAssignment.caregiver_id == assignment.caregiver_id,
             CaregiverAssignment.elderly_id == assignment.elderly_id,
             CaregiverAssignment.user_id == user_id
         )
-        .first()
     )
     if existing_assignment:
         raise HTTPException(
@@ -58,52 +67,94 @@ def create_assignment_service(assignment: CaregiverAssignmentCreate, user_id: in
         user_id=user_id
     )
     db.add(new_assignment)
-    db.commit()
-    db.refresh(new_assignment)
+    await db.commit()
     
     # Invalidate related caches to ensure data consistency
-    delete_from_cache(f"user_{user_id}_caregiver_{assignment.caregiver_id}")  # Clear user-specific caregiver cache
-    delete_from_cache(f"user_{user_id}_caregiver_list")  # Clear user-specific caregiver list cache
-    delete_from_cache(f"user_{user_id}_elderly_{assignment.elderly_id}")  # Clear user-specific elderly cache
-    delete_from_cache(f"user_{user_id}_elderly_list")  # Clear user-specific elderly list cache
-    delete_from_cache(f"user_{user_id}_caregiver_assignments_list")  # Clear user-specific assignments list cache
+    await invalidate_tags_async(
+        caregiver_tag(assignment.caregiver_id),  # Clear the caregiver
+        tenant_tag(user_id, "caregivers"),  # Clear user-specific caregiver list and page caches
+        elderly_tag(assignment.elderly_id),  # Clear the elderly person
+        tenant_tag(user_id, "elderly"),  # Clear user-specific elderly list and page caches
+        tenant_tag(user_id, "assignments"),  # Clear user-specific assignments list and page caches
+    )
     
-    return new_assignment
+    return CaregiverAssignmentResponse.model_validate(new_assignment)
 
-def get_all_assignments_service(user_id: int, db: Session) -> list[CaregiverAssignmentResponse]:
+async def get_all_assignments_service(user_id: int, db: AsyncSession, as_json: bool = False) -> list[CaregiverAssignmentResponse] | bytes:
     """
     Retrieve all caregiver assignments for a specific user with Redis caching.
     
     Cache Strategy:
     - Cache key: "user_{user_id}_caregiver_assignments_list"
+    - Tags: "tenant:{user_id}:assignments"
     - TTL: 300 seconds (5 minutes)
     - On cache hit: Return cached data
-    - On cache miss: Query DB, cache result, return data
+    - On cache miss: One request queries the DB and caches the result, concurrent ones wait for it
     
     Args:
         user_id: ID of the current user (for data isolation)
-        db: Database session
+        db: Async database session
+        as_json: Return the serialized JSON response body instead of models
         
     Returns:
-        list[CaregiverAssignmentResponse]: List of assignments for the current user
+        list[CaregiverAssignmentResponse] | bytes: List of assignments for the current user
     """
     cache_key = f"user_{user_id}_caregiver_assignments_list"
 
-    # Try to get data from Redis cache first
-    cached_data = get_from_cache(cache_key)
-    if cached_data:
-        return [CaregiverAssignmentResponse(**a) for a in cached_data]
+    async def load() -> bytes:
+        # Cache miss - query database with user filter
+        assignments = (await db.scalars(
+            select(CaregiverAssignment)
+            .where(CaregiverAssignment.user_id == user_id)
+            .order_by(CaregiverAssignment.id)
+        )).all()
+        with timed("serialize"):
+            result = [CaregiverAssignmentResponse.from_orm(a) for a in assignments]
+            return _assignment_list_json.dump_json(result)
 
-    # Cache miss - query database with user filter
-    assignments = db.query(CaregiverAssignment).filter(CaregiverAssignment.user_id == user_id).all()
-    result = [CaregiverAssignmentResponse.from_orm(a) for a in assignments]
+    # Try the cache first (this worker's L1, then Redis); concurrent misses share one load
+    body = await get_or_compute(cache_key, [tenant_tag(user_id, "assignments")], load, ttl=300)
+    return body if as_json else _assignment_list_json.validate_json(body)
+
+async def get_assignments_page_service(user_id: int, db: AsyncSession, limit: int, cursor: Optional[str] = None, as_json: bool = False) -> tuple[list[CaregiverAssignmentResponse] | bytes, Optional[str]]:
+    """
+    Retrieve one page of caregiver assignments for a specific user with Redis caching.
+    Uses keyset pagination on the assignment ID, so every page costs the same.
     
-    # Store result in cache for future requests
-    set_in_cache(cache_key, [a.dict() for a in result], ttl=300)
+    Cache Strategy:
+    - Cache key: "user_{user_id}_caregiver_assignments_list_page_{after_id}_{limit}"
+    - Tags: "tenant:{user_id}:assignments" (invalidated together with the full list)
+    - TTL: 300 seconds (5 minutes)
+    
+    Args:
+        user_id: ID of the current user (for data isolation)
+        db: Async database session
+        limit: Maximum number of assignments on the page
+        cursor: Cursor returned by the previous page (None for the first page)
+        as_json: Return the serialized JSON response body instead of models
+        
+    Returns:
+        tuple: (list of CaregiverAssignmentResponse on this page or its JSON body, cursor for the next page or None)
+        
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    after_id = decode_cursor(cursor)
+    cache_key = f"user_{user_id}_caregiver_assignments_list_page_{after_id}_{limit}"
 
-    return result
+    async def load() -> bytes:
+        # Cache miss - query one page with user filter
+        stmt = select(CaregiverAssignment).where(CaregiverAssignment.user_id == user_id)
+        assignments, next_cursor = await fetch_keyset_page(db, stmt, CaregiverAssignment.id, limit, after_id)
+        with timed("serialize"):
+            result = [CaregiverAssignmentResponse.from_orm(a) for a in assignments]
+            return pack_page(_assignment_list_json.dump_json(result), next_cursor)
 
-def delete_assignment_service(assignment_id: int, user_id: int, db: Session) -> dict:
+    # Try the cache first (this worker's L1, then Redis); concurrent misses share one load
+    body, next_cursor = unpack_page(await get_or_compute(cache_key, [tenant_tag(user_id, "assignments")], load, ttl=300))
+    return (body if as_json else _assignment_list_json.validate_json(body)), next_cursor
+
+async def delete_assignment_service(assignment_id: int, user_id: int, db: AsyncSession) -> dict:
     """
     Delete a caregiver assignment for a specific user with Redis cache invalidation.
     
@@ -113,7 +164,7 @@ def delete_assignment_service(assignment_id: int, user_id: int, db: Session) ->
     Args:
         assignment_id: ID of the assignment to delete
         user_id: ID of the current user (for data isolation)
-        db: Database session
+        db: Async database session
         
     Returns:
         dict: Success message
@@ -122,10 +173,10 @@ def delete_assignment_service(assignment_id: int, user_id: int, db: Session) ->
         HTTPException: If assignment not found or doesn't belong to user
     """
     # Find and verify assignment exists and belongs to the user
-    assignment = db.query(CaregiverAssignment).filter(
+    assignment = await db.scalar(select(CaregiverAssignment).where(
         CaregiverAssignment.id == assignment_id, 
         CaregiverAssignment.user_id == user_id
-    ).first()
+    ))
     if not assignment:
         raise HTTPException(status_code=404, detail="Assignment not found")
 
@@ -134,14 +185,16 @@ def delete_assignment_service(assignment_id: int, user_id: int, db: Session) ->
     elderly_id = assignment.elderly_id
 
     # Delete from database
-    db.delete(assignment)
-    db.commit()
+    await db.delete(assignment)
+    await db.commit()
 
     # Invalidate related caches to ensure data consistency
-    delete_from_cache(f"user_{user_id}_caregiver_{caregiver_id}")  # Clear user-specific caregiver cache
-    delete_from_cache(f"user_{user_id}_caregiver_list")  # Clear user-specific caregiver list cache
-    delete_from_cache(f"user_{user_id}_elderly_{elderly_id}")  # Clear user-specific elderly cache
-    delete_from_cache(f"user_{user_id}_elderly_list")  # Clear user-specific elderly list cache
-    delete_from_cache(f"user_{user_id}_caregiver_assignments_list")  # Clear user-specific assignments list cache
+    await invalidate_tags_async(
+        caregiver_tag(caregiver_id),  # Clear the caregiver
+        tenant_tag(user_id, "caregivers"),  # Clear user-specific caregiver list and page caches
+        elderly_tag(elderly_id),  # Clear the elderly person
+        tenant_tag(user_id, "elderly"),  # Clear user-specific elderly list and page caches
+        tenant_tag(user_id, "assignments"),  # Clear user-specific assignments list and page caches
+    )
 
     return {"message": f"Assignment {assignment_id} deleted successfully"} 
\ No newline at end of file
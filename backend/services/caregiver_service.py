@@ -1,11 +1,45 @@
-from sqlalchemy.orm import Session
+import os
+import asyncio
+from datetime import date
+from typing import AsyncIterator, Optional
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
-from schemas.caregiver import CaregiverResponse, CaregiverCreate, CaregiverUpdateSalary
+from schemas.caregiver import CaregiverResponse, CaregiverSummary, CaregiverCreate, CaregiverUpdateSalary
 from models.caregiver import Caregiver
-from utils.redis_cache import get_from_cache, set_in_cache, delete_from_cache
-from utils.pdf_generator import generate_caregiver_pdf
+from db.loaders import caregiver_tree_options
+from utils.redis_cache import get_or_compute, invalidate_tags_async
+from utils.cache_tags import tenant_tag, elderly_tag, caregiver_tag
+from utils.pagination import decode_cursor, fetch_keyset_page, pack_page, unpack_page
+from utils.request_timing import timed
+from utils.metrics import pdf_render_duration, observe_duration
+from utils.pdf_generator import (
+    pdf_content_hash,
+    render_caregiver_pdf,
+    render_caregiver_pdfs,
+    render_caregiver_reports_pdf,
+)
+from utils.pdf_cache import get_cached_pdf_async, get_cached_pdfs_async, set_cached_pdf, set_cached_pdfs_async
+from utils.etags import make_etag, etag_matches
+from utils.process_pool import run_in_process_pool
+from utils.zip_stream import ZipStream
 
-def add_caregiver_service(caregiver: CaregiverCreate, user_id: int, db: Session) -> CaregiverResponse:
+# Batch reports are rendered in dedicated worker processes, REPORT_CHUNK_SIZE caregivers per job
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", str(min(4, os.cpu_count() or 1))))
+REPORT_CHUNK_SIZE = 25
+
+# Cached views hold the serialized response body, so a cache hit is sent to the
+# client as is. These adapters serialize it (and parse it for internal callers).
+_caregiver_list_json = {
+    CaregiverResponse: TypeAdapter(list[CaregiverResponse]),
+    CaregiverSummary: TypeAdapter(list[CaregiverSummary]),
+}
+_caregiver_json = TypeAdapter(CaregiverResponse)
+
+async def add_caregiver_service(caregiver: CaregiverCreate, user_id: int, db: AsyncSession) -> CaregiverResponse:
     """
     Add a new caregiver to the database with Redis cache invalidation.
     Automatically assigns the caregiver to the current user for data isolation.
@@ -13,7 +47,7 @@ def add_caregiver_service(caregiver: CaregiverCreate, user_id: int, db: Session)
     Args:
         caregiver: CaregiverCreate schema containing caregiver data
         user_id: ID of the current user (for data isolation)
-        db: Database session
+        db: Async database session
         
     Returns:
         CaregiverResponse: The created caregiver
@@ -22,10 +56,10 @@ def add_caregiver_service(caregiver: CaregiverCreate, user_id: int, db: Session)
         HTTPException: If caregiver with same custom_id already exists for this user
     """
     # Check if caregiver with same custom_id already exists for THIS USER
-    existing_caregiver = db.query(Caregiver).filter(
+    existing_caregiver = await db.scalar(select(Caregiver.id).where(
         Caregiver.custom_id == caregiver.custom_id, 
         Caregiver.user_id == user_id
-    ).first()
+    ))
     if existing_caregiver:
         raise HTTPException(status_code=400, detail="Caregiver with this ID already exists for this user")
 
@@ -39,88 +73,184 @@ def add_caregiver_service(caregiver: CaregiverCreate, user_id: int, db: Session)
         user_id=user_id
     )
     db.add(new_caregiver)
-    db.commit()
-    db.refresh(new_caregiver)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # A concurrent request won the race (unique index on user_id, custom_id)
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Caregiver with this ID already exists for this user")
+    await db.refresh(new_caregiver)
 
     # Invalidate related caches to ensure data consistency
-    delete_from_cache(f"user_{user_id}_caregiver_list")  # Clear user-specific list cache
-    delete_from_cache(f"user_{user_id}_caregiver_{new_caregiver.id}")  # Clear user-specific individual cache
+    await invalidate_tags_async(
+        tenant_tag(user_id, "caregivers"),  # Clear user-specific list, summary and page caches
+        caregiver_tag(new_caregiver.id),  # Clear cached "not found" lookups of the new ID
+    )
 
-    return new_caregiver
+    # A new caregiver has no assignments yet
+    return CaregiverResponse(**CaregiverSummary.model_validate(new_caregiver).model_dump())
 
-def get_all_caregivers_service(user_id: int, db: Session) -> list[CaregiverResponse]:
+async def get_all_caregivers_service(user_id: int, db: AsyncSession, include_assignments: bool = True, as_json: bool = False) -> list[CaregiverResponse] | list[CaregiverSummary] | bytes:
     """
     Retrieve all caregivers for a specific user with Redis caching.
     
     Cache Strategy:
-    - Cache key: "user_{user_id}_caregiver_list"
+    - Cache key: "user_{user_id}_caregiver_list" (or "user_{user_id}_caregiver_list_summary"
+      when nested assignments are skipped)
+    - Tags: "tenant:{user_id}:caregivers"
     - TTL: 300 seconds (5 minutes)
     - On cache hit: Return cached data
-    - On cache miss: Query DB, cache result, return data
+    - On cache miss: One request queries the DB and caches the result, concurrent ones wait for it
     
     Args:
         user_id: ID of the current user (for data isolation)
-        db: Database session
+        db: Async database session
+        include_assignments: Whether to load and return nested assignments
+        as_json: Return the serialized JSON response body instead of models
         
     Returns:
-        list[CaregiverResponse]: List of caregivers for the current user
+        list[CaregiverResponse] | list[CaregiverSummary] | bytes: List of caregivers for the current user
     """
+    if not include_assignments:
+        return await _get_caregiver_summaries(user_id, db, as_json)
+
     cache_key = f"user_{user_id}_caregiver_list"
 
-    # Try to get data from Redis cache first
-    cached_data = get_from_cache(cache_key)
-    if cached_data:
-        return [CaregiverResponse(**c) for c in cached_data]
+    async def load() -> bytes:
+        # Cache miss - query database with user filter
+        # Assignments are loaded in bulk (selectin) so the query count stays constant
+        caregivers = (await db.scalars(
+            select(Caregiver)
+            .options(*caregiver_tree_options("selectin"))
+            .where(Caregiver.user_id == user_id)
+            .order_by(Caregiver.id)
+        )).all()
+        with timed("serialize"):
+            result = [CaregiverResponse.from_orm(c) for c in caregivers]
+            return _caregiver_list_json[CaregiverResponse].dump_json(result)
+
+    # Try the cache first (this worker's L1, then Redis); concurrent misses share one load
+    body = await get_or_compute(cache_key, [tenant_tag(user_id, "caregivers")], load, ttl=300)
+    return body if as_json else _caregiver_list_json[CaregiverResponse].validate_json(body)
 
-    # Cache miss - query database with user filter
-    caregivers = db.query(Caregiver).filter(Caregiver.user_id == user_id).all()
-    result = [CaregiverResponse.from_orm(c) for c in caregivers]
+async def _get_caregiver_summaries(user_id: int, db: AsyncSession, as_json: bool = False) -> list[CaregiverSummary] | bytes:
+    """
+    Retrieve all caregivers for a specific user without their nested assignments.
+    Only caregiver columns are read, so no relationship is ever loaded.
     
-    # Store result in cache for future requests
-    set_in_cache(cache_key, [c.dict() for c in result], ttl=300)
+    Args:
+        user_id: ID of the current user (for data isolation)
+        db: Async database session
+        as_json: Return the serialized JSON response body instead of models
+        
+    Returns:
+        list[CaregiverSummary] | bytes: List of caregivers for the current user
+    """
+    cache_key = f"user_{user_id}_caregiver_list_summary"
 
-    return result
+    async def load() -> bytes:
+        # Cache miss - query database with user filter
+        caregivers = (await db.scalars(select(Caregiver).where(Caregiver.user_id == user_id).order_by(Caregiver.id))).all()
+        with timed("serialize"):
+            result = [CaregiverSummary.from_orm(c) for c in caregivers]
+            return _caregiver_list_json[CaregiverSummary].dump_json(result)
 
-def get_caregiver_by_id_service(caregiver_id: int, user_id: int, db: Session) -> CaregiverResponse:
+    # Try the cache first (this worker's L1, then Redis); concurrent misses share one load
+    body = await get_or_compute(cache_key, [tenant_tag(user_id, "caregivers")], load, ttl=300)
+    return body if as_json else _caregiver_list_json[CaregiverSummary].validate_json(body)
+
+async def get_caregivers_page_service(user_id: int, db: AsyncSession, limit: int, cursor: Optional[str] = None, include_assignments: bool = True, as_json: bool = False) -> tuple[list | bytes, Optional[str]]:
+    """
+    Retrieve one page of caregivers for a specific user with Redis caching.
+    Uses keyset pagination on the caregiver ID, so every page costs the same.
+    
+    Cache Strategy:
+    - Cache key: "user_{user_id}_caregiver_list_page_{after_id}_{limit}"
+      (or "user_{user_id}_caregiver_list_summary_page_{after_id}_{limit}" without assignments)
+    - Tags: "tenant:{user_id}:caregivers" (invalidated together with the full list)
+    - TTL: 300 seconds (5 minutes)
+    
+    Args:
+        user_id: ID of the current user (for data isolation)
+        db: Async database session
+        limit: Maximum number of caregivers on the page
+        cursor: Cursor returned by the previous page (None for the first page)
+        include_assignments: Whether to load and return nested assignments
+        as_json: Return the serialized JSON response body instead of models
+        
+    Returns:
+        tuple: (list of CaregiverResponse or CaregiverSummary on this page or its JSON body, cursor for the next page or None)
+        
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    after_id = decode_cursor(cursor)
+    schema = CaregiverResponse if include_assignments else CaregiverSummary
+    list_key = "caregiver_list" if include_assignments else "caregiver_list_summary"
+    cache_key = f"user_{user_id}_{list_key}_page_{after_id}_{limit}"
+
+    async def load() -> bytes:
+        # Cache miss - query one page with user filter
+        stmt = select(Caregiver).where(Caregiver.user_id == user_id)
+        if include_assignments:
+            stmt = stmt.options(*caregiver_tree_options("selectin"))
+        caregivers, next_cursor = await fetch_keyset_page(db, stmt, Caregiver.id, limit, after_id)
+        with timed("serialize"):
+            result = [schema.from_orm(c) for c in caregivers]
+            return pack_page(_caregiver_list_json[schema].dump_json(result), next_cursor)
+
+    # Try the cache first (this worker's L1, then Redis); concurrent misses share one load
+    body, next_cursor = unpack_page(await get_or_compute(cache_key, [tenant_tag(user_id, "caregivers")], load, ttl=300))
+    return (body if as_json else _caregiver_list_json[schema].validate_json(body)), next_cursor
+
+async def get_caregiver_by_id_service(caregiver_id: int, user_id: int, db: AsyncSession, as_json: bool = False) -> CaregiverResponse | bytes:
     """
     Retrieve a specific caregiver by ID for a specific user with Redis caching.
     
     Cache Strategy:
     - Cache key: "user_{user_id}_caregiver_{caregiver_id}"
-    - TTL: 300 seconds (5 minutes)
+    - Tags: "caregiver:{caregiver_id}"
+    - TTL: 300 seconds (5 minutes); "not found" is cached for NEGATIVE_CACHE_TTL (30 seconds)
     - On cache hit: Return cached data
-    - On cache miss: Query DB, cache result, return data
+    - On cache miss: One request queries the DB and caches the result, concurrent ones wait for it
     
     Args:
         caregiver_id: ID of the caregiver to retrieve
         user_id: ID of the current user (for data isolation)
-        db: Database session
+        db: Async database session
+        as_json: Return the serialized JSON response body instead of a model
         
     Returns:
-        CaregiverResponse: The caregiver data
+        CaregiverResponse | bytes: The caregiver data
         
     Raises:
         HTTPException: If caregiver not found or doesn't belong to user
     """
     cache_key = f"user_{user_id}_caregiver_{caregiver_id}"
     
-    # Try to get data from Redis cache first
-    cached_data = get_from_cache(cache_key)
-    if cached_data:
-        return CaregiverResponse(**cached_data)
-    
-    # Cache miss - query database with user filter
-    caregiver = db.query(Caregiver).filter(Caregiver.id == caregiver_id, Caregiver.user_id == user_id).first()
-    if not caregiver:
+    async def load() -> Optional[bytes]:
+        # Cache miss - query database with user filter
+        # Assignments are joined into the same SELECT (single round trip)
+        caregiver = (await db.execute(
+            select(Caregiver)
+            .options(*caregiver_tree_options("joined"))
+            .where(Caregiver.id == caregiver_id, Caregiver.user_id == user_id)
+        )).unique().scalar_one_or_none()
+        if not caregiver:
+            return None  # Cached briefly as "not found"
+
+        # Convert to schema
+        with timed("serialize"):
+            result = CaregiverResponse.from_orm(caregiver)
+            return _caregiver_json.dump_json(result)
+
+    # Try the cache first (this worker's L1, then Redis); concurrent misses share one load
+    body = await get_or_compute(cache_key, [caregiver_tag(caregiver_id)], load, ttl=300)
+    if body is None:
         raise HTTPException(status_code=404, detail="Caregiver not found")
-    
-    # Convert to schema and cache the result
-    result = CaregiverResponse.from_orm(caregiver)
-    set_in_cache(cache_key, result.dict(), ttl=300)
-    
-    return result
+    return body if as_json else _caregiver_json.validate_json(body)
 
-def update_caregiver_salary_service(caregiver_id: int, salary_update: CaregiverUpdateSalary, user_id: int, db: Session) -> CaregiverResponse:
+async def update_caregiver_salary_service(caregiver_id: int, salary_update: CaregiverUpdateSalary, user_id: int, db: AsyncSession) -> CaregiverResponse:
     """
     Update caregiver salary information with Redis cache invalidation.
     Ensures the caregiver belongs to the current user for data isolation.
@@ -129,7 +259,7 @@ def update_caregiver_salary_service(caregiver_id: int, salary_update: CaregiverU
         caregiver_id: ID of the caregiver to update
         salary_update: CaregiverUpdateSalary schema containing salary data
         user_id: ID of the current user (for data isolation)
-        db: Database session
+        db: Async database session
         
     Returns:
         CaregiverResponse: The updated caregiver
@@ -138,7 +268,12 @@ def update_caregiver_salary_service(caregiver_id: int, salary_update: CaregiverU
         HTTPException: If caregiver not found or doesn't belong to user
     """
     # Find and verify caregiver exists and belongs to the user
-    caregiver = db.query(Caregiver).filter(Caregiver.id == caregiver_id, Caregiver.user_id == user_id).first()
+    # Assignments are loaded up front because they are part of the response
+    caregiver = await db.scalar(
+        select(Caregiver)
+        .options(*caregiver_tree_options("selectin"))
+        .where(Caregiver.id == caregiver_id, Caregiver.user_id == user_id)
+    )
     if not caregiver:
         raise HTTPException(status_code=404, detail="Caregiver not found")
 
@@ -165,46 +300,166 @@ def update_caregiver_salary_service(caregiver_id: int, salary_update: CaregiverU
     )
     
     # Save changes to database
-    db.commit()
-    db.refresh(caregiver)
+    await db.commit()
     
     # Invalidate related caches to ensure data consistency
-    delete_from_cache(f"user_{user_id}_caregiver_list")  # Clear user-specific list cache
-    delete_from_cache(f"user_{user_id}_caregiver_{caregiver_id}")  # Clear user-specific individual cache
+    await invalidate_tags_async(tenant_tag(user_id, "caregivers"), caregiver_tag(caregiver_id))  # Clear the caregiver and the user-specific lists
     
-    return caregiver
+    return CaregiverResponse.model_validate(caregiver)
+
+def _report_filename(caregiver) -> str:
+    # Use custom_id for filename (user-friendly ID)
+    return f"caregiver_{caregiver.custom_id}_report.pdf"
 
-def generate_caregiver_pdf_service(caregiver_id: int, user_id: int, db: Session) -> str:
+def _render_and_cache_pdf(caregiver, report_date: date, content_hash: str) -> bytes:
+    with observe_duration(pdf_render_duration.labels("single")):
+        pdf = render_caregiver_pdf(caregiver, report_date)
+    set_cached_pdf(content_hash, pdf)
+    return pdf
+
+async def generate_caregiver_pdf_service(
+    caregiver_id: int,
+    user_id: int,
+    db: AsyncSession,
+    if_none_match: Optional[str] = None
+) -> tuple[str, str, Optional[bytes]]:
     """
     Generate PDF for a specific caregiver with Redis cache check.
     Ensures the caregiver belongs to the current user for data isolation.
     
+    The report is rendered in memory and cached under a hash of everything it
+    shows (salary data, bank details and the report date), so it is only
+    re-rendered when that content changes. The same hash is the ETag: a
+    client that already has the current report gets no body back.
+    
     Args:
         caregiver_id: ID of the caregiver
         user_id: ID of the current user (for data isolation)
-        db: Database session
+        db: Async database session
+        if_none_match: If-None-Match header sent by the client
         
     Returns:
-        str: Path to the generated PDF file
+        tuple[str, str, Optional[bytes]]: Download filename, ETag and the PDF bytes
+        (None if the client's copy is current)
         
     Raises:
         HTTPException: If caregiver not found or doesn't belong to user
     """
     # Get caregiver data (this will use cache if available and filter by user)
-    caregiver = get_caregiver_by_id_service(caregiver_id, user_id, db)
+    caregiver = await get_caregiver_by_id_service(caregiver_id, user_id, db)
+
+    report_date = date.today()
+    content_hash = pdf_content_hash(caregiver, report_date)
+    etag = make_etag(content_hash)
+    filename = _report_filename(caregiver)
+    if etag_matches(if_none_match, etag):
+        return filename, etag, None
+
+    pdf = await get_cached_pdf_async(content_hash)
+    if pdf is None:
+        # Rendering is CPU work, keep it off the event loop
+        pdf = await run_in_threadpool(_render_and_cache_pdf, caregiver, report_date, content_hash)
+    return filename, etag, pdf
+
+async def generate_caregiver_reports_batch_service(
+    user_id: int,
+    db: AsyncSession,
+    caregiver_ids: Optional[list[int]] = None,
+    report_format: str = "zip"
+) -> tuple[str, str, AsyncIterator[bytes]]:
+    """
+    Render the salary reports of many caregivers at once (e.g. month-end payroll).
+    Ensures only the current user's caregivers are included for data isolation.
     
-    # Generate PDF using the utility function
-    filename = generate_caregiver_pdf(caregiver)
-    return filename
+    - "zip": one PDF per caregiver. Reports already in the PDF cache are reused;
+      the rest are rendered in parallel worker processes and streamed into the
+      archive as they complete.
+    - "pdf": a single PDF with one page per caregiver, ordered by custom ID.
+    
+    The caregivers are loaded before this returns, so the stream does not
+    need the database session.
+    
+    Args:
+        user_id: ID of the current user (for data isolation)
+        db: Async database session
+        caregiver_ids: Caregivers to include (all of the user's caregivers if None)
+        report_format: "zip" or "pdf"
+        
+    Returns:
+        tuple[str, str, AsyncIterator[bytes]]: Download filename, media type and the body stream
+        
+    Raises:
+        HTTPException: If a requested caregiver is not found or the user has no caregivers
+    """
+    stmt = select(Caregiver).where(Caregiver.user_id == user_id).order_by(Caregiver.custom_id)
+    if caregiver_ids is not None:
+        stmt = stmt.where(Caregiver.id.in_(caregiver_ids))
+    caregivers = [CaregiverSummary.model_validate(c) for c in (await db.scalars(stmt)).all()]
+
+    if caregiver_ids is not None:
+        missing = set(caregiver_ids) - {caregiver.id for caregiver in caregivers}
+        if missing:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Caregivers not found: {', '.join(str(i) for i in sorted(missing))}"
+            )
+    if not caregivers:
+        raise HTTPException(status_code=404, detail="No caregivers found")
+
+    report_date = date.today()
+    if report_format == "pdf":
+        filename = f"caregiver_reports_{report_date.isoformat()}.pdf"
+        return filename, "application/pdf", _stream_reports_pdf(caregivers, report_date)
+    filename = f"caregiver_reports_{report_date.isoformat()}.zip"
+    return filename, "application/zip", _stream_reports_zip(caregivers, report_date)
+
+async def _stream_reports_pdf(caregivers: list, report_date: date) -> AsyncIterator[bytes]:
+    with observe_duration(pdf_render_duration.labels("batch_pdf")):
+        pdf = await run_in_process_pool("reports", REPORT_WORKERS, render_caregiver_reports_pdf, caregivers, report_date)
+    yield pdf
 
-def delete_caregiver_service(caregiver_id: int, user_id: int, db: Session) -> dict:
+async def _render_report_chunk(chunk: list, report_date: date) -> tuple[list, list[bytes]]:
+    with observe_duration(pdf_render_duration.labels("batch_chunk")):
+        pdfs = await run_in_process_pool("reports", REPORT_WORKERS, render_caregiver_pdfs, chunk, report_date)
+    return chunk, pdfs
+
+async def _stream_reports_zip(caregivers: list, report_date: date) -> AsyncIterator[bytes]:
+    archive = ZipStream()
+    hashes = {caregiver.id: pdf_content_hash(caregiver, report_date) for caregiver in caregivers}
+
+    # Reports that did not change since they were last rendered come from the PDF cache,
+    # looked up in one round trip
+    cached_pdfs = await get_cached_pdfs_async([hashes[caregiver.id] for caregiver in caregivers])
+    cached = [(caregiver, pdf) for caregiver, pdf in zip(caregivers, cached_pdfs) if pdf is not None]
+    to_render = [caregiver for caregiver, pdf in zip(caregivers, cached_pdfs) if pdf is None]
+
+    # Start rendering before the cached reports are written out, so the workers are busy meanwhile
+    jobs = [
+        asyncio.ensure_future(_render_report_chunk(to_render[i:i + REPORT_CHUNK_SIZE], report_date))
+        for i in range(0, len(to_render), REPORT_CHUNK_SIZE)
+    ]
+    try:
+        for caregiver, pdf in cached:
+            yield archive.add(_report_filename(caregiver), pdf)
+        for job in asyncio.as_completed(jobs):
+            chunk, pdfs = await job
+            await set_cached_pdfs_async({hashes[caregiver.id]: pdf for caregiver, pdf in zip(chunk, pdfs)})
+            for caregiver, pdf in zip(chunk, pdfs):
+                yield archive.add(_report_filename(caregiver), pdf)
+    finally:
+        # Client went away: drop the jobs that have not started yet
+        for job in jobs:
+            job.cancel()
+    yield archive.close()
+
+async def delete_caregiver_service(caregiver_id: int, user_id: int, db: AsyncSession) -> dict:
     """
     Delete a caregiver by ID for a specific user with Redis cache invalidation.
     
     Args:
         caregiver_id: ID of the caregiver to delete
         user_id: ID of the current user (for data isolation)
-        db: Database session
+        db: Async database session
         
     Returns:
         dict: Success message
@@ -213,16 +468,29 @@ def delete_caregiver_service(caregiver_id: int, user_id: int, db: Session) -> di
         HTTPException: If caregiver not found or doesn't belong to user
     """
     # Check if caregiver exists and belongs to the user
-    caregiver = db.query(Caregiver).filter(Caregiver.id == caregiver_id, Caregiver.user_id == user_id).first()
+    # Assignments are loaded up front so the ORM cascade can delete them
+    caregiver = await db.scalar(
+        select(Caregiver)
+        .options(*caregiver_tree_options("selectin"))
+        .where(Caregiver.id == caregiver_id, Caregiver.user_id == user_id)
+    )
     if not caregiver:
         raise HTTPException(status_code=404, detail="Caregiver not found")
 
+    # The cascade also deletes the assignments, so the assigned elderly persons change too
+    elderly_ids = {a.elderly_id for a in caregiver.assignments}
+
     # Delete from database
-    db.delete(caregiver)
-    db.commit()
+    await db.delete(caregiver)
+    await db.commit()
 
     # Invalidate related caches to ensure data consistency
-    delete_from_cache(f"user_{user_id}_caregiver_list")  # Clear user-specific list cache
-    delete_from_cache(f"user_{user_id}_caregiver_{caregiver_id}")  # Clear user-specific individual cache
+    await invalidate_tags_async(
+        tenant_tag(user_id, "caregivers"),  # Clear user-specific list, summary and page caches
+        caregiver_tag(caregiver_id),  # Clear every view of this caregiver
+        tenant_tag(user_id, "assignments"),  # Clear user-specific assignments list and page caches
+        tenant_tag(user_id, "elderly"),  # Clear user-specific elderly list and page caches
+        *(elderly_tag(e) for e in elderly_ids),  # Clear the affected elderly persons
+    )
 
     return {"message": f"Caregiver {caregiver_id} deleted successfully"}
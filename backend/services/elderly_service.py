@@ -1,4 +1,9 @@
-from sqlalchemy.orm import Session
+from collections import Counter
+from typing import Optional
+from pydantic import TypeAdapter
+from sqlalchemy import select, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 from schemas.elderly import ElderlySchema, ElderlyCreate
 from schemas.task import TaskSchema, TaskCreate
@@ -6,9 +11,19 @@ from schemas.medication import MedicationCreate, MedicationResponse
 from models.elderly import Elderly
 from models.task import Task
 from models.medication import Medication
-from utils.redis_cache import get_from_cache, set_in_cache, delete_from_cache
+from db.loaders import elderly_tree_options, elderly_medications_options
+from utils.redis_cache import get_or_compute, invalidate_tags_async
+from utils.cache_tags import tenant_tag, elderly_tag, caregiver_tag
+from utils.pagination import decode_cursor, fetch_keyset_page, pack_page, unpack_page
+from utils.request_timing import timed
 
-def add_elderly_service(elderly: ElderlyCreate, user_id: int, db: Session) -> ElderlySchema:
+# Cached views hold the serialized response body, so a cache hit is sent to the
+# client as is. These adapters serialize it (and parse it for internal callers).
+_elderly_list_json = TypeAdapter(list[ElderlySchema])
+_elderly_json = TypeAdapter(ElderlySchema)
+_medication_list_json = TypeAdapter(list[MedicationResponse])
+
+async def add_elderly_service(elderly: ElderlyCreate, user_id: int, db: AsyncSession) -> ElderlySchema:
     """
     Add a new elderly person to the database with Redis cache invalidation.
     Automatically assigns the elderly to the current user for data isolation.
@@ -16,7 +31,7 @@ def add_elderly_service(elderly: ElderlyCreate, user_id: int, db: Session) -> El
     Args:
         elderly: ElderlyCreate schema containing elderly data
         user_id: ID of the current user (for data isolation)
-        db: Database session
+        db: Async database session
         
     Returns:
         ElderlySchema: The created elderly person
@@ -25,105 +40,218 @@ def add_elderly_service(elderly: ElderlyCreate, user_id: int, db: Session) -> El
         HTTPException: If elderly with same custom_id already exists for this user
     """
     # Check if elderly with same custom_id already exists for THIS USER
-    existing_elderly = db.query(Elderly).filter(
+    existing_elderly = await db.scalar(select(Elderly.id).where(
         Elderly.custom_id == elderly.custom_id, 
         Elderly.user_id == user_id
-    ).first()
+    ))
     if existing_elderly:
         raise HTTPException(status_code=400, detail="Elderly with this ID already exists for this user")
 
     # Create and save new elderly person with user_id
     new_elderly = Elderly(custom_id=elderly.custom_id, name=elderly.name, user_id=user_id)
     db.add(new_elderly)
-    db.commit()
-    db.refresh(new_elderly)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # A concurrent request won the race (unique index on user_id, custom_id)
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Elderly with this ID already exists for this user")
 
     # Invalidate related caches to ensure data consistency
-    delete_from_cache(f"user_{user_id}_elderly_list")  # Clear user-specific list cache
-    delete_from_cache(f"user_{user_id}_elderly_{new_elderly.id}")  # Clear user-specific individual cache
+    await invalidate_tags_async(
+        tenant_tag(user_id, "elderly"),  # Clear user-specific list and page caches
+        elderly_tag(new_elderly.id),  # Clear cached "not found" lookups of the new ID
+    )
+
+    # A new elderly person has no tasks, medications or assignments yet
+    return ElderlySchema(id=new_elderly.id, custom_id=new_elderly.custom_id, name=new_elderly.name, user_id=new_elderly.user_id)
+
+async def add_elderly_bulk_service(elderly_list: list[ElderlyCreate], user_id: int, db: AsyncSession) -> list[ElderlySchema]:
+    """
+    Add many elderly persons at once (e.g. when onboarding a facility), all or none.
+    Conflicting custom_ids are found with one query, the rows are inserted with a
+    single multi-row INSERT ... RETURNING in one transaction, and the caches are
+    invalidated once.
+    
+    Args:
+        elderly_list: ElderlyCreate schemas of the elderly persons to add
+        user_id: ID of the current user (for data isolation)
+        db: Async database session
+        
+    Returns:
+        list[ElderlySchema]: The created elderly persons, in request order
+        
+    Raises:
+        HTTPException: If a custom_id appears twice in the batch or already exists for this user
+    """
+    custom_ids = [elderly.custom_id for elderly in elderly_list]
+    duplicates = sorted(custom_id for custom_id, count in Counter(custom_ids).items() if count > 1)
+    if duplicates:
+        raise HTTPException(status_code=400, detail=f"Duplicate elderly IDs in the request: {', '.join(map(str, duplicates))}")
 
-    return new_elderly
+    # Check all custom_ids against THIS USER's elderly persons in one query
+    existing = (await db.scalars(select(Elderly.custom_id).where(
+        Elderly.user_id == user_id,
+        Elderly.custom_id.in_(custom_ids)
+    ))).all()
+    if existing:
+        raise HTTPException(status_code=400, detail=f"Elderly with these IDs already exist for this user: {', '.join(map(str, sorted(existing)))}")
+
+    try:
+        # RETURNING rows may come back in any order; custom_ids are unique in the batch
+        result = await db.execute(
+            insert(Elderly).returning(Elderly.custom_id, Elderly.id),
+            [{"custom_id": elderly.custom_id, "name": elderly.name, "user_id": user_id} for elderly in elderly_list],
+        )
+        new_ids = dict(result.all())
+        await db.commit()
+    except IntegrityError:
+        # A concurrent request added one of the IDs (unique index on user_id, custom_id)
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Elderly with these IDs already exist for this user")
+
+    # Invalidate related caches once for the whole batch
+    await invalidate_tags_async(
+        tenant_tag(user_id, "elderly"),  # Clear user-specific list and page caches
+        *(elderly_tag(new_id) for new_id in new_ids.values()),  # Clear cached "not found" lookups of the new IDs
+    )
 
-def get_all_elderly_service(user_id: int, db: Session) -> list[ElderlySchema]:
+    return [
+        ElderlySchema(id=new_ids[elderly.custom_id], custom_id=elderly.custom_id, name=elderly.name, user_id=user_id)
+        for elderly in elderly_list
+    ]
+
+async def get_all_elderly_service(user_id: int, db: AsyncSession, as_json: bool = False) -> list[ElderlySchema] | bytes:
     """
     Retrieve all elderly persons for a specific user with Redis caching.
     
     Cache Strategy:
     - Cache key: "user_{user_id}_elderly_list"
+    - Tags: "tenant:{user_id}:elderly"
     - TTL: 300 seconds (5 minutes)
     - On cache hit: Return cached data
-    - On cache miss: Query DB, cache result, return data
+    - On cache miss: One request queries the DB and caches the result, concurrent ones wait for it
     
     Args:
         user_id: ID of the current user (for data isolation)
-        db: Database session
+        db: Async database session
+        as_json: Return the serialized JSON response body instead of models
         
     Returns:
-        list[ElderlySchema]: List of elderly persons for the current user
+        list[ElderlySchema] | bytes: List of elderly persons for the current user
     """
     cache_key = f"user_{user_id}_elderly_list"
 
-    # Try to get data from Redis cache first
-    cached_data = get_from_cache(cache_key)
-    if cached_data:
-        return [ElderlySchema(**e) for e in cached_data]
+    async def load() -> bytes:
+        # Cache miss - query database with user filter
+        # Nested relationships are loaded in bulk (selectin) so the query count stays constant
+        elderly = (await db.scalars(
+            select(Elderly)
+            .options(*elderly_tree_options("selectin"))
+            .where(Elderly.user_id == user_id)
+            .order_by(Elderly.id)
+        )).all()
+        with timed("serialize"):
+            result = [ElderlySchema.from_orm(e) for e in elderly]
+            return _elderly_list_json.dump_json(result)
+
+    # Try the cache first (this worker's L1, then Redis); concurrent misses share one load
+    body = await get_or_compute(cache_key, [tenant_tag(user_id, "elderly")], load, ttl=300)
+    return body if as_json else _elderly_list_json.validate_json(body)
 
-    # Cache miss - query database with user filter
-    elderly = db.query(Elderly).filter(Elderly.user_id == user_id).all()
-    result = [ElderlySchema.from_orm(e) for e in elderly]
+async def get_elderly_page_service(user_id: int, db: AsyncSession, limit: int, cursor: Optional[str] = None, as_json: bool = False) -> tuple[list[ElderlySchema] | bytes, Optional[str]]:
+    """
+    Retrieve one page of elderly persons for a specific user with Redis caching.
+    Uses keyset pagination on the elderly ID, so every page costs the same.
     
-    # Store result in cache for future requests
-    set_in_cache(cache_key, [e.dict() for e in result], ttl=300)
+    Cache Strategy:
+    - Cache key: "user_{user_id}_elderly_list_page_{after_id}_{limit}"
+    - Tags: "tenant:{user_id}:elderly" (invalidated together with the full list)
+    - TTL: 300 seconds (5 minutes)
+    
+    Args:
+        user_id: ID of the current user (for data isolation)
+        db: Async database session
+        limit: Maximum number of elderly persons on the page
+        cursor: Cursor returned by the previous page (None for the first page)
+        as_json: Return the serialized JSON response body instead of models
+        
+    Returns:
+        tuple: (list of ElderlySchema on this page or its JSON body, cursor for the next page or None)
+        
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    after_id = decode_cursor(cursor)
+    cache_key = f"user_{user_id}_elderly_list_page_{after_id}_{limit}"
+
+    async def load() -> bytes:
+        # Cache miss - query one page with user filter
+        stmt = select(Elderly).options(*elderly_tree_options("selectin")).where(Elderly.user_id == user_id)
+        elderly, next_cursor = await fetch_keyset_page(db, stmt, Elderly.id, limit, after_id)
+        with timed("serialize"):
+            result = [ElderlySchema.from_orm(e) for e in elderly]
+            return pack_page(_elderly_list_json.dump_json(result), next_cursor)
 
-    return result
+    # Try the cache first (this worker's L1, then Redis); concurrent misses share one load
+    body, next_cursor = unpack_page(await get_or_compute(cache_key, [tenant_tag(user_id, "elderly")], load, ttl=300))
+    return (body if as_json else _elderly_list_json.validate_json(body)), next_cursor
 
-def get_elderly_by_id_service(elderly_id: int, user_id: int, db: Session) -> ElderlySchema:
+async def get_elderly_by_id_service(elderly_id: int, user_id: int, db: AsyncSession, as_json: bool = False) -> ElderlySchema | bytes:
     """
     Retrieve a specific elderly person by ID for a specific user with Redis caching.
     
     Cache Strategy:
     - Cache key: "user_{user_id}_elderly_{elderly_id}"
-    - TTL: 300 seconds (5 minutes)
+    - Tags: "elderly:{elderly_id}"
+    - TTL: 300 seconds (5 minutes); "not found" is cached for NEGATIVE_CACHE_TTL (30 seconds)
     - On cache hit: Return cached data
-    - On cache miss: Query DB, cache result, return data
+    - On cache miss: One request queries the DB and caches the result, concurrent ones wait for it
     
     Args:
         elderly_id: ID of the elderly person to retrieve
         user_id: ID of the current user (for data isolation)
-        db: Database session
+        db: Async database session
+        as_json: Return the serialized JSON response body instead of a model
         
     Returns:
-        ElderlySchema: The elderly person data
+        ElderlySchema | bytes: The elderly person data
         
     Raises:
         HTTPException: If elderly person not found or doesn't belong to user
     """
     cache_key = f"user_{user_id}_elderly_{elderly_id}"
     
-    # Try to get data from Redis cache first
-    cached_data = get_from_cache(cache_key)
-    if cached_data:
-        return ElderlySchema(**cached_data)
-    
-    # Cache miss - query database with user filter
-    elderly = db.query(Elderly).filter(Elderly.id == elderly_id, Elderly.user_id == user_id).first()
-    if not elderly:
+    async def load() -> Optional[bytes]:
+        # Cache miss - query database with user filter
+        # selectin avoids the row explosion of joining three collections on one parent
+        elderly = await db.scalar(
+            select(Elderly)
+            .options(*elderly_tree_options("selectin"))
+            .where(Elderly.id == elderly_id, Elderly.user_id == user_id)
+        )
+        if not elderly:
+            return None  # Cached briefly as "not found"
+
+        # Convert to schema
+        with timed("serialize"):
+            result = ElderlySchema.from_orm(elderly)
+            return _elderly_json.dump_json(result)
+
+    # Try the cache first (this worker's L1, then Redis); concurrent misses share one load
+    body = await get_or_compute(cache_key, [elderly_tag(elderly_id)], load, ttl=300)
+    if body is None:
         raise HTTPException(status_code=404, detail="Elderly not found")
-    
-    # Convert to schema and cache the result
-    result = ElderlySchema.from_orm(elderly)
-    set_in_cache(cache_key, result.dict(), ttl=300)
-    
-    return result
+    return body if as_json else _elderly_json.validate_json(body)
 
-def delete_elderly_service(elderly_id: int, user_id: int, db: Session) -> dict:
+async def delete_elderly_service(elderly_id: int, user_id: int, db: AsyncSession) -> dict:
     """
     Delete an elderly person by ID for a specific user with Redis cache invalidation.
     
     Args:
         elderly_id: ID of the elderly person to delete
         user_id: ID of the current user (for data isolation)
-        db: Database session
+        db: Async database session
         
     Returns:
         dict: Success message
@@ -132,23 +260,36 @@ def delete_elderly_service(elderly_id: int, user_id: int, db: Session) -> dict:
         HTTPException: If elderly person not found or doesn't belong to user
     """
     # Check if elderly exists and belongs to the user
-    elderly = db.query(Elderly).filter(Elderly.id == elderly_id, Elderly.user_id == user_id).first()
+    # Nested collections are loaded up front so the ORM cascade can delete them
+    elderly = await db.scalar(
+        select(Elderly)
+        .options(*elderly_tree_options("selectin"))
+        .where(Elderly.id == elderly_id, Elderly.user_id == user_id)
+    )
     if not elderly:
         raise HTTPException(status_code=404, detail="Elderly not found")
 
+    # The cascade also deletes the assignments, so the assigned caregivers change too
+    caregiver_ids = {a.caregiver_id for a in elderly.assignments}
+
     # Delete from database
-    db.delete(elderly)
-    db.commit()
+    await db.delete(elderly)
+    await db.commit()
 
     # Invalidate related caches to ensure data consistency
-    delete_from_cache(f"user_{user_id}_elderly_list")  # Clear user-specific list cache
-    delete_from_cache(f"user_{user_id}_elderly_{elderly_id}")  # Clear user-specific individual cache
+    await invalidate_tags_async(
+        tenant_tag(user_id, "elderly"),  # Clear user-specific list and page caches
+        elderly_tag(elderly_id),  # Clear every view of this elderly person
+        tenant_tag(user_id, "assignments"),  # Clear user-specific assignments list and page caches
+        tenant_tag(user_id, "caregivers"),  # Clear user-specific caregiver list and page caches
+        *(caregiver_tag(c) for c in caregiver_ids),  # Clear the affected caregivers
+    )
 
     return {"message": f"Elderly {elderly_id} deleted successfully"}
 
 # ==================== TASK-RELATED SERVICES ====================
 
-def add_task_to_elderly_service(elderly_id: int, task: TaskCreate, user_id: int, db: Session) -> TaskSchema:
+async def add_task_to_elderly_service(elderly_id: int, task: TaskCreate, user_id: int, db: AsyncSession) -> TaskSchema:
     """
     Add a new task for an elderly person with Redis cache invalidation.
     Ensures the elderly person belongs to the current user for data isolation.
@@ -157,7 +298,7 @@ def add_task_to_elderly_service(elderly_id: int, task: TaskCreate, user_id: int,
         elderly_id: ID of the elderly person
         task: TaskCreate schema containing task data
         user_id: ID of the current user (for data isolation)
-        db: Database session
+        db: Async database session
         
     Returns:
         TaskSchema: The created task
@@ -166,23 +307,56 @@ def add_task_to_elderly_service(elderly_id: int, task: TaskCreate, user_id: int,
         HTTPException: If elderly person not found or doesn't belong to user
     """
     # Verify elderly person exists and belongs to the user
-    elderly = db.query(Elderly).filter(Elderly.id == elderly_id, Elderly.user_id == user_id).first()
+    elderly = await db.scalar(select(Elderly.id).where(Elderly.id == elderly_id, Elderly.user_id == user_id))
     if not elderly:
         raise HTTPException(status_code=404, detail="Elderly not found")
 
     # Create and save new task
-    new_task = Task(description=task.description, status=task.status, elderly=elderly)
+    new_task = Task(description=task.description, status=task.status, elderly_id=elderly_id)
     db.add(new_task)
-    db.commit()
-    db.refresh(new_task)
+    await db.commit()
     
     # Invalidate related caches to ensure data consistency
-    delete_from_cache(f"user_{user_id}_elderly_{elderly_id}")  # Clear user-specific elderly cache
-    delete_from_cache(f"user_{user_id}_elderly_list")  # Clear user-specific elderly list cache
+    await invalidate_tags_async(elderly_tag(elderly_id), tenant_tag(user_id, "elderly"))  # Clear the elderly person and the user-specific lists
+    
+    return TaskSchema.model_validate(new_task)
+
+async def add_tasks_bulk_service(elderly_id: int, tasks: list[TaskCreate], user_id: int, db: AsyncSession) -> list[TaskSchema]:
+    """
+    Add many tasks for an elderly person at once, all or none, with a single
+    multi-row INSERT ... RETURNING and one cache invalidation.
+    Ensures the elderly person belongs to the current user for data isolation.
     
-    return new_task
+    Args:
+        elderly_id: ID of the elderly person
+        tasks: TaskCreate schemas of the tasks to add
+        user_id: ID of the current user (for data isolation)
+        db: Async database session
+        
+    Returns:
+        list[TaskSchema]: The created tasks, ordered by ID
+        
+    Raises:
+        HTTPException: If elderly person not found or doesn't belong to user
+    """
+    # Verify elderly person exists and belongs to the user
+    elderly = await db.scalar(select(Elderly.id).where(Elderly.id == elderly_id, Elderly.user_id == user_id))
+    if not elderly:
+        raise HTTPException(status_code=404, detail="Elderly not found")
+
+    new_tasks = (await db.execute(
+        insert(Task).returning(Task.id, Task.description, Task.status),
+        [{"description": task.description, "status": task.status, "elderly_id": elderly_id} for task in tasks],
+    )).all()
+    await db.commit()
+
+    # Invalidate related caches once for the whole batch
+    await invalidate_tags_async(elderly_tag(elderly_id), tenant_tag(user_id, "elderly"))  # Clear the elderly person and the user-specific lists
+
+    # RETURNING rows may come back in any order
+    return [TaskSchema.model_validate(task) for task in sorted(new_tasks, key=lambda task: task.id)]
 
-def delete_task_from_elderly_service(elderly_id: int, task_id: int, user_id: int, db: Session) -> dict:
+async def delete_task_from_elderly_service(elderly_id: int, task_id: int, user_id: int, db: AsyncSession) -> dict:
     """
     Delete a task for an elderly person with Redis cache invalidation.
     Ensures the elderly person belongs to the current user for data isolation.
@@ -191,7 +365,7 @@ def delete_task_from_elderly_service(elderly_id: int, task_id: int, user_id: int
         elderly_id: ID of the elderly person
         task_id: ID of the task to delete
         user_id: ID of the current user (for data isolation)
-        db: Database session
+        db: Async database session
         
     Returns:
         dict: Success message
@@ -200,25 +374,24 @@ def delete_task_from_elderly_service(elderly_id: int, task_id: int, user_id: int
         HTTPException: If task not found or elderly doesn't belong to user
     """
     # Find and verify task exists and elderly belongs to user
-    task = db.query(Task).join(Elderly).filter(
+    task = await db.scalar(select(Task).join(Elderly).where(
         Task.id == task_id, 
         Task.elderly_id == elderly_id,
         Elderly.user_id == user_id
-    ).first()
+    ))
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
     # Delete from database
-    db.delete(task)
-    db.commit()
+    await db.delete(task)
+    await db.commit()
     
     # Invalidate related caches to ensure data consistency
-    delete_from_cache(f"user_{user_id}_elderly_{elderly_id}")  # Clear user-specific elderly cache
-    delete_from_cache(f"user_{user_id}_elderly_list")  # Clear user-specific elderly list cache
+    await invalidate_tags_async(elderly_tag(elderly_id), tenant_tag(user_id, "elderly"))  # Clear the elderly person and the user-specific lists
     
     return {"message": f"Task {task_id} deleted successfully"}
 
-def update_task_status_service(elderly_id: int, task_id: int, new_status: str, user_id: int, db: Session) -> TaskSchema:
+async def update_task_status_service(elderly_id: int, task_id: int, new_status: str, user_id: int, db: AsyncSession) -> TaskSchema:
     """
     Update the status of a task for an elderly person with Redis cache invalidation.
     Ensures the elderly person belongs to the current user for data isolation.
@@ -228,7 +401,7 @@ def update_task_status_service(elderly_id: int, task_id: int, new_status: str, u
         task_id: ID of the task to update
         new_status: New status for the task
         user_id: ID of the current user (for data isolation)
-        db: Database session
+        db: Async database session
         
     Returns:
         TaskSchema: The updated task
@@ -237,28 +410,26 @@ def update_task_status_service(elderly_id: int, task_id: int, new_status: str, u
         HTTPException: If task not found or elderly doesn't belong to user
     """
     # Find and verify task exists and elderly belongs to user
-    task = db.query(Task).join(Elderly).filter(
+    task = await db.scalar(select(Task).join(Elderly).where(
         Task.id == task_id, 
         Task.elderly_id == elderly_id,
         Elderly.user_id == user_id
-    ).first()
+    ))
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
     # Update task status
     task.status = new_status
-    db.commit()
-    db.refresh(task)
+    await db.commit()
     
     # Invalidate related caches to ensure data consistency
-    delete_from_cache(f"user_{user_id}_elderly_{elderly_id}")  # Clear user-specific elderly cache
-    delete_from_cache(f"user_{user_id}_elderly_list")  # Clear user-specific elderly list cache
+    await invalidate_tags_async(elderly_tag(elderly_id), tenant_tag(user_id, "elderly"))  # Clear the elderly person and the user-specific lists
     
-    return task
+    return TaskSchema.model_validate(task)
 
 # ==================== MEDICATION-RELATED SERVICES ====================
 
-def add_medication_to_elderly_service(elderly_id: int, medication: MedicationCreate, user_id: int, db: Session) -> MedicationResponse:
+async def add_medication_to_elderly_service(elderly_id: int, medication: MedicationCreate, user_id: int, db: AsyncSession) -> MedicationResponse:
     """
     Add a new medication for an elderly person with Redis cache invalidation.
     Ensures the elderly person belongs to the current user for data isolation.
@@ -267,7 +438,7 @@ def add_medication_to_elderly_service(elderly_id: int, medication: MedicationCre
         elderly_id: ID of the elderly person
         medication: MedicationCreate schema containing medication data
         user_id: ID of the current user (for data isolation)
-        db: Database session
+        db: Async database session
         
     Returns:
         MedicationResponse: The created medication
@@ -276,7 +447,7 @@ def add_medication_to_elderly_service(elderly_id: int, medication: MedicationCre
         HTTPException: If elderly person not found or doesn't belong to user
     """
     # Verify elderly person exists and belongs to the user
-    elderly = db.query(Elderly).filter(Elderly.id == elderly_id, Elderly.user_id == user_id).first()
+    elderly = await db.scalar(select(Elderly.id).where(Elderly.id == elderly_id, Elderly.user_id == user_id))
     if not elderly:
         raise HTTPException(status_code=404, detail="Elderly not found")
 
@@ -285,60 +456,103 @@ def add_medication_to_elderly_service(elderly_id: int, medication: MedicationCre
         name=medication.name,
         dosage=medication.dosage,
         frequency=medication.frequency,
-        elderly=elderly
+        elderly_id=elderly_id
     )
     db.add(new_medication)
-    db.commit()
-    db.refresh(new_medication)
+    await db.commit()
     
     # Invalidate related caches to ensure data consistency
-    delete_from_cache(f"user_{user_id}_elderly_{elderly_id}")  # Clear user-specific elderly cache
-    delete_from_cache(f"user_{user_id}_elderly_list")  # Clear user-specific elderly list cache
-    delete_from_cache(f"user_{user_id}_medications_elderly_{elderly_id}")  # Clear user-specific medications cache
+    await invalidate_tags_async(elderly_tag(elderly_id), tenant_tag(user_id, "elderly"))  # Clear the elderly person and the user-specific lists
     
-    return new_medication
+    return MedicationResponse.model_validate(new_medication)
 
-def get_medications_for_elderly_service(elderly_id: int, user_id: int, db: Session) -> list[MedicationResponse]:
+async def add_medications_bulk_service(elderly_id: int, medications: list[MedicationCreate], user_id: int, db: AsyncSession) -> list[MedicationResponse]:
+    """
+    Add many medications for an elderly person at once, all or none, with a single
+    multi-row INSERT ... RETURNING and one cache invalidation.
+    Ensures the elderly person belongs to the current user for data isolation.
+    
+    Args:
+        elderly_id: ID of the elderly person
+        medications: MedicationCreate schemas of the medications to add
+        user_id: ID of the current user (for data isolation)
+        db: Async database session
+        
+    Returns:
+        list[MedicationResponse]: The created medications, ordered by ID
+        
+    Raises:
+        HTTPException: If elderly person not found or doesn't belong to user
+    """
+    # Verify elderly person exists and belongs to the user
+    elderly = await db.scalar(select(Elderly.id).where(Elderly.id == elderly_id, Elderly.user_id == user_id))
+    if not elderly:
+        raise HTTPException(status_code=404, detail="Elderly not found")
+
+    new_medications = (await db.execute(
+        insert(Medication).returning(Medication.id, Medication.name, Medication.dosage, Medication.frequency),
+        [
+            {"name": medication.name, "dosage": medication.dosage, "frequency": medication.frequency, "elderly_id": elderly_id}
+            for medication in medications
+        ],
+    )).all()
+    await db.commit()
+
+    # Invalidate related caches once for the whole batch
+    await invalidate_tags_async(elderly_tag(elderly_id), tenant_tag(user_id, "elderly"))  # Clear the elderly person and the user-specific lists
+
+    # RETURNING rows may come back in any order
+    return [MedicationResponse.model_validate(medication) for medication in sorted(new_medications, key=lambda medication: medication.id)]
+
+async def get_medications_for_elderly_service(elderly_id: int, user_id: int, db: AsyncSession, as_json: bool = False) -> list[MedicationResponse] | bytes:
     """
     Retrieve all medications for an elderly person with Redis caching.
     Ensures the elderly person belongs to the current user for data isolation.
     
     Cache Strategy:
     - Cache key: "user_{user_id}_medications_elderly_{elderly_id}"
-    - TTL: 300 seconds (5 minutes)
+    - Tags: "elderly:{elderly_id}"
+    - TTL: 300 seconds (5 minutes); "not found" is cached for NEGATIVE_CACHE_TTL (30 seconds)
     - On cache hit: Return cached data
-    - On cache miss: Query DB, cache result, return data
+    - On cache miss: One request queries the DB and caches the result, concurrent ones wait for it
     
     Args:
         elderly_id: ID of the elderly person
         user_id: ID of the current user (for data isolation)
-        db: Database session
+        db: Async database session
+        as_json: Return the serialized JSON response body instead of models
         
     Returns:
-        list[MedicationResponse]: List of medications for the elderly person
+        list[MedicationResponse] | bytes: List of medications for the elderly person
         
     Raises:
         HTTPException: If elderly person not found or doesn't belong to user
     """
     cache_key = f"user_{user_id}_medications_elderly_{elderly_id}"
     
-    # Try to get data from Redis cache first
-    cached_data = get_from_cache(cache_key)
-    if cached_data:
-        return [MedicationResponse(**m) for m in cached_data]
-    
-    # Cache miss - query database with user filter
-    elderly = db.query(Elderly).filter(Elderly.id == elderly_id, Elderly.user_id == user_id).first()
-    if not elderly:
+    async def load() -> Optional[bytes]:
+        # Cache miss - query database with user filter
+        # Medications are joined into the same SELECT (single round trip)
+        elderly = (await db.execute(
+            select(Elderly)
+            .options(*elderly_medications_options("joined"))
+            .where(Elderly.id == elderly_id, Elderly.user_id == user_id)
+        )).unique().scalar_one_or_none()
+        if not elderly:
+            return None  # Cached briefly as "not found"
+
+        # Convert to schema
+        with timed("serialize"):
+            result = [MedicationResponse.from_orm(m) for m in elderly.medications]
+            return _medication_list_json.dump_json(result)
+
+    # Try the cache first (this worker's L1, then Redis); concurrent misses share one load
+    body = await get_or_compute(cache_key, [elderly_tag(elderly_id)], load, ttl=300)
+    if body is None:
         raise HTTPException(status_code=404, detail="Elderly not found")
-    
-    # Convert to schema and cache the result
-    result = [MedicationResponse.from_orm(m) for m in elderly.medications]
-    set_in_cache(cache_key, [m.dict() for m in result], ttl=300)
-    
-    return result
+    return body if as_json else _medication_list_json.validate_json(body)
 
-def delete_medication_from_elderly_service(elderly_id: int, medication_id: int, user_id: int, db: Session) -> dict:
+async def delete_medication_from_elderly_service(elderly_id: int, medication_id: int, user_id: int, db: AsyncSession) -> dict:
     """
     Delete a medication for an elderly person with Redis cache invalidation.
     Ensures the elderly person belongs to the current user for data isolation.
@@ -347,7 +561,7 @@ def delete_medication_from_elderly_service(elderly_id: int, medication_id: int,
         elderly_id: ID of the elderly person
         medication_id: ID of the medication to delete
         user_id: ID of the current user (for data isolation)
-        db: Database session
+        db: Async database session
         
     Returns:
         dict: Success message with medication name
@@ -356,11 +570,11 @@ def delete_medication_from_elderly_service(elderly_id: int, medication_id: int,
         HTTPException: If medication not found or elderly doesn't belong to user
     """
     # Find and verify medication exists and elderly belongs to user
-    medication = db.query(Medication).join(Elderly).filter(
+    medication = await db.scalar(select(Medication).join(Elderly).where(
         Medication.id == medication_id, 
         Medication.elderly_id == elderly_id,
         Elderly.user_id == user_id
-    ).first()
+    ))
     if not medication:
         raise HTTPException(status_code=404, detail="Medication not found")
 
@@ -368,12 +582,10 @@ def delete_medication_from_elderly_service(elderly_id: int, medication_id: int,
     medication_name = medication.name
     
     # Delete from database
-    db.delete(medication)
-    db.commit()
+    await db.delete(medication)
+    await db.commit()
     
     # Invalidate related caches to ensure data consistency
-    delete_from_cache(f"user_{user_id}_elderly_{elderly_id}")  # Clear user-specific elderly cache
-    delete_from_cache(f"user_{user_id}_elderly_list")  # Clear user-specific elderly list cache
-    delete_from_cache(f"user_{user_id}_medications_elderly_{elderly_id}")  # Clear user-specific medications cache
+    await invalidate_tags_async(elderly_tag(elderly_id), tenant_tag(user_id, "elderly"))  # Clear the elderly person and the user-specific lists
     
     return {"message": f"Medication '{medication_name}' deleted successfully"}
@@ -0,0 +1,205 @@
+import io
+import os
+import csv
+import json
+from datetime import date
+from typing import AsyncIterator, Optional
+import orjson
+from sqlalchemy import select, Integer, Float, Boolean, JSON
+from sqlalchemy.sql import Select
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from db.database import AsyncSessionLocal
+from models.elderly import Elderly
+from models.task import Task
+from models.medication import Medication
+from models.caregiver import Caregiver
+from models.caregiver_assignments import CaregiverAssignment
+
+# Export settings
+# - EXPORT_BATCH_ROWS: rows fetched per round trip from the server-side cursor and
+#   written per chunk (one Parquet row group); memory use depends on this, not on
+#   the size of the tenant
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "5000"))
+
+# format -> (file extension, media type)
+EXPORT_FORMATS = {
+    "ndjson": ("ndjson", "application/x-ndjson"),
+    "csv": ("csv", "text/csv; charset=utf-8"),
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+EXPORT_ENTITIES = ("elderly", "tasks", "medications", "caregivers", "assignments")
+
+def _export_query(entity: str, user_id: int) -> Select:
+    """Columns of one entity for one tenant, in ID order (tasks and medications through their elderly)."""
+    if entity == "elderly":
+        return select(Elderly.id, Elderly.custom_id, Elderly.name).where(Elderly.user_id == user_id).order_by(Elderly.id)
+    if entity == "tasks":
+        return (
+            select(Task.id, Task.elderly_id, Task.description, Task.status)
+            .join(Elderly, Task.elderly_id == Elderly.id)
+            .where(Elderly.user_id == user_id)
+            .order_by(Task.id)
+        )
+    if entity == "medications":
+        return (
+            select(Medication.id, Medication.elderly_id, Medication.name, Medication.dosage, Medication.frequency)
+            .join(Elderly, Medication.elderly_id == Elderly.id)
+            .where(Elderly.user_id == user_id)
+            .order_by(Medication.id)
+        )
+    if entity == "caregivers":
+        return select(
+            Caregiver.id, Caregiver.custom_id, Caregiver.name,
+            Caregiver.bank_name, Caregiver.bank_account, Caregiver.branch_number,
+            Caregiver.salary, Caregiver.saturday, Caregiver.allowance, Caregiver.total_bank
+        ).where(Caregiver.user_id == user_id).order_by(Caregiver.id)
+    return (
+        select(CaregiverAssignment.id, CaregiverAssignment.caregiver_id, CaregiverAssignment.elderly_id)
+        .where(CaregiverAssignment.user_id == user_id)
+        .order_by(CaregiverAssignment.id)
+    )
+
+async def export_service(user_id: int, export_format: str, entity: Optional[str] = None) -> tuple[str, str, AsyncIterator[bytes]]:
+    """
+    Export a tenant's data as a download stream.
+
+    - "ndjson": one JSON object per line. Without an entity, all entities are
+      exported one after the other, with their name in a "type" field.
+    - "csv": one entity, with a header row (JSON columns hold JSON text).
+    - "parquet": one entity, one row group per EXPORT_BATCH_ROWS rows (JSON
+      columns hold JSON text).
+
+    Rows are read through a server-side cursor EXPORT_BATCH_ROWS at a time and
+    written out as they arrive, so memory use does not grow with the tenant
+    (e.g. millions of tasks). The stream opens its own database session: the
+    request's session is closed once the response starts.
+
+    Args:
+        user_id: ID of the current user (for data isolation)
+        export_format: "ndjson", "csv" or "parquet"
+        entity: "elderly", "tasks", "medications", "caregivers" or "assignments"
+            (all of them if None; NDJSON only)
+
+    Returns:
+        tuple[str, str, AsyncIterator[bytes]]: Download filename, media type and the body stream
+
+    Raises:
+        HTTPException: If CSV or Parquet is requested without an entity, or pyarrow is not installed
+    """
+    if entity is None and export_format != "ndjson":
+        raise HTTPException(status_code=400, detail=f"Exporting {export_format} needs an entity")
+    if export_format == "parquet":
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            raise HTTPException(status_code=501, detail="Parquet export needs the pyarrow package")
+
+    extension, media_type = EXPORT_FORMATS[export_format]
+    filename = f"export_{entity or 'all'}_{date.today().isoformat()}.{extension}"
+    entities = [entity] if entity else list(EXPORT_ENTITIES)
+    writers = {"ndjson": _write_ndjson, "csv": _write_csv, "parquet": _write_parquet}
+    return filename, media_type, _stream_export(user_id, entities, writers[export_format], entity is None)
+
+async def _stream_export(user_id: int, entities: list[str], writer, tagged: bool) -> AsyncIterator[bytes]:
+    async with AsyncSessionLocal() as db:
+        if db.bind.dialect.name == "postgresql":
+            # One snapshot for all entities, so assignments match the exported caregivers
+            await db.connection(execution_options={"isolation_level": "REPEATABLE READ", "postgresql_readonly": True})
+        for entity in entities:
+            stmt = _export_query(entity, user_id).execution_options(yield_per=EXPORT_BATCH_ROWS)
+            result = await db.stream(stmt)
+            async for chunk in writer(entity if tagged else None, stmt, result.partitions()):
+                yield chunk
+
+def _json_columns(stmt: Select) -> set[str]:
+    return {column.name for column in stmt.selected_columns if isinstance(column.type, JSON)}
+
+def _json_text(value) -> Optional[str]:
+    return None if value is None else json.dumps(value)
+
+async def _write_ndjson(entity: Optional[str], stmt: Select, partitions) -> AsyncIterator[bytes]:
+    tag = {"type": entity} if entity else {}
+    async for rows in partitions:
+        yield b"".join(orjson.dumps({**tag, **row._mapping}) + b"\n" for row in rows)
+
+async def _write_csv(entity: Optional[str], stmt: Select, partitions) -> AsyncIterator[bytes]:
+    names = [column.name for column in stmt.selected_columns]
+    json_columns = _json_columns(stmt)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    async for rows in partitions:
+        writer.writerows(
+            [_json_text(value) if name in json_columns else value for name, value in zip(names, row)]
+            for row in rows
+        )
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()  # Header of an empty export
+
+class _ChunkSink:
+    """Write-only file for ParquetWriter that hands out the bytes written since the last take()."""
+
+    closed = False
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0  # Total bytes written; the Parquet footer records offsets from tell()
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def _arrow_type(column):
+    import pyarrow as pa
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    return pa.string()  # Strings and JSON text
+
+async def _write_parquet(entity: Optional[str], stmt: Select, partitions) -> AsyncIterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(column.name, _arrow_type(column)) for column in stmt.selected_columns])
+    json_columns = _json_columns(stmt)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+
+    def write_batch(rows):
+        columns = [
+            [_json_text(value) for value in values] if name in json_columns else values
+            for name, values in zip(schema.names, zip(*rows))
+        ]
+        writer.write_batch(pa.record_batch(columns, schema=schema))
+        return sink.take()
+
+    try:
+        async for rows in partitions:
+            # Encoding and compressing a row group is CPU work; keep it off the event loop
+            yield await run_in_threadpool(write_batch, rows)
+    finally:
+        writer.close()
+    yield sink.take()
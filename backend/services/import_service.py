@@ -0,0 +1,192 @@
+import io
+import os
+import csv
+import json
+import itertools
+from typing import BinaryIO
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import select, insert, JSON
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from models.elderly import Elderly
+from models.caregiver import Caregiver
+from schemas.elderly import ElderlyCreate
+from schemas.caregiver import CaregiverCreate
+from schemas.imports import ImportReport, ImportRowError
+from utils.redis_cache import invalidate_tags_async
+from utils.cache_tags import tenant_tag, elderly_tag, caregiver_tag
+
+# CSV import settings
+# - IMPORT_BATCH_ROWS: rows read, validated and saved per transaction; memory use
+#   depends on this, not on the size of the file
+# - IMPORT_MAX_ERRORS: rejected rows listed in the report (all of them are counted)
+IMPORT_BATCH_ROWS = int(os.getenv("IMPORT_BATCH_ROWS", "1000"))
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "100"))
+
+# kind -> (model, row schema, cache collection, entity tag, duplicate message)
+IMPORTERS = {
+    "elderly": (Elderly, ElderlyCreate, "elderly", elderly_tag, "Elderly with this ID already exists for this user"),
+    "caregivers": (Caregiver, CaregiverCreate, "caregivers", caregiver_tag, "Caregiver with this ID already exists for this user"),
+}
+
+def _read_batches(file: BinaryIO):
+    """Yield lists of (line number, row dict) from a CSV file, IMPORT_BATCH_ROWS at a time."""
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")  # utf-8-sig: Excel writes a BOM
+    try:
+        reader = csv.DictReader(text)
+        if reader.fieldnames is None:
+            return
+        yield reader.fieldnames
+        rows = ((reader.line_num, row) for row in reader)
+        while batch := list(itertools.islice(rows, IMPORT_BATCH_ROWS)):
+            yield batch
+    finally:
+        text.detach()  # Leave the upload open; the framework closes it
+
+def _format_errors(error: ValidationError) -> list[str]:
+    return [f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in error.errors()]
+
+async def _copy_rows(db: AsyncSession, model, rows: list[dict]):
+    """
+    Load rows with PostgreSQL COPY, in the session's transaction (begun by the
+    duplicate check). COPY skips SQLAlchemy, so column defaults (e.g. the caregiver
+    salary JSON) are filled in here.
+    """
+    import asyncpg
+
+    columns = list(rows[0])
+    defaults = {
+        column.name: column.default.arg
+        for column in model.__table__.columns
+        if column.name not in columns and column.default is not None and column.default.is_scalar
+    }
+    json_columns = {column.name for column in model.__table__.columns if isinstance(column.type, JSON)}
+    names = columns + list(defaults)
+    records = [
+        tuple(json.dumps(value) if name in json_columns else value
+              for name, value in zip(names, itertools.chain((row[c] for c in columns), defaults.values())))
+        for row in rows
+    ]
+    connection = await db.connection()
+    raw = await connection.get_raw_connection()
+    try:
+        await raw.driver_connection.copy_records_to_table(model.__tablename__, records=records, columns=names)
+    except asyncpg.IntegrityConstraintViolationError as e:
+        raise IntegrityError("COPY", None, e) from e
+
+async def import_csv_service(kind: str, file: BinaryIO, user_id: int, db: AsyncSession) -> ImportReport:
+    """
+    Import elderly persons or caregivers from a CSV file with a header row, e.g.
+    "custom_id,name" for elderly persons. The file is read and saved
+    IMPORT_BATCH_ROWS rows at a time, so memory use does not grow with its size.
+    For every batch:
+    - Rows are validated against ElderlyCreate / CaregiverCreate; rows with more or
+      fewer fields than the header are rejected
+    - Rows whose custom_id is already saved (also by an earlier row of the file)
+      are rejected; saved IDs are looked up with one query
+    - The valid rows are loaded with COPY on PostgreSQL (a multi-row INSERT
+      elsewhere) and committed, then the caches are invalidated once
+    Invalid rows are reported and skipped; they do not stop the import.
+
+    Args:
+        kind: "elderly" or "caregivers"
+        file: The uploaded CSV file (binary, UTF-8)
+        user_id: ID of the current user (for data isolation)
+        db: Async database session
+
+    Returns:
+        ImportReport: Rows imported and failed, with the errors of the first failed rows
+
+    Raises:
+        HTTPException: If the file is empty, not UTF-8 CSV, or misses a required column
+    """
+    model, schema, collection, entity_tag, duplicate_message = IMPORTERS[kind]
+    batches = _read_batches(file)
+    imported, failed, errors = 0, 0, []
+
+    def reject(line: int, messages: list[str]):
+        nonlocal failed
+        failed += 1
+        if len(errors) < IMPORT_MAX_ERRORS:
+            errors.append(ImportRowError(row=line, errors=messages))
+
+    try:
+        fieldnames = await run_in_threadpool(next, batches, None)
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(status_code=400, detail=f"Could not read the CSV file: {e}")
+    if fieldnames is None:
+        raise HTTPException(status_code=400, detail="The CSV file is empty")
+    missing = [name for name in schema.model_fields if name not in fieldnames]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Missing CSV columns: {', '.join(missing)}")
+
+    copy = (await db.connection()).dialect.name == "postgresql"
+    while True:
+        try:
+            batch = await run_in_threadpool(next, batches, None)
+        except (UnicodeDecodeError, csv.Error) as e:
+            # The rest of the file cannot be read; keep what was imported so far
+            reject(0, [f"Could not read the rest of the CSV file: {e}"])
+            break
+        if batch is None:
+            break
+
+        valid: list[tuple[int, BaseModel]] = []
+        for line, row in batch:
+            # A field count that does not match the header usually means a misplaced comma
+            if None in row:  # DictReader puts extra fields under the key None
+                reject(line, [f"Row has {len(fieldnames) + len(row[None])} fields, the header has {len(fieldnames)}"])
+                continue
+            if None in row.values():  # and fills missing fields with None
+                reject(line, [f"Row has {sum(v is not None for v in row.values())} fields, the header has {len(fieldnames)}"])
+                continue
+            try:
+                valid.append((line, schema.model_validate(row)))
+            except ValidationError as e:
+                reject(line, _format_errors(e))
+
+        # custom_ids already saved (also by earlier batches) in one query; within the
+        # batch the first row with an ID is kept and the later ones are rejected
+        custom_ids = list({item.custom_id for _, item in valid})
+        taken = set((await db.scalars(select(model.custom_id).where(
+            model.user_id == user_id,
+            model.custom_id.in_(custom_ids)
+        ))).all()) if custom_ids else set()
+        rows, lines = [], []
+        for line, item in valid:
+            if item.custom_id in taken:
+                reject(line, [f"custom_id: {duplicate_message}"])
+                continue
+            taken.add(item.custom_id)
+            rows.append({**item.model_dump(), "user_id": user_id})
+            lines.append(line)
+        if not rows:
+            continue
+
+        try:
+            if copy:
+                await _copy_rows(db, model, rows)
+            else:
+                await db.execute(insert(model), rows)
+            new_ids = (await db.scalars(select(model.id).where(
+                model.user_id == user_id,
+                model.custom_id.in_([row["custom_id"] for row in rows])
+            ))).all()
+            await db.commit()
+        except IntegrityError:
+            # A concurrent request added one of the IDs (unique index on user_id, custom_id)
+            await db.rollback()
+            for line in lines:
+                reject(line, ["Not saved: a row of this batch was added by another request at the same time"])
+            continue
+        imported += len(rows)
+
+        # Invalidate related caches once per batch
+        await invalidate_tags_async(
+            tenant_tag(user_id, collection),  # Clear user-specific list and page caches
+            *(entity_tag(new_id) for new_id in new_ids),  # Clear cached "not found" lookups of the new IDs
+        )
+
+    return ImportReport(imported=imported, failed=failed, errors=errors)
@@ -0,0 +1,18 @@
+# Cache tags shared by the services (see lookup_tagged / invalidate_tags in redis_cache).
+# Tenant tags cover the list views of one user, entity tags every view of one row.
+
+def tenant_tag(user_id: int, collection: str) -> str:
+    """Tag of a user's list views, e.g. tenant_tag(1, "elderly") -> "tenant:1:elderly"."""
+    return f"tenant:{user_id}:{collection}"
+
+def elderly_tag(elderly_id: int) -> str:
+    """Tag of every view showing one elderly person (details, medications)."""
+    return f"elderly:{elderly_id}"
+
+def caregiver_tag(caregiver_id: int) -> str:
+    """Tag of every view showing one caregiver."""
+    return f"caregiver:{caregiver_id}"
+
+def user_tag(user_id: int) -> str:
+    """Tag of a user's cached principal (used to authorize their requests)."""
+    return f"user:{user_id}"
@@ -0,0 +1,57 @@
+import threading
+import time
+
+class CircuitBreaker:
+    """
+    Stops calling a failing dependency (e.g. Redis) for a while.
+
+    - closed: calls go through; `failure_threshold` consecutive failures open the circuit.
+    - open: calls are skipped for `reset_timeout` seconds.
+    - half_open: after that, calls go through again; the first success closes
+      the circuit, the first failure opens it for another `reset_timeout`.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None  # monotonic time the circuit opened, None while closed
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current state: "closed", "open" or "half_open"."""
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return "open"
+            return "half_open"
+
+    def allow(self) -> bool:
+        """
+        Whether a call should be attempted now.
+
+        Returns:
+            bool: False while the circuit is open
+        """
+        return self.state != "open"
+
+    def record_success(self):
+        """Close the circuit after a successful call."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self):
+        """Count a failed call, opening the circuit at the threshold (or again, when half open)."""
+        with self._lock:
+            self._failures += 1
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+    def trip(self):
+        """Open the circuit immediately (e.g. the dependency is down at startup)."""
+        with self._lock:
+            self._failures = self.failure_threshold
+            self._opened_at = time.monotonic()
@@ -0,0 +1,185 @@
+import os
+import gzip
+import zlib
+from utils.request_timing import timed
+
+# Response compression negotiated with Accept-Encoding (brotli preferred, then gzip).
+# - RESPONSE_COMPRESSION: compress responses at all (on by default)
+# - COMPRESSION_MIN_BYTES: smaller bodies are sent as they are; compressing them
+#   costs more CPU than it saves on the wire
+# - GZIP_LEVEL / BROTLI_QUALITY: speed/ratio trade-off (1 fastest; gzip up to 9,
+#   brotli up to 11). The defaults compress large JSON lists 15-25x in a few milliseconds
+#   (see benchmarks/bench_compression.py).
+# Only text-like content types are compressed (JSON, NDJSON, CSV, ...); PDFs and ZIP
+# archives are compressed already. Streaming responses are compressed as they stream.
+#
+# brotli is optional; it is imported when first used, and without it only gzip is offered.
+RESPONSE_COMPRESSION = os.getenv("RESPONSE_COMPRESSION", "true").lower() in ("1", "true", "yes")
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+def _brotli_available() -> bool:
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+class _GzipStream:
+    def __init__(self):
+        # wbits 16 + MAX_WBITS: gzip header and trailer, as gzip.compress writes them
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+class _BrotliStream:
+    def __init__(self):
+        import brotli
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+def _gzip(data: bytes) -> bytes:
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+def _brotli(data: bytes) -> bytes:
+    import brotli
+    return brotli.compress(data, quality=BROTLI_QUALITY)
+
+# Supported codings by preference: name -> (compress a whole body, streaming compressor)
+CODINGS = {
+    "br": (_brotli, _BrotliStream),
+    "gzip": (_gzip, _GzipStream),
+}
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """
+    Pick the response coding for an Accept-Encoding request header.
+
+    Args:
+        accept_encoding: Header value, e.g. "gzip, deflate, br;q=0.9"
+
+    Returns:
+        str | None: "br" or "gzip", or None to send the body as it is
+    """
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+    best, best_weight = None, 0.0
+    for name in CODINGS:
+        if name == "br" and not _brotli_available():
+            continue
+        weight = weights.get(name, weights.get("*", 0.0))
+        if weight > best_weight:  # Ties keep the earlier (preferred) coding
+            best, best_weight = name, weight
+    return best
+
+def _weak_etag(headers: list) -> list:
+    # A compressed body is another representation, so its ETag must not be strong.
+    # If-None-Match uses weak comparison, so the weak ETag still matches (see utils/etags.py).
+    return [
+        (name, b"W/" + value if name == b"etag" and value.startswith(b'"') else value)
+        for name, value in headers
+    ]
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing text-like responses with the coding negotiated from
+    Accept-Encoding, above COMPRESSION_MIN_BYTES. Adds "Vary: Accept-Encoding" and turns
+    ETags of compressed responses (and of 304 answers to them) into weak ones.
+    Written as plain ASGI (not BaseHTTPMiddleware) so streaming responses stay streaming.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD" or not RESPONSE_COMPRESSION:
+            await self.app(scope, receive, send)
+            return
+        accept_encoding, if_none_match = "", b""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+            elif name == b"if-none-match":
+                if_none_match = value
+        coding = negotiate_encoding(accept_encoding) if accept_encoding else None
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None  # Held back until we know whether the body is compressed
+        stream = None  # Streaming compressor, once a streamed body is being compressed
+
+        async def send_compressed(message):
+            nonlocal start, stream
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+                content_type = next((v for n, v in headers if n == b"content-type"), b"").decode("latin-1")
+                if message["status"] == 304:
+                    # Confirm the ETag in the form the client has it (weak if its copy was compressed)
+                    if b"W/" in if_none_match:
+                        headers = _weak_etag(headers)
+                    await send({**message, "headers": headers + [(b"vary", b"Accept-Encoding")]})
+                elif content_type.startswith(COMPRESSIBLE_TYPES) and not any(n == b"content-encoding" for n, _ in headers):
+                    start = message
+                else:
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if stream is None:
+                headers = [(n, v) for n, v in start["headers"] if n != b"content-length"]
+                headers.append((b"vary", b"Accept-Encoding"))
+                if not more_body and len(body) < COMPRESSION_MIN_BYTES:
+                    headers.append((b"content-length", str(len(body)).encode()))
+                    await send({**start, "headers": headers})
+                    start = None
+                    await send(message)
+                    return
+                headers = _weak_etag(headers)
+                headers.append((b"content-encoding", coding.encode()))
+                if not more_body:
+                    compress, _ = CODINGS[coding]
+                    with timed("compress"):
+                        body = compress(body)
+                    headers.append((b"content-length", str(len(body)).encode()))
+                    await send({**start, "headers": headers})
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                # Streamed body: compressed chunk by chunk, without a Content-Length
+                _, stream_class = CODINGS[coding]
+                stream = stream_class()
+                await send({**start, "headers": headers})
+
+            with timed("compress"):
+                data = stream.compress(body)
+                if not more_body:
+                    data += stream.finish()
+            if data or not more_body:
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,78 @@
+import hashlib
+from typing import Optional
+from fastapi import Request, Response
+from utils.redis_cache import get_tag_generations_async
+
+def make_etag(value: str) -> str:
+    """
+    Build a strong ETag header value from an opaque version string (e.g. a content hash).
+    """
+    return f'"{value}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match request header against the current ETag.
+    Handles "*", comma-separated lists and weak validators (W/"...").
+
+    Args:
+        if_none_match: Value of the If-None-Match header (None if absent)
+        etag: The current ETag, including quotes
+
+    Returns:
+        bool: True if the client's copy is current (respond with 304)
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate == etag:
+            return True
+    return False
+
+# Conditional GETs of cached JSON views. The ETag of a view is derived from the
+# generations of its cache tags, which the services bump (invalidate_tags) on every
+# write, so it can be checked with one Redis round trip, before the view is loaded.
+
+async def view_etag(request: Request, user_id: int, tags: list[str]) -> Optional[str]:
+    """
+    Build the ETag of a cached view from the current generations of its tags.
+
+    Args:
+        request: The incoming request; its path and query identify the view
+        user_id: ID of the current user (views of the same URL differ per user)
+        tags: Cache tags of the view, as passed to get_or_compute by its service
+
+    Returns:
+        str: Strong ETag, or None while Redis is unavailable (no ETag is sent then)
+    """
+    generations = await get_tag_generations_async(tags)
+    if generations is None:
+        return None
+    version = f"{user_id}|{request.url.path}?{request.url.query}|{','.join(map(str, generations))}"
+    return make_etag(hashlib.sha256(version.encode()).hexdigest()[:32])
+
+def etag_headers(etag: Optional[str]) -> dict:
+    """
+    Headers sent with a view that has an ETag (none if it has no ETag).
+    private: the data belongs to one tenant; no-cache: revalidate with the ETag every time.
+    """
+    if etag is None:
+        return {}
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+def not_modified(request: Request, etag: Optional[str]) -> Optional[Response]:
+    """
+    Answer a conditional GET whose If-None-Match matches the current ETag.
+
+    Args:
+        request: The incoming request
+        etag: The view's current ETag (None if unknown)
+
+    Returns:
+        Response: 304 Not Modified, or None if the view has to be sent
+    """
+    if etag is None or not etag_matches(request.headers.get("if-none-match"), etag):
+        return None
+    return Response(status_code=304, headers=etag_headers(etag))
@@ -0,0 +1,326 @@
+import os
+import re
+import json
+import time
+import uuid
+import tempfile
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+
+class Histogram:
+    """
+    Thread-safe histogram with fixed upper bounds (Prometheus-style buckets).
+    Observations are counted in the first bucket whose bound is >= the value;
+    values above the last bound land in the "+Inf" bucket.
+    """
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        """
+        Record one observation.
+        
+        Args:
+            value: The observed value (e.g. seconds waited)
+        """
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def state(self) -> dict:
+        """Return a consistent copy of the raw (per-bucket) counts, count and sum."""
+        with self._lock:
+            return {"counts": list(self._counts), "sum": self._sum, "count": self._count}
+
+    def snapshot(self) -> dict:
+        """
+        Return a consistent copy of the histogram.
+        
+        Returns:
+            dict: Cumulative bucket counts keyed by upper bound, plus count and sum
+        """
+        return _cumulative(self.buckets, self.state())
+
+class Counter:
+    """Thread-safe monotonically increasing counter."""
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        """
+        Increase the counter.
+        
+        Args:
+            amount: Non-negative increment
+        """
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def state(self) -> float:
+        return self._value
+
+def _cumulative(buckets: tuple[float, ...], state: dict) -> dict:
+    cumulative = {}
+    running = 0
+    for bound, bucket_count in zip(buckets + (float("inf"),), state["counts"]):
+        running += bucket_count
+        cumulative["+Inf" if bound == float("inf") else str(bound)] = running
+    return {"buckets": cumulative, "count": state["count"], "sum": state["sum"]}
+
+def _merge(kind: str, a, b):
+    """Add up the states of the same series from two worker processes."""
+    if kind == "counter":
+        return a + b
+    return {
+        "counts": [x + y for x, y in zip(a["counts"], b["counts"])],
+        "sum": a["sum"] + b["sum"],
+        "count": a["count"] + b["count"],
+    }
+
+class MetricFamily:
+    """
+    A named metric with labels, holding one Counter or Histogram per label combination.
+    Children are created on first use; looking up an existing child takes no lock, and
+    each child has its own lock, so concurrent requests rarely wait on each other.
+    Values live in the worker process; see METRICS_DIR for adding them up across workers.
+    """
+
+    def __init__(self, name: str, help: str, kind: str, labelnames: tuple[str, ...], factory):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.labelnames = labelnames
+        self._factory = factory
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        """
+        Return the child for the given label values (in labelnames order).
+        
+        Args:
+            *values: Label values; keep them low-cardinality (route templates, not paths)
+            
+        Returns:
+            Counter | Histogram: The child metric
+        """
+        values = tuple(str(v) for v in values)
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._factory())
+        return child
+
+    def children(self) -> list[tuple[tuple, object]]:
+        return list(self._children.items())
+
+    def buckets(self) -> tuple[float, ...]:
+        return self._factory().buckets
+
+REGISTRY: list[MetricFamily] = []
+
+def counter(name: str, help: str, labelnames: tuple[str, ...] = ()) -> MetricFamily:
+    """Register a labelled counter."""
+    family = MetricFamily(name, help, "counter", labelnames, Counter)
+    REGISTRY.append(family)
+    return family
+
+def histogram(name: str, help: str, buckets: tuple[float, ...], labelnames: tuple[str, ...] = ()) -> MetricFamily:
+    """Register a labelled histogram."""
+    family = MetricFamily(name, help, "histogram", labelnames, lambda: Histogram(buckets))
+    REGISTRY.append(family)
+    return family
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names: tuple, values: tuple, **extra) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs += [f'{name}="{value}"' for name, value in extra.items()]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+# ==================== MULTIPLE WORKERS ====================
+# Under uvicorn --workers (or gunicorn) every worker process has its own values, and a
+# scrape reaches whichever worker accepts it. With METRICS_DIR set, each worker writes
+# its values to a file of its own in that directory every METRICS_WRITE_INTERVAL
+# seconds (and when it stops), and /metrics adds up the files of all workers, like
+# prometheus_client's multiprocess mode, so one scrape target covers the server.
+# Files of exited workers are kept so the totals never go down: empty the directory
+# before the server starts. Without METRICS_DIR, every series is labelled with the
+# worker="<pid>" that reports it and each worker has to be scraped on its own.
+METRICS_DIR = os.getenv("METRICS_DIR", "")
+METRICS_WRITE_INTERVAL = float(os.getenv("METRICS_WRITE_INTERVAL", "5"))
+
+_worker_file = None  # This worker's file in METRICS_DIR, named when the writer starts
+_writer_thread = None
+_writer_stop = threading.Event()
+
+def _dump(families: list[MetricFamily]) -> dict:
+    return {family.name: [[list(values), child.state()] for values, child in family.children()] for family in families}
+
+def write_worker_metrics():
+    """Write this worker's values to its file in METRICS_DIR (replaced atomically)."""
+    if not METRICS_DIR or _worker_file is None:
+        return
+    try:
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=METRICS_DIR, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(_dump(REGISTRY), f)
+        os.replace(tmp_path, os.path.join(METRICS_DIR, _worker_file))
+    except OSError:
+        pass
+
+def _write_periodically():
+    while not _writer_stop.wait(METRICS_WRITE_INTERVAL):
+        write_worker_metrics()
+
+def start_metrics_writer():
+    """Write this worker's values to METRICS_DIR in a background thread (if it is set)."""
+    global _worker_file, _writer_thread
+    if not METRICS_DIR or _writer_thread is not None:
+        return
+    # The random part keeps a later worker with the same PID from replacing the file
+    _worker_file = f"worker_{os.getpid()}_{uuid.uuid4().hex[:8]}.json"
+    _writer_stop.clear()
+    _writer_thread = threading.Thread(target=_write_periodically, name="metrics-writer", daemon=True)
+    _writer_thread.start()
+
+def stop_metrics_writer():
+    """Stop the writer thread and write the final values."""
+    global _writer_thread
+    if _writer_thread is None:
+        return
+    _writer_stop.set()
+    _writer_thread.join()
+    _writer_thread = None
+    write_worker_metrics()
+
+def _collect(families: list[MetricFamily]) -> dict:
+    """
+    Values of every series: this worker's own, plus those the other workers wrote to METRICS_DIR.
+    
+    Returns:
+        dict: family name -> {label values: state}
+    """
+    collected = {family.name: {values: child.state() for values, child in family.children()} for family in families}
+    if not METRICS_DIR:
+        return collected
+    kinds = {family.name: family.kind for family in families}
+    try:
+        names = [name for name in os.listdir(METRICS_DIR) if name.endswith(".json") and name != _worker_file]
+    except OSError:
+        return collected
+    for name in names:
+        try:
+            with open(os.path.join(METRICS_DIR, name)) as f:
+                dump = json.load(f)
+        except (OSError, ValueError):
+            continue  # Unreadable file: report the other workers
+        for family_name, series in dump.items():
+            if family_name not in collected:
+                continue
+            samples = collected[family_name]
+            for values, state in series:
+                values = tuple(values)
+                samples[values] = state if values not in samples else _merge(kinds[family_name], samples[values], state)
+    return collected
+
+def render_prometheus(families: list[MetricFamily] = None) -> str:
+    """
+    Render metrics in the Prometheus text exposition format (version 0.0.4).
+    With METRICS_DIR set, the values of all workers are added up; otherwise
+    this worker's values are rendered with a worker label.
+    
+    Args:
+        families: Metrics to render (default: every registered metric)
+        
+    Returns:
+        str: The exposition text
+    """
+    families = REGISTRY if families is None else families
+    extra = {} if METRICS_DIR else {"worker": str(os.getpid())}
+    collected = _collect(families)
+    lines = []
+    for family in families:
+        lines.append(f"# HELP {family.name} {family.help}")
+        lines.append(f"# TYPE {family.name} {family.kind}")
+        for values, state in sorted(collected[family.name].items()):
+            labels = _format_labels(family.labelnames, values, **extra)
+            if family.kind == "counter":
+                lines.append(f"{family.name}{labels} {state}")
+                continue
+            snapshot = _cumulative(family.buckets(), state)
+            for bound, count in snapshot["buckets"].items():
+                lines.append(f"{family.name}_bucket{_format_labels(family.labelnames, values, **extra, le=bound)} {count}")
+            lines.append(f"{family.name}_sum{labels} {snapshot['sum']}")
+            lines.append(f"{family.name}_count{labels} {snapshot['count']}")
+    return "\n".join(lines) + "\n"
+
+@contextmanager
+def observe_duration(histogram: Histogram):
+    """Observe the seconds the enclosed block takes in a histogram."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - started)
+
+def cache_key_family(key: str) -> str:
+    """
+    Group cache keys for metrics by dropping the tenant and replacing IDs and hashes,
+    e.g. "user_3_caregiver_12" -> "caregiver_{id}", "user_3_elderly_list_page_0_20" -> "elderly_list_page".
+    
+    Args:
+        key: The cache key
+        
+    Returns:
+        str: The key family
+    """
+    family = re.sub(r"^user_\d+_", "", key)
+    family = re.sub(r"_page_\d+_\d+$", "_page", family)
+    family = re.sub(r"[0-9a-f]{16,}", "{hash}", family)
+    return re.sub(r"\d+", "{id}", family)
+
+# ==================== APPLICATION METRICS ====================
+# Exposed in the Prometheus text format by GET /metrics (added up across workers with
+# METRICS_DIR, see above). METRICS_ENABLED=false stops the per-request metrics (latency and
+# SQL per request); the other collectors are too cheap to need a switch.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+SLOW_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+http_request_duration = histogram(
+    "http_request_duration_seconds", "Request latency by route template",
+    LATENCY_BUCKETS, ("method", "route", "status"))
+db_queries_per_request = histogram(
+    "db_queries_per_request", "SQL statements run per request",
+    QUERY_COUNT_BUCKETS, ("route",))
+db_time_per_request = histogram(
+    "db_time_per_request_seconds", "Time spent running SQL per request",
+    LATENCY_BUCKETS, ("route",))
+cache_requests = counter(
+    "cache_requests_total", "Cache lookups by key family and result (l1_hit, l2_hit, stale, miss, error)",
+    ("family", "result"))
+pdf_render_duration = histogram(
+    "pdf_render_duration_seconds", "PDF rendering time, including the wait for a worker process",
+    SLOW_BUCKETS, ("kind",))
+password_hash_duration = histogram(
+    "password_hash_duration_seconds", "bcrypt time, including the wait for a worker process",
+    SLOW_BUCKETS, ("operation",))
@@ -0,0 +1,105 @@
+import base64
+import binascii
+from typing import Optional
+from fastapi import HTTPException, Response
+
+DEFAULT_PAGE_LIMIT = 100  # Page size when a cursor is passed without a limit
+MAX_PAGE_LIMIT = 500  # Upper bound for the "limit" query parameter
+NEXT_CURSOR_HEADER = "X-Next-Cursor"  # Response header carrying the cursor of the next page
+
+def encode_cursor(last_id: int) -> str:
+    """
+    Encode the last row ID of a page into an opaque cursor string.
+    
+    Args:
+        last_id: ID of the last row on the current page
+        
+    Returns:
+        str: URL-safe cursor for the next page
+    """
+    return base64.urlsafe_b64encode(f"id:{last_id}".encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: Optional[str]) -> int:
+    """
+    Decode a cursor back into the row ID to continue after.
+    
+    Args:
+        cursor: Cursor returned by a previous page, or None for the first page
+        
+    Returns:
+        int: The ID to continue after (0 for the first page)
+        
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    if not cursor:
+        return 0
+    try:
+        decoded = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        prefix, last_id = decoded.split(":", 1)
+        if prefix != "id":
+            raise ValueError(decoded)
+        return int(last_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def fetch_keyset_page(db, stmt, id_column, limit: int, after_id: int) -> tuple[list, Optional[str]]:
+    """
+    Fetch one page of rows using keyset pagination on the ID column.
+    
+    Unlike OFFSET, "WHERE id > :after_id ORDER BY id LIMIT :limit" reads only
+    the rows it returns, so every page costs the same no matter how deep it is.
+    One extra row is fetched to find out whether a next page exists.
+    
+    Args:
+        db: Async database session
+        stmt: SELECT statement already filtered to the current user
+        id_column: Primary key column to paginate on
+        limit: Maximum number of rows on the page
+        after_id: ID to continue after (0 for the first page)
+        
+    Returns:
+        tuple: (rows on this page, cursor for the next page or None)
+    """
+    rows = (await db.scalars(stmt.where(id_column > after_id).order_by(id_column).limit(limit + 1))).all()
+    if len(rows) <= limit:
+        return list(rows), None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].id)
+
+def pack_page(body: bytes, next_cursor: Optional[str]) -> bytes:
+    """
+    Combine a serialized page and its next cursor into one cache value.
+    
+    Args:
+        body: The page's JSON response body
+        next_cursor: Cursor for the next page, or None
+        
+    Returns:
+        bytes: The cursor (empty on the last page), a newline, then the body
+    """
+    return (next_cursor or "").encode() + b"\n" + body
+
+def unpack_page(data: bytes) -> tuple[bytes, Optional[str]]:
+    """
+    Split a value created by pack_page.
+    
+    Args:
+        data: The cached value
+        
+    Returns:
+        tuple: (the page's JSON response body, cursor for the next page or None)
+    """
+    cursor, _, body = data.partition(b"\n")
+    return body, cursor.decode() or None
+
+def set_next_cursor_header(response: Response, next_cursor: Optional[str]):
+    """
+    Expose the next page cursor to the client (omitted on the last page).
+    
+    Args:
+        response: The outgoing response
+        next_cursor: Cursor for the next page, or None
+    """
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
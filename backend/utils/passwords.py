@@ -0,0 +1,66 @@
+import os
+from passlib.context import CryptContext
+from utils.process_pool import run_in_process_pool
+from utils.metrics import password_hash_duration, observe_duration
+
+# bcrypt settings
+# - BCRYPT_ROUNDS: cost factor for new hashes (each +1 doubles the CPU time, 12 is ~250ms)
+# - PASSWORD_HASH_WORKERS: processes dedicated to hashing/verification; this bounds how
+#   many bcrypt operations run at once. 0 runs them in the threadpool instead.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+
+# Password hashing
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a plain password against its hash.
+
+    Args:
+        plain_password: The plain text password
+        hashed_password: The hashed password from database
+
+    Returns:
+        bool: True if password matches, False otherwise
+    """
+    return pwd_context.verify(plain_password, hashed_password)
+
+def get_password_hash(password: str) -> str:
+    """
+    Hash a password using bcrypt.
+
+    Args:
+        password: The plain text password
+
+    Returns:
+        str: The hashed password
+    """
+    return pwd_context.hash(password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password in the password process pool without blocking the event loop.
+
+    Args:
+        plain_password: The plain text password
+        hashed_password: The hashed password from database
+
+    Returns:
+        bool: True if password matches, False otherwise
+    """
+    with observe_duration(password_hash_duration.labels("verify")):
+        return await run_in_process_pool("passwords", PASSWORD_HASH_WORKERS, verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Hash a password in the password process pool without blocking the event loop.
+
+    Args:
+        password: The plain text password
+
+    Returns:
+        str: The hashed password
+    """
+    with observe_duration(password_hash_duration.labels("hash")):
+        return await run_in_process_pool("passwords", PASSWORD_HASH_WORKERS, get_password_hash, password)
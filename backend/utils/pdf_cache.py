@@ -0,0 +1,142 @@
+import os
+import tempfile
+import threading
+from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from utils.redis_cache import (
+    redis_available, get_bytes_from_cache, set_bytes_in_cache,
+    get_many_bytes_from_cache, set_many_bytes_in_cache, run_in_redis_thread,
+)
+
+# Rendered PDF reports, keyed by their content hash.
+# Stored in Redis when it is available (entries expire after PDF_CACHE_TTL seconds and
+# Redis' maxmemory policy evicts them under pressure), otherwise on local disk in
+# PDF_CACHE_DIR, where the least recently used files are removed once the directory
+# grows beyond PDF_CACHE_MAX_BYTES.
+PDF_CACHE_TTL = int(os.getenv("PDF_CACHE_TTL", "86400"))
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", os.path.join(tempfile.gettempdir(), "elder_care_pdf_cache"))
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", str(100 * 1024 * 1024)))
+
+_disk_lock = threading.Lock()
+
+def _cache_key(content_hash: str) -> str:
+    return f"pdf_caregiver_{content_hash}"
+
+def _disk_path(content_hash: str) -> str:
+    return os.path.join(PDF_CACHE_DIR, f"{content_hash}.pdf")
+
+def get_cached_pdf(content_hash: str) -> Optional[bytes]:
+    """
+    Look up a rendered PDF by its content hash.
+
+    Args:
+        content_hash: Hash from pdf_content_hash
+
+    Returns:
+        bytes: The PDF, or None if it is not cached
+    """
+    if redis_available():
+        return get_bytes_from_cache(_cache_key(content_hash))
+    return _read_from_disk(content_hash)
+
+def _read_from_disk(content_hash: str) -> Optional[bytes]:
+    path = _disk_path(content_hash)
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    try:
+        os.utime(path)  # Mark as recently used for eviction
+    except OSError:
+        pass
+    return data
+
+def set_cached_pdf(content_hash: str, data: bytes):
+    """
+    Store a rendered PDF under its content hash.
+
+    Args:
+        content_hash: Hash from pdf_content_hash
+        data: The PDF bytes
+    """
+    if redis_available():
+        set_bytes_in_cache(_cache_key(content_hash), data, ttl=PDF_CACHE_TTL)
+        return
+    _write_to_disk({content_hash: data})
+
+def _write_to_disk(pdfs: dict[str, bytes]):
+    try:
+        os.makedirs(PDF_CACHE_DIR, exist_ok=True)
+        for content_hash, data in pdfs.items():
+            # Write to a unique name first so readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=PDF_CACHE_DIR, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, _disk_path(content_hash))
+        _evict_disk_cache()
+    except OSError:
+        pass
+
+def get_cached_pdfs(content_hashes: list[str]) -> list[Optional[bytes]]:
+    """
+    Look up several rendered PDFs at once (one MGET when Redis is available).
+
+    Args:
+        content_hashes: Hashes from pdf_content_hash
+
+    Returns:
+        list: The PDF of each hash, or None where it is not cached
+    """
+    if redis_available():
+        return get_many_bytes_from_cache([_cache_key(content_hash) for content_hash in content_hashes])
+    return [_read_from_disk(content_hash) for content_hash in content_hashes]
+
+def set_cached_pdfs(pdfs: dict[str, bytes]):
+    """
+    Store several rendered PDFs at once (one pipelined round trip when Redis is available).
+
+    Args:
+        pdfs: The PDF bytes by content hash
+    """
+    if redis_available():
+        set_many_bytes_in_cache({_cache_key(content_hash): data for content_hash, data in pdfs.items()}, ttl=PDF_CACHE_TTL)
+        return
+    _write_to_disk(pdfs)
+
+async def get_cached_pdf_async(content_hash: str) -> Optional[bytes]:
+    """get_cached_pdf for coroutines: Redis or the disk is read without blocking the event loop."""
+    if redis_available():
+        return await run_in_redis_thread(get_cached_pdf, content_hash)
+    return await run_in_threadpool(get_cached_pdf, content_hash)
+
+async def get_cached_pdfs_async(content_hashes: list[str]) -> list[Optional[bytes]]:
+    """get_cached_pdfs for coroutines: Redis or the disk is read without blocking the event loop."""
+    if redis_available():
+        return await run_in_redis_thread(get_cached_pdfs, content_hashes)
+    return await run_in_threadpool(get_cached_pdfs, content_hashes)
+
+async def set_cached_pdfs_async(pdfs: dict[str, bytes]):
+    """set_cached_pdfs for coroutines: Redis or the disk is written without blocking the event loop."""
+    if redis_available():
+        await run_in_redis_thread(set_cached_pdfs, pdfs)
+    else:
+        await run_in_threadpool(set_cached_pdfs, pdfs)
+
+def _evict_disk_cache():
+    """Remove the least recently used PDFs until the directory fits PDF_CACHE_MAX_BYTES."""
+    with _disk_lock:
+        entries = []
+        for entry in os.scandir(PDF_CACHE_DIR):
+            if entry.name.endswith(".pdf"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= PDF_CACHE_MAX_BYTES:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
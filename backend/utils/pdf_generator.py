@@ -1,14 +1,20 @@
+import hashlib
+import json
 from fpdf import FPDF
-from datetime import datetime
+from datetime import date
+from typing import Optional
+
+# Bump when the report layout changes so cached PDFs are not reused
+PDF_TEMPLATE_VERSION = 1
 
 
 class PDFGenerator:
-    def __init__(self, caregiver_name: str):
+    def __init__(self, caregiver_name: str, report_date: Optional[date] = None):
         self.pdf = FPDF()
         self.pdf.add_page()
         self.pdf.set_font("Helvetica", size=12)
         self.caregiver_name = caregiver_name
-        self.current_date = datetime.now().strftime("%Y-%m-%d")
+        self.current_date = (report_date or date.today()).strftime("%Y-%m-%d")
 
     def add_title(self, caregiver):
         self.pdf.set_fill_color(220, 220, 220)
@@ -73,20 +79,57 @@ class PDFGenerator:
         )
         self.pdf.cell(0, 10, transfer_details, ln=True, align='L')
 
-    def save_pdf(self, filename: str):
-        try:
-            self.pdf.output(filename)
-        except Exception as e:
-            print(f"Error creating PDF: {e}")
-        return filename
-
-
-def generate_caregiver_pdf(caregiver):
-    pdf_gen = PDFGenerator(caregiver_name=caregiver.name)
-    pdf_gen.add_title(caregiver)  # Pass caregiver object to access custom_id
-    pdf_gen.add_table(caregiver)
-    pdf_gen.add_footer(caregiver)
-
-    # Use custom_id for filename (user-friendly ID)
-    filename = f"caregiver_{caregiver.custom_id}_report.pdf"
-    return pdf_gen.save_pdf(filename)
+    def add_report(self, caregiver, new_page: bool = False):
+        # Title, salary table and transfer details for one caregiver
+        if new_page:
+            self.pdf.add_page()
+        self.caregiver_name = caregiver.name
+        self.add_title(caregiver)
+        self.add_table(caregiver)
+        self.add_footer(caregiver)
+
+    def to_bytes(self) -> bytes:
+        # fpdf 1.x returns the document as a latin-1 string, fpdf2 as a bytearray
+        output = self.pdf.output(dest="S")
+        return output.encode("latin-1") if isinstance(output, str) else bytes(output)
+
+
+def pdf_content_hash(caregiver, report_date: date) -> str:
+    """
+    Hash of everything printed on a caregiver report, used as cache key and ETag.
+    Two reports with the same hash show exactly the same content.
+    """
+    content = {
+        "template": PDF_TEMPLATE_VERSION,
+        "date": report_date.isoformat(),
+        "name": caregiver.name,
+        "custom_id": caregiver.custom_id,
+        "salary": caregiver.salary,
+        "saturday": caregiver.saturday,
+        "allowance": caregiver.allowance,
+        "total_bank": caregiver.total_bank,
+        "bank_name": caregiver.bank_name,
+        "bank_account": caregiver.bank_account,
+        "branch_number": caregiver.branch_number,
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+
+def render_caregiver_pdf(caregiver, report_date: date) -> bytes:
+    """Render a caregiver salary report in memory and return the PDF bytes."""
+    pdf_gen = PDFGenerator(caregiver_name=caregiver.name, report_date=report_date)
+    pdf_gen.add_report(caregiver)
+    return pdf_gen.to_bytes()
+
+
+def render_caregiver_pdfs(caregivers: list, report_date: date) -> list[bytes]:
+    """Render one PDF per caregiver (a batch job for a worker process)."""
+    return [render_caregiver_pdf(caregiver, report_date) for caregiver in caregivers]
+
+
+def render_caregiver_reports_pdf(caregivers: list, report_date: date) -> bytes:
+    """Render the reports of several caregivers into one PDF, one page each."""
+    pdf_gen = PDFGenerator(caregiver_name=caregivers[0].name, report_date=report_date)
+    for i, caregiver in enumerate(caregivers):
+        pdf_gen.add_report(caregiver, new_page=i > 0)
+    return pdf_gen.to_bytes()
@@ -0,0 +1,48 @@
+import asyncio
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from fastapi.concurrency import run_in_threadpool
+
+# Named process pools for CPU-bound work (bcrypt, PDF rendering), created on first use.
+# Each kind of work gets its own pool so one cannot starve the other.
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_process_pool(name: str, workers: int) -> ProcessPoolExecutor:
+    """
+    Return the process pool registered under `name`, creating it on first use.
+
+    Args:
+        name: Pool name (e.g. "passwords")
+        workers: Number of worker processes for a new pool
+
+    Returns:
+        ProcessPoolExecutor: The shared pool
+    """
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            # "spawn" keeps the workers free of the parent's threads, sockets and DB connections.
+            # Idle workers are joined by concurrent.futures when the interpreter exits.
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pools[name] = pool
+        return pool
+
+async def run_in_process_pool(name: str, workers: int, func, *args):
+    """
+    Run a picklable, module-level function in a named process pool without blocking the event loop.
+
+    Args:
+        name: Pool name
+        workers: Number of worker processes; 0 runs the function in the threadpool instead
+        func: The function to call
+        *args: Positional arguments for the function
+
+    Returns:
+        The function's return value
+    """
+    if workers <= 0:
+        return await run_in_threadpool(func, *args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_process_pool(name, workers), func, *args)
@@ -0,0 +1,95 @@
+import threading
+import time
+from utils import redis_cache
+
+class FixedWindowCounter:
+    """
+    Counts events per key in fixed time windows (e.g. failed logins per email).
+    Counters live in Redis so every worker shares them; when Redis is not
+    available they fall back to this process's memory.
+    """
+
+    def __init__(self, prefix: str, window: int):
+        self.prefix = prefix
+        self.window = window
+        self._local = {}  # key -> (window_ends_at, count)
+        self._lock = threading.Lock()
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}_{key}"
+
+    def get(self, key: str) -> tuple[int, int]:
+        """
+        Current count for a key.
+
+        Args:
+            key: The counted key (e.g. an email address)
+
+        Returns:
+            tuple[int, int]: Count in the current window and seconds until the window resets
+        """
+        def read():
+            pipe = redis_cache.r.pipeline()
+            pipe.get(self._key(key))
+            pipe.ttl(self._key(key))
+            return pipe.execute()
+
+        result = redis_cache.call_redis(read)
+        if result is not None:
+            count, ttl = result
+            return int(count or 0), max(int(ttl), 0)
+        with self._lock:
+            ends_at, count = self._local.get(key, (0, 0))
+            remaining = ends_at - time.monotonic()
+            if remaining <= 0:
+                return 0, 0
+            return count, int(remaining) + 1
+
+    def hit(self, key: str) -> int:
+        """
+        Count one event; the window starts with the first event.
+
+        Args:
+            key: The counted key
+
+        Returns:
+            int: Count in the current window, including this event
+        """
+        def increment():
+            # One MULTI: the TTL is set with the first INCR (and on a key that lost it),
+            # so a failure between the two commands cannot leave a counter that never expires
+            pipe = redis_cache.r.pipeline(transaction=True)
+            pipe.incr(self._key(key))
+            pipe.expire(self._key(key), self.window, nx=True)
+            count, _ = pipe.execute()
+            return count
+
+        count = redis_cache.call_redis(increment)
+        if count is not None:
+            return count
+        with self._lock:
+            now = time.monotonic()
+            # Drop finished windows so the fallback does not grow without bound
+            if len(self._local) > 10000:
+                self._local = {k: v for k, v in self._local.items() if v[0] > now}
+            ends_at, count = self._local.get(key, (0, 0))
+            if ends_at <= now:
+                ends_at, count = now + self.window, 0
+            self._local[key] = (ends_at, count + 1)
+            return count + 1
+
+    def reset(self, key: str):
+        """
+        Forget the count for a key (e.g. after a successful login).
+
+        Args:
+            key: The counted key
+        """
+        redis_cache.call_redis(lambda: redis_cache.r.delete(self._key(key)))
+        with self._lock:
+            self._local.pop(key, None)
+
+    def clear(self):
+        """Forget all in-process counts (used by tests)."""
+        with self._lock:
+            self._local.clear()
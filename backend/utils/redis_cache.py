@@ -1,59 +1,181 @@
 import os
 import redis
 import json
+import math
+import random
+import time
+import uuid
+import asyncio
+import threading
+import functools
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from utils.circuit_breaker import CircuitBreaker
+from utils.serializers import Codec
+from utils.ttl_cache import TTLCache
+from utils.request_timing import timed
+from utils.metrics import cache_requests, cache_key_family
 
 # Get the Redis host from environment variable or default to "localhost"
 redis_host = os.getenv("REDIS_HOST", "localhost")
 redis_port = 6379  # Default Redis port
 
-# Create a Redis client connection
+# Connection settings
+# - REDIS_SOCKET_TIMEOUT / REDIS_CONNECT_TIMEOUT: seconds before a hung command or
+#   connection attempt fails; the cache is an optimization, so keep them short
+# - REDIS_MAX_CONNECTIONS: connections per pool (per worker)
+# - REDIS_FAILURE_THRESHOLD / REDIS_RETRY_INTERVAL: consecutive failures that open the
+#   circuit breaker, and seconds the cache is skipped before Redis is tried again
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "0.25"))
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", "0.25"))
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+REDIS_FAILURE_THRESHOLD = int(os.getenv("REDIS_FAILURE_THRESHOLD", "3"))
+REDIS_RETRY_INTERVAL = float(os.getenv("REDIS_RETRY_INTERVAL", "5"))
+
+# Cached values are serialized with CACHE_SERIALIZER ("orjson", "msgpack" or "json");
+# values of at least CACHE_COMPRESS_MIN_BYTES are compressed with CACHE_COMPRESSION
+# ("none", "zstd" or "lz4"). See utils/serializers.py.
+codec = Codec(
+    serializer=os.getenv("CACHE_SERIALIZER", "orjson"),
+    compression=os.getenv("CACHE_COMPRESSION", "none"),
+    compress_min_bytes=int(os.getenv("CACHE_COMPRESS_MIN_BYTES", "16384")),
+)
+
+_pool_options = dict(
+    host=redis_host,
+    port=redis_port,
+    db=0,                   # Redis has numbered databases; we use the default (0)
+    socket_timeout=REDIS_SOCKET_TIMEOUT,
+    socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+    socket_keepalive=True,
+    health_check_interval=30,  # Ping connections that were idle longer than this before reuse
+    max_connections=REDIS_MAX_CONNECTIONS,
+)
+
+# Connections are opened lazily and re-opened after errors, so a Redis that was down
+# at startup or restarted later is picked up without restarting the API
+r = redis.Redis(connection_pool=redis.ConnectionPool(
+    decode_responses=True,  # Automatically decode bytes to strings
+    **_pool_options,
+))
+
+# Second client without response decoding, for binary values (cached values, PDF reports)
+r_binary = redis.Redis(connection_pool=redis.ConnectionPool(**_pool_options))
+
+# Skips Redis while it is failing, so an outage costs one timeout per retry
+# interval instead of one per request
+breaker = CircuitBreaker(failure_threshold=REDIS_FAILURE_THRESHOLD, reset_timeout=REDIS_RETRY_INTERVAL)
+
 try:
-    r = redis.Redis(
-        host=redis_host,
-        port=redis_port,
-        db=0,                   # Redis has numbered databases; we use the default (0)
-        decode_responses=True   # Automatically decode bytes to strings
-    )
-    # Test the connection
     r.ping()
-    REDIS_AVAILABLE = True
-except (redis.ConnectionError, ConnectionRefusedError):
-    print("⚠️ Redis not available, caching disabled")
-    REDIS_AVAILABLE = False
-    r = None
+except (redis.RedisError, OSError):
+    print("⚠️ Redis not available, caching disabled until it is reachable")
+    breaker.trip()
+
+def redis_available() -> bool:
+    """Whether Redis should be used right now (False while the circuit breaker is open)."""
+    return breaker.allow()
 
-def get_from_cache(key: str):
+def call_redis(operation, default=None, force: bool = False):
     """
-    Try to retrieve a value from Redis using the given key.
-    If found, deserialize it from JSON and return the Python object.
-    If not found, return None.
+    Run Redis commands through the circuit breaker.
+    
+    Args:
+        operation (Callable): Function without arguments that sends the commands.
+        default (Any): Returned when Redis is skipped or the commands fail.
+        force (bool): Try even while the circuit is open (for invalidations, which
+            must not be lost while Redis is reachable again).
+        
+    Returns:
+        Any: The operation's result, or default.
+    """
+    if not force and not breaker.allow():
+        return default
+    try:
+        with timed("cache"):
+            result = operation()
+    except (redis.RedisError, OSError):
+        breaker.record_failure()
+        return default
+    breaker.record_success()
+    return result
+
+# redis-py blocks on the socket for up to REDIS_SOCKET_TIMEOUT per command, so coroutines
+# send commands from this thread pool instead of the event loop: a slow or stalled Redis
+# then holds these threads, not every request of the worker. It gets half of each
+# connection pool; the other half is left to the threadpool that runs sync dependencies
+# (e.g. the user lookup of every authenticated request).
+_redis_threads = ThreadPoolExecutor(max_workers=max(REDIS_MAX_CONNECTIONS // 2, 1), thread_name_prefix="redis")
+
+async def run_in_redis_thread(func, *args):
+    """
+    Run a function that sends Redis commands in the Redis thread pool, without
+    blocking the event loop. The caller's context (e.g. the request timings) is kept.
+    
+    Args:
+        func (Callable): The function to call.
+        *args: Positional arguments for the function.
+        
+    Returns:
+        Any: The function's return value.
+    """
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(_redis_threads, functools.partial(context.run, func, *args))
+
+def run_redis_nowait(func, *args):
+    """
+    Run a function that sends Redis commands from code that cannot await it (e.g. an
+    ORM event during an AsyncSession commit). On the event loop's thread it is handed
+    to the Redis thread pool without waiting for it; elsewhere it runs right away.
+    
+    Args:
+        func (Callable): The function to call.
+        *args: Positional arguments for the function.
     """
-    if not REDIS_AVAILABLE:
-        return None
     try:
-        value = r.get(key)
-        if value:
-            return json.loads(value)
-    except:
-        pass
-    return None
+        asyncio.get_running_loop()
+    except RuntimeError:
+        func(*args)
+        return
+    _redis_threads.submit(contextvars.copy_context().run, func, *args)
+
+_FAILED = object()  # call_redis default that tells a failed (or skipped) call from a miss
+
+def _count_lookup(key: str, result: str):
+    cache_requests.labels(cache_key_family(key), result).inc()
+
+def get_from_cache(key: str, default=None):
+    """
+    Try to retrieve a value from Redis using the given key.
+    If found, deserialize it and return the Python object.
+    If not found, return default (pass a sentinel to tell a cached None apart).
+    """
+    value = call_redis(lambda: r_binary.get(key), default=_FAILED)
+    if value is _FAILED:
+        _count_lookup(key, "error")
+        return default
+    if value is not None:
+        try:
+            decoded = codec.decode(value)
+            _count_lookup(key, "l2_hit")
+            return decoded
+        except ValueError:
+            pass
+    _count_lookup(key, "miss")
+    return default
 
 def set_in_cache(key: str, value, ttl: int = 300):
     """
     Store a value in Redis under the given key, with an optional time-to-live (TTL).
-    The value is serialized to JSON before storing.
+    The value is serialized with the configured codec before storing.
     
     Args:
         key (str): The cache key.
-        value (Any): The Python object to cache.
+        value (Any): The Python object to cache (JSON-compatible, or bytes).
         ttl (int): Time to live in seconds (default is 300 seconds = 5 minutes).
     """
-    if not REDIS_AVAILABLE:
-        return
-    try:
-        r.setex(key, ttl, json.dumps(value))
-    except:
-        pass
+    data = codec.encode(value)
+    call_redis(lambda: r_binary.setex(key, ttl, data))
 
 def delete_from_cache(key: str):
     """
@@ -62,9 +184,580 @@ def delete_from_cache(key: str):
     Args:
         key (str): The cache key to delete.
     """
-    if not REDIS_AVAILABLE:
+    call_redis(lambda: r.delete(key), force=True)
+
+def get_bytes_from_cache(key: str):
+    """
+    Retrieve a binary value from Redis using the given key.
+    Returns None if the key is missing or Redis is unavailable.
+    """
+    value = call_redis(lambda: r_binary.get(key), default=_FAILED)
+    if value is _FAILED:
+        _count_lookup(key, "error")
+        return None
+    _count_lookup(key, "miss" if value is None else "l2_hit")
+    return value
+
+def set_bytes_in_cache(key: str, value: bytes, ttl: int = 300):
+    """
+    Store a binary value in Redis under the given key, with a time-to-live (TTL).
+    
+    Args:
+        key (str): The cache key.
+        value (bytes): The raw bytes to cache.
+        ttl (int): Time to live in seconds (default is 300 seconds = 5 minutes).
+    """
+    call_redis(lambda: r_binary.setex(key, ttl, value))
+
+def get_many_bytes_from_cache(keys: list[str]) -> list:
+    """
+    Retrieve several binary values from Redis in one MGET.
+    Returns None for every key that is missing, or for all of them if Redis is unavailable.
+    """
+    if not keys:
+        return []
+    values = call_redis(lambda: r_binary.mget(keys), default=_FAILED)
+    if values is _FAILED:
+        for key in keys:
+            _count_lookup(key, "error")
+        return [None] * len(keys)
+    for key, value in zip(keys, values):
+        _count_lookup(key, "miss" if value is None else "l2_hit")
+    return values
+
+def set_many_bytes_in_cache(values: dict[str, bytes], ttl: int = 300):
+    """
+    Store several binary values in Redis in one pipelined round trip.
+    
+    Args:
+        values (dict[str, bytes]): The raw bytes to cache, by key.
+        ttl (int): Time to live in seconds of each value (default is 300 seconds = 5 minutes).
+    """
+    def write():
+        pipe = r_binary.pipeline(transaction=False)
+        for key, value in values.items():
+            pipe.setex(key, ttl, value)
+        return pipe.execute()
+
+    if values:
+        call_redis(write)
+
+# ==================== TAGGED ENTRIES ====================
+# Cached views are tagged with the data they depend on, e.g. "tenant:1:elderly"
+# (every elderly list of user 1) or "elderly:7" (everything showing elderly person 7).
+# Every tag has a generation counter in Redis. An entry remembers the generations of
+# its tags when it was computed and is only served while they are unchanged, so one
+# INCR per tag invalidates every view built on that data, including views that are
+# added later, without knowing their keys.
+#
+# Entries are cached in two tiers:
+# - L1: a small LRU in each worker process holding the decoded values, so a hit
+#   costs no network round trip or decoding.
+# - L2: Redis, shared by all workers.
+# invalidate_tags also publishes the tags on INVALIDATION_CHANNEL; every worker's
+# listener drops its L1 entries for them. L1 is only used while the listener is
+# subscribed, and it is emptied whenever the subscription is lost, because
+# invalidations sent in the meantime are missed. L1_CACHE_TTL bounds how long a
+# worker can serve an entry in the (short) window before a message arrives.
+TAG_KEY_PREFIX = "tag:"
+INVALIDATION_CHANNEL = "cache:invalidate"
+L1_CACHE_SIZE = int(os.getenv("L1_CACHE_SIZE", "2048"))  # Entries per worker, 0 disables L1
+L1_CACHE_TTL = float(os.getenv("L1_CACHE_TTL", "30"))  # Seconds
+
+_l1 = TTLCache(maxsize=L1_CACHE_SIZE, ttl=L1_CACHE_TTL)
+_l1_lock = threading.Lock()
+_l1_epoch = 0  # Bumped whenever L1 is emptied
+_l1_tag_versions = {}  # tag -> number of invalidations seen by this worker
+_seen_generations = {}  # tag -> generation last returned by get_tag_generations in this worker
+_listener_ready = threading.Event()
+_listener_stop = threading.Event()
+_listener_thread = None
+
+_stats_lock = threading.Lock()
+_stats = {
+    "l1_hits": 0, "l1_misses": 0, "l2_hits": 0, "l2_misses": 0,
+    "coalesced": 0, "lock_waits": 0, "stale_served": 0, "early_recomputes": 0,
+}
+
+def _count(name: str):
+    with _stats_lock:
+        _stats[name] += 1
+
+def _l1_enabled() -> bool:
+    return L1_CACHE_SIZE > 0 and _listener_ready.is_set()
+
+def _l1_snapshot(tags: list[str]) -> tuple:
+    """Local version of the given tags; an L1 entry is valid while it is unchanged."""
+    with _l1_lock:
+        return (_l1_epoch, tuple(_l1_tag_versions.get(tag, 0) for tag in tags))
+
+def local_tag_snapshot(tags: list[str]) -> tuple:
+    """
+    This worker's version of the given tags. It changes when one of them is
+    invalidated, here or (through the invalidation listener) by another worker,
+    so in-process caches outside L1 can store it with an entry and drop the
+    entry once it differs.
+    """
+    return _l1_snapshot(tags)
+
+def _l1_invalidate(tags):
+    with _l1_lock:
+        for tag in tags:
+            _l1_tag_versions[tag] = _l1_tag_versions.get(tag, 0) + 1
+
+def _l1_clear():
+    global _l1_epoch
+    with _l1_lock:
+        _l1_epoch += 1
+        _l1_tag_versions.clear()
+        _l1.clear()
+
+class TaggedEntry:
+    """
+    Result of lookup_tagged: the cached value (when hit is True) and the tag
+    generations seen by the lookup. On a miss, compute the value and call store();
+    if one of the tags is invalidated in the meantime, the stored entry is never served.
+    When stale is True the entry is due for recomputation, but value may still be
+    served in the meantime (see get_or_compute). A hit can carry any value, including
+    an empty list or None (a cached "not found").
+    """
+
+    def __init__(self, key: str, generations, value=None, hit: bool = False, snapshot=None, stale: bool = False):
+        self.key = key
+        self.generations = generations
+        self.value = value
+        self.hit = hit
+        self.snapshot = snapshot
+        self.stale = stale
+
+    def store(self, value, ttl: int = 300, stale_ttl: int = 0, delta: float = 0.0):
+        """
+        Cache a freshly computed value for this entry.
+        
+        Args:
+            value (Any): The Python object to cache (JSON-compatible, or bytes such
+                as a serialized response body).
+            ttl (int): Seconds the value is fresh (default is 300 seconds = 5 minutes).
+            stale_ttl (int): Seconds it is kept after that, to be served while it is recomputed.
+            delta (float): Seconds it took to compute, for probabilistic early recomputation.
+        """
+        if self.generations is None:
+            return
+        # Stored as "<generation>,<generation>... <fresh until> <delta>\n" followed by the encoded value
+        header = f"{','.join(map(str, self.generations))} {time.time() + ttl:.3f} {delta:.4f}"
+        data = header.encode() + b"\n" + codec.encode(value)
+        if not call_redis(lambda: r_binary.setex(self.key, ttl + stale_ttl, data)):
+            return
+        if self.snapshot is not None:
+            _l1.set(self.key, (self.snapshot, value), ttl=min(ttl, L1_CACHE_TTL))
+
+    async def store_async(self, value, ttl: int = 300, stale_ttl: int = 0, delta: float = 0.0):
+        """store() for coroutines: the value is encoded and written in the Redis thread pool."""
+        if self.generations is not None:
+            await run_in_redis_thread(self.store, value, ttl, stale_ttl, delta)
+
+def _recompute_early(fresh_until: float, delta: float, beta: float, now: float) -> bool:
+    """
+    XFetch: recompute a fresh entry before it expires with a probability that grows
+    as expiry approaches and with the time the value takes to compute, so one
+    request refreshes a hot entry ahead of time instead of all of them at expiry.
+    """
+    if beta <= 0 or delta <= 0:
+        return False
+    return now - delta * beta * math.log(1.0 - random.random()) >= fresh_until
+
+def _lookup_l1(key: str, tags: list[str]) -> tuple:
+    """
+    First part of lookup_tagged, without network I/O.
+    
+    Returns:
+        tuple: (entry, snapshot); entry is set on an L1 hit or when Redis is
+        unavailable, otherwise Redis has to be read with the L1 snapshot
+    """
+    if not redis_available():
+        _count_lookup(key, "error")
+        return TaggedEntry(key, None), None
+
+    # Taken before reading Redis: an invalidation that arrives while we read makes
+    # the snapshot outdated, so the value is never served from L1
+    snapshot = None
+    if _l1_enabled():
+        snapshot = _l1_snapshot(tags)
+        entry = _l1.get(key)
+        if entry is not None and entry[0] == snapshot:
+            _count("l1_hits")
+            _count_lookup(key, "l1_hit")
+            return TaggedEntry(key, None, entry[1], hit=True), snapshot
+        _count("l1_misses")
+    return None, snapshot
+
+def _lookup_l2(key: str, tags: list[str], beta: float, snapshot) -> TaggedEntry:
+    """Second part of lookup_tagged: the entry and its tag generations from Redis."""
+    def read():
+        pipe = r_binary.pipeline(transaction=False)
+        pipe.get(key)
+        pipe.mget([TAG_KEY_PREFIX + tag for tag in tags])
+        return pipe.execute()
+
+    result = call_redis(read)
+    if result is None:
+        _count_lookup(key, "error")
+        return TaggedEntry(key, None)
+    raw, generations = result
+
+    generations = [int(g or 0) for g in generations]
+    if raw:
+        try:
+            header, _, data = raw.partition(b"\n")
+            stored_generations, fresh_until, delta = header.split(b" ")
+            if [int(g) for g in stored_generations.split(b",") if g] == generations:
+                value = codec.decode(data)
+                now = time.time()
+                fresh_until, delta = float(fresh_until), float(delta)
+                if now < fresh_until and not _recompute_early(fresh_until, delta, beta, now):
+                    _count("l2_hits")
+                    _count_lookup(key, "l2_hit")
+                    if snapshot is not None:
+                        _l1.set(key, (snapshot, value), ttl=min(L1_CACHE_TTL, fresh_until - now))
+                    return TaggedEntry(key, generations, value, hit=True)
+                if now < fresh_until:
+                    _count("early_recomputes")
+                _count("l2_misses")
+                _count_lookup(key, "stale")
+                return TaggedEntry(key, generations, value, snapshot=snapshot, stale=True)
+        except ValueError:
+            pass
+    _count("l2_misses")
+    _count_lookup(key, "miss")
+    return TaggedEntry(key, generations, snapshot=snapshot)
+
+def lookup_tagged(key: str, tags: list[str], beta: float = 0.0) -> TaggedEntry:
+    """
+    Look up a tagged entry, first in this worker's L1 cache, then in Redis.
+    In Redis, the entry and its tag generations are read in a single pipelined round trip.
+    
+    Args:
+        key (str): The cache key.
+        tags (list[str]): Tags of the data the cached view depends on.
+        beta (float): XFetch factor; above 0, a fresh Redis entry is sometimes reported
+            as stale shortly before it expires (higher means earlier).
+        
+    Returns:
+        TaggedEntry: hit is True if the entry exists, is fresh and none of its tags were
+        invalidated; stale is True if it expired (or is picked for early recomputation)
+        but can still be served.
+    """
+    entry, snapshot = _lookup_l1(key, tags)
+    if entry is not None:
+        return entry
+    return _lookup_l2(key, tags, beta, snapshot)
+
+async def lookup_tagged_async(key: str, tags: list[str], beta: float = 0.0) -> TaggedEntry:
+    """
+    lookup_tagged for coroutines: L1 hits are served on the event loop, Redis is
+    read (and the value decoded) in the Redis thread pool.
+    """
+    entry, snapshot = _lookup_l1(key, tags)
+    if entry is not None:
+        return entry
+    return await run_in_redis_thread(_lookup_l2, key, tags, beta, snapshot)
+
+def _new_generation() -> int:
+    # Generations start at a random value, so after Redis loses a counter (restart,
+    # flush, eviction) it does not count through the values it had before
+    return random.getrandbits(48)
+
+def get_tag_generations(tags: list[str]) -> list[int] | None:
+    """
+    Read the current generations of the given tags in one round trip, e.g. to
+    derive an ETag. Tags without a generation get a random one.
+    L1 entries of tags whose generation changed since this worker last read it are
+    dropped, so a view served after this call is at least as new as the returned
+    generations even if the invalidation message has not arrived yet.
+
+    Args:
+        tags (list[str]): Tags of the data a view depends on.
+
+    Returns:
+        list[int] | None: The generations, or None if Redis is unavailable.
+    """
+    if not redis_available():
+        return None
+    keys = [TAG_KEY_PREFIX + tag for tag in tags]
+
+    def read():
+        pipe = r.pipeline(transaction=False)
+        for key in keys:
+            pipe.set(key, _new_generation(), nx=True)
+        pipe.mget(keys)
+        return pipe.execute()[-1]
+
+    result = call_redis(read)
+    if result is None:
+        return None
+    generations = [int(g) for g in result]
+    with _l1_lock:
+        changed = [tag for tag, g in zip(tags, generations) if _seen_generations.get(tag) != g]
+        _seen_generations.update(zip(tags, generations))
+    if changed:
+        _l1_invalidate(changed)
+    return generations
+
+async def get_tag_generations_async(tags: list[str]) -> list[int] | None:
+    """get_tag_generations for coroutines (reads from the Redis thread pool)."""
+    if not redis_available():
+        return None
+    return await run_in_redis_thread(get_tag_generations, tags)
+
+def invalidate_tags(*tags: str):
+    """
+    Invalidate every entry tagged with any of the given tags.
+    All generation counters are bumped and the tags are published to the
+    other workers in one MULTI/EXEC round trip. This is attempted even while
+    the circuit breaker is open: another worker may still reach Redis and
+    would otherwise keep serving the old entries.
+    
+    Args:
+        *tags (str): Tags of the data that changed.
+    """
+    if not tags:
+        return
+    tags = list(dict.fromkeys(tags))  # Drop duplicates, keep order
+    _l1_invalidate(tags)
+
+    def bump():
+        pipe = r.pipeline(transaction=True)
+        for tag in tags:
+            pipe.set(TAG_KEY_PREFIX + tag, _new_generation(), nx=True)
+            pipe.incr(TAG_KEY_PREFIX + tag)
+        pipe.publish(INVALIDATION_CHANNEL, json.dumps(tags))
+        return pipe.execute()
+
+    call_redis(bump, force=True)
+
+async def invalidate_tags_async(*tags: str):
+    """
+    invalidate_tags for coroutines. This worker's L1 entries are dropped right away;
+    the generations are bumped and published from the Redis thread pool.
+    """
+    if tags:
+        _l1_invalidate(list(dict.fromkeys(tags)))
+        await run_in_redis_thread(invalidate_tags, *tags)
+
+def _listen_for_invalidations(client):
+    """Apply invalidations published by any worker to this worker's L1 cache, reconnecting as needed."""
+    while not _listener_stop.is_set():
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(INVALIDATION_CHANNEL)
+            breaker.record_success()  # Redis is reachable again, stop skipping it
+            _listener_ready.set()
+            while not _listener_stop.is_set():
+                message = pubsub.get_message(timeout=1.0)
+                if message:
+                    _l1_invalidate(json.loads(message["data"]))
+        except Exception:
+            pass
+        finally:
+            # Invalidations may be missed from now on, so stop trusting L1
+            _listener_ready.clear()
+            _l1_clear()
+            try:
+                pubsub.close()
+            except Exception:
+                pass
+        _listener_stop.wait(REDIS_RETRY_INTERVAL)  # Back off before reconnecting
+
+def start_invalidation_listener():
+    """Subscribe to invalidation messages in a background thread (enables L1)."""
+    global _listener_thread
+    if L1_CACHE_SIZE <= 0 or _listener_thread is not None:
         return
+    _listener_stop.clear()
+    _listener_thread = threading.Thread(target=_listen_for_invalidations, args=(r,), name="cache-invalidation", daemon=True)
+    _listener_thread.start()
+    if redis_available():
+        _listener_ready.wait(timeout=1.0)  # So L1 serves the first requests already
+
+def stop_invalidation_listener():
+    """Stop the invalidation listener and empty L1."""
+    global _listener_thread
+    if _listener_thread is None:
+        return
+    _listener_stop.set()
+    _listener_thread.join()
+    _listener_thread = None
+
+# ==================== STAMPEDE PROTECTION ====================
+# When a popular entry expires or is invalidated by a write, every concurrent request
+# misses at once. get_or_compute lets only one of them recompute it:
+# - within a worker, concurrent misses of the same entry await the first one's result;
+# - across workers, the computing request holds a Redis lock ("lock:<key>:<generations>")
+#   and the others poll the cache until the value appears (or the lock expires).
+# Requests that have to wait for a recomputation get the expired value instead when
+# it was kept for CACHE_STALE_TTL seconds (stale-while-revalidate), and with
+# CACHE_XFETCH_BETA > 0 hot entries are recomputed shortly before they expire.
+# Entries whose tags were invalidated are never served stale: writes stay visible
+# to the next read.
+LOCK_KEY_PREFIX = "lock:"
+CACHE_LOCK_TIMEOUT = float(os.getenv("CACHE_LOCK_TIMEOUT", "10"))  # Seconds; also the longest wait for another worker
+CACHE_LOCK_POLL_INTERVAL = 0.05  # Seconds between cache reads while another worker computes
+CACHE_STALE_TTL = int(os.getenv("CACHE_STALE_TTL", "60"))  # Seconds an expired entry may still be served, 0 disables
+CACHE_XFETCH_BETA = float(os.getenv("CACHE_XFETCH_BETA", "1.0"))  # Early recomputation factor, 0 disables
+# compute returning None means "not found" (e.g. an ID that does not exist); that is
+# cached too, but only for NEGATIVE_CACHE_TTL seconds, so IDs probed repeatedly (by
+# scanners or stale clients) don't reach the database every time
+NEGATIVE_CACHE_TTL = int(os.getenv("NEGATIVE_CACHE_TTL", "30"))  # Seconds, 0 disables
+
+_in_flight = {}  # (key, generations, local tag versions) -> asyncio.Future of the value being computed
+
+def _acquire_lock(lock_key: str):
+    """
+    Take the recomputation lock for an entry.
+    
+    Returns:
+        str | None: The lock token, "" if Redis is unavailable (compute without a lock),
+        or None if another request holds the lock.
+    """
+    token = uuid.uuid4().hex
+    acquired = call_redis(lambda: r.set(lock_key, token, nx=True, px=int(CACHE_LOCK_TIMEOUT * 1000)), default="")
+    if acquired == "":
+        return ""
+    return token if acquired else None
+
+def _release_lock(lock_key: str, token: str):
+    """Release the lock unless it expired and was taken by another request in the meantime."""
+    def release():
+        with r.pipeline() as pipe:
+            pipe.watch(lock_key)
+            if pipe.get(lock_key) == token:
+                pipe.multi()
+                pipe.delete(lock_key)
+                pipe.execute()
+            else:
+                pipe.unwatch()
+
+    call_redis(release)
+
+async def _compute_with_lock(cached: TaggedEntry, tags: list[str], compute, ttl: int, stale_ttl: int, negative_ttl: int):
+    """Compute and store an entry while holding its Redis lock, or wait for the worker that holds it."""
+    deadline = time.monotonic() + CACHE_LOCK_TIMEOUT
+    waited = False
+    while True:
+        if cached.generations is None:
+            return await compute()  # Redis is unavailable: nothing to share or store
+
+        lock_key = f"{LOCK_KEY_PREFIX}{cached.key}:{','.join(map(str, cached.generations))}"
+        token = await run_in_redis_thread(_acquire_lock, lock_key)
+        if token is not None or time.monotonic() >= deadline:
+            try:
+                started = time.perf_counter()
+                value = await compute()
+                if value is not None:
+                    await cached.store_async(value, ttl=ttl, stale_ttl=stale_ttl, delta=time.perf_counter() - started)
+                elif negative_ttl > 0:
+                    await cached.store_async(None, ttl=negative_ttl)
+                return value
+            finally:
+                if token:
+                    await run_in_redis_thread(_release_lock, lock_key, token)
+
+        # Another worker is computing the entry
+        if cached.stale:
+            _count("stale_served")
+            return cached.value
+        if not waited:
+            _count("lock_waits")
+            waited = True
+        await asyncio.sleep(CACHE_LOCK_POLL_INTERVAL)
+        cached = await lookup_tagged_async(cached.key, tags)
+        if cached.hit:
+            return cached.value
+
+async def get_or_compute(key: str, tags: list[str], compute, ttl: int = 300, stale_ttl: int = None, beta: float = None, negative_ttl: int = None):
+    """
+    Return a tagged entry from the cache, computing it on a miss with stampede protection.
+    
+    Args:
+        key (str): The cache key.
+        tags (list[str]): Tags of the data the cached view depends on.
+        compute (Callable): Coroutine function without arguments that computes the value
+            (e.g. queries the database), or returns None if it does not exist; its
+            exceptions reach every waiting request.
+        ttl (int): Seconds the value is fresh (default is 300 seconds = 5 minutes).
+        stale_ttl (int): Seconds an expired value may be served while it is recomputed
+            (defaults to CACHE_STALE_TTL).
+        beta (float): XFetch factor for early recomputation (defaults to CACHE_XFETCH_BETA).
+        negative_ttl (int): Seconds a None result is cached (defaults to NEGATIVE_CACHE_TTL).
+        
+    Returns:
+        Any: The cached or computed value (None if compute found nothing).
+    """
+    stale_ttl = CACHE_STALE_TTL if stale_ttl is None else stale_ttl
+    beta = CACHE_XFETCH_BETA if beta is None else beta
+    negative_ttl = NEGATIVE_CACHE_TTL if negative_ttl is None else negative_ttl
+
+    cached = await lookup_tagged_async(key, tags, beta=beta)
+    if cached.hit:
+        return cached.value
+
+    # A computation that started before an invalidation must not be shared with
+    # requests that already see it, so the generations are part of the key
+    flight = (key, tuple(cached.generations or ()), _l1_snapshot(tags))
+    future = _in_flight.get(flight)
+    if future is not None:
+        if cached.stale:
+            _count("stale_served")
+            return cached.value
+        _count("coalesced")
+        return await asyncio.shield(future)
+
+    future = asyncio.get_running_loop().create_future()
+    _in_flight[flight] = future
     try:
-        r.delete(key)
-    except:
-        pass
\ No newline at end of file
+        value = await _compute_with_lock(cached, tags, compute, ttl, stale_ttl, negative_ttl)
+    except BaseException as e:
+        if isinstance(e, asyncio.CancelledError):
+            future.cancel()
+        else:
+            future.set_exception(e)
+            future.exception()  # Waiters re-raise it; don't log it as unretrieved
+        raise
+    else:
+        future.set_result(value)
+        return value
+    finally:
+        del _in_flight[flight]
+
+def get_cache_stats() -> dict:
+    """
+    Report hit/miss counters per cache tier, for sizing L1, and how often
+    get_or_compute avoided a recomputation.
+    
+    Returns:
+        dict: L1 and L2 hits and misses, the L1 size, capacity and whether it is active,
+        and the stampede protection counters
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    return {
+        "l1": {
+            "enabled": _l1_enabled(),
+            "hits": stats["l1_hits"],
+            "misses": stats["l1_misses"],
+            "size": len(_l1),
+            "maxsize": L1_CACHE_SIZE,
+        },
+        "l2": {
+            "available": redis_available(),
+            "circuit": breaker.state,
+            "hits": stats["l2_hits"],
+            "misses": stats["l2_misses"],
+        },
+        "stampede": {
+            "coalesced": stats["coalesced"],
+            "lock_waits": stats["lock_waits"],
+            "stale_served": stats["stale_served"],
+            "early_recomputes": stats["early_recomputes"],
+        },
+    }
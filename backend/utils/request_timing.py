@@ -0,0 +1,166 @@
+import os
+import json
+import time
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from utils import metrics
+
+# Per-request timing of the phases of a request, reported in a Server-Timing header
+# (visible in the browser's network tab) and as one JSON log line per request:
+# - auth: get_current_user (token check and user lookup)
+# - cache: Redis round trips
+# - db: SQL statements (including those run during auth)
+# - serialize: building and serializing the Pydantic response models
+# - compress: compressing the response body (see utils/compression.py)
+# - total: from the request until the response headers are sent
+# REQUEST_TIMING is checked per request; while it is off the hooks cost one
+# context variable lookup. The same timings feed the per-request metrics of
+# GET /metrics (latency by route, SQL statements and time), see utils/metrics.py.
+REQUEST_TIMING = os.getenv("REQUEST_TIMING", "false").lower() in ("1", "true", "yes")
+SERVER_TIMING_HEADER = "Server-Timing"
+
+logger = logging.getLogger("request_timing")
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+# phase -> [seconds, count] for the current request, None outside timed requests.
+# The dict is shared with threadpool code of the same request (context copies keep
+# the same object), so it is mutated in place rather than replaced.
+_timings: ContextVar[Optional[dict]] = ContextVar("request_timings", default=None)
+
+def record(phase: str, seconds: float):
+    """
+    Add time spent in a phase to the current request (no-op outside timed requests).
+
+    Args:
+        phase: Phase name, e.g. "db"
+        seconds: Time spent
+    """
+    timings = _timings.get()
+    if timings is None:
+        return
+    entry = timings.setdefault(phase, [0.0, 0])
+    entry[0] += seconds
+    entry[1] += 1
+
+@contextmanager
+def timed(phase: str):
+    """
+    Time the enclosed block as part of a phase; also usable as a decorator on sync functions.
+
+    Args:
+        phase: Phase name, e.g. "auth"
+    """
+    if _timings.get() is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(phase, time.perf_counter() - started)
+
+def instrument_engine(engine):
+    """
+    Record the time of every SQL statement run on a (sync) engine in the "db" phase.
+    For an async engine pass its sync_engine.
+
+    Args:
+        engine: SQLAlchemy Engine
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _timings.get() is not None:
+            conn.info.setdefault("request_timing_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("request_timing_started")
+        if started:
+            record("db", time.perf_counter() - started.pop())
+
+def format_server_timing(timings: dict, total: float) -> str:
+    """
+    Build the Server-Timing header value.
+
+    Args:
+        timings: phase -> [seconds, count]
+        total: Seconds since the request started
+
+    Returns:
+        str: e.g. 'auth;dur=1.20, db;dur=4.51;desc="3 calls", total;dur=7.02'
+    """
+    entries = []
+    for phase, (seconds, count) in timings.items():
+        entry = f"{phase};dur={seconds * 1000:.2f}"
+        if count > 1:
+            entry += f';desc="{count} calls"'
+        entries.append(entry)
+    entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
+
+class RequestTimingMiddleware:
+    """
+    ASGI middleware that collects the phase timings of each HTTP request. While
+    REQUEST_TIMING is on it adds them as a Server-Timing header and logs them;
+    while METRICS_ENABLED is on it records the request latency and SQL usage.
+    Written as plain ASGI (not BaseHTTPMiddleware) so it adds no extra task or
+    body buffering, and the timings context is the request's own.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        report = REQUEST_TIMING
+        if scope["type"] != "http" or not (report or metrics.METRICS_ENABLED):
+            await self.app(scope, receive, send)
+            return
+
+        timings = {}
+        token = _timings.set(timings)
+        started = time.perf_counter()
+        status = None
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            if message["type"] == "http.response.start" and report:
+                total = time.perf_counter() - started
+                headers = list(message.get("headers", []))
+                headers.append((SERVER_TIMING_HEADER.lower().encode(), format_server_timing(timings, total).encode()))
+                message = {**message, "headers": headers}
+                logger.info(json.dumps({
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status,
+                    "total_ms": round(total * 1000, 2),
+                    **{f"{phase}_ms": round(seconds * 1000, 2) for phase, (seconds, _) in timings.items()},
+                    **{f"{phase}_count": count for phase, (_, count) in timings.items()},
+                }))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _timings.reset(token)
+            if metrics.METRICS_ENABLED:
+                self._observe(scope, status, time.perf_counter() - started, timings)
+
+    @staticmethod
+    def _observe(scope, status, duration: float, timings: dict):
+        # Route templates ("/elderly/{elderly_id}") keep the label count bounded
+        route = scope.get("route")
+        route = getattr(route, "path", None) or "unmatched"
+        metrics.http_request_duration.labels(scope["method"], route, status or 500).observe(duration)
+        db_seconds, db_count = timings.get("db", (0.0, 0))
+        metrics.db_queries_per_request.labels(route).observe(db_count)
+        metrics.db_time_per_request.labels(route).observe(db_seconds)
@@ -0,0 +1,128 @@
+import json
+import orjson
+
+# Cache value codec: a serializer plus optional compression for values larger than
+# a threshold. Every encoded value starts with a two-byte header naming its format
+# and compression, so values written with another configuration (e.g. by workers
+# that are still running the previous settings) can always be read.
+# Values that already are bytes (e.g. pre-serialized JSON response bodies) are
+# stored as they are, only compressed.
+#
+# msgpack, zstandard and lz4 are optional; they are imported when first used.
+
+def _json_dumps(value) -> bytes:
+    return json.dumps(value, separators=(",", ":")).encode()
+
+def _msgpack_dumps(value) -> bytes:
+    import msgpack
+    return msgpack.packb(value, use_bin_type=True)
+
+def _msgpack_loads(data: bytes):
+    import msgpack
+    return msgpack.unpackb(data, raw=False)
+
+# name -> (header byte, dumps, loads)
+SERIALIZERS = {
+    "json": (b"j", _json_dumps, json.loads),
+    "orjson": (b"o", orjson.dumps, orjson.loads),
+    "msgpack": (b"m", _msgpack_dumps, _msgpack_loads),
+}
+_RAW = b"b"  # Header byte of bytes values
+
+def _zstd_compress(data: bytes) -> bytes:
+    import zstandard
+    return zstandard.ZstdCompressor(level=3).compress(data)
+
+def _zstd_decompress(data: bytes) -> bytes:
+    import zstandard
+    return zstandard.ZstdDecompressor().decompress(data)
+
+def _lz4_compress(data: bytes) -> bytes:
+    import lz4.frame
+    return lz4.frame.compress(data)
+
+def _lz4_decompress(data: bytes) -> bytes:
+    import lz4.frame
+    return lz4.frame.decompress(data)
+
+# name -> (header byte, compress, decompress)
+COMPRESSORS = {
+    "none": (b"-", None, None),
+    "zstd": (b"z", _zstd_compress, _zstd_decompress),
+    "lz4": (b"l", _lz4_compress, _lz4_decompress),
+}
+
+_loads_by_header = {header: loads for header, _, loads in SERIALIZERS.values()}
+_decompress_by_header = {header: decompress for header, _, decompress in COMPRESSORS.values()}
+
+class Codec:
+    """
+    Turns cache values into bytes and back.
+
+    Args:
+        serializer: "orjson", "msgpack" or "json"
+        compression: "none", "zstd" or "lz4"
+        compress_min_bytes: Values smaller than this are stored uncompressed
+
+    Raises:
+        ValueError: If the serializer or compression is unknown, or its package is not installed
+    """
+
+    def __init__(self, serializer: str = "orjson", compression: str = "none", compress_min_bytes: int = 16384):
+        if serializer not in SERIALIZERS:
+            raise ValueError(f"Unknown cache serializer: {serializer}")
+        if compression not in COMPRESSORS:
+            raise ValueError(f"Unknown cache compression: {compression}")
+        self.serializer = serializer
+        self.compression = compression
+        self.compress_min_bytes = compress_min_bytes
+        self._header, self._dumps, _ = SERIALIZERS[serializer]
+        self._compression_header, self._compress, _ = COMPRESSORS[compression]
+        # Fail at startup rather than on the first cache write
+        try:
+            self.decode(self.encode({"check": [1]}))
+            if self._compress:
+                self._compress(b"check")
+        except ImportError as e:
+            raise ValueError(f"Cache {serializer}/{compression} needs a missing package: {e.name}")
+
+    def encode(self, value) -> bytes:
+        """
+        Serialize (and, above the threshold, compress) a value.
+
+        Args:
+            value: A JSON-compatible object, or bytes
+
+        Returns:
+            bytes: The header followed by the payload
+        """
+        if isinstance(value, (bytes, bytearray)):
+            header, data = _RAW, bytes(value)
+        else:
+            header, data = self._header, self._dumps(value)
+        if self._compress and len(data) >= self.compress_min_bytes:
+            return header + self._compression_header + self._compress(data)
+        return header + b"-" + data
+
+    def decode(self, data: bytes):
+        """
+        Read a value written by any Codec.
+
+        Args:
+            data: Bytes returned by encode
+
+        Returns:
+            The original value
+
+        Raises:
+            ValueError: If the data is not an encoded value
+        """
+        header, compression, payload = data[:1], data[1:2], data[2:]
+        if compression not in _decompress_by_header or (header != _RAW and header not in _loads_by_header):
+            raise ValueError("Not an encoded cache value")
+        decompress = _decompress_by_header[compression]
+        if decompress:
+            payload = decompress(payload)
+        if header == _RAW:
+            return payload
+        return _loads_by_header[header](payload)
@@ -0,0 +1,56 @@
+import io
+import zipfile
+
+class _ChunkBuffer(io.RawIOBase):
+    """Write-only, unseekable file that hands out what was written since the last read."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ZipStream:
+    """
+    Build a ZIP archive incrementally so it can be streamed while it is being built.
+    Because the output is not seekable, sizes and CRCs are written after each
+    file's data (data descriptors), which every ZIP reader supports.
+    """
+
+    def __init__(self, compression: int = zipfile.ZIP_STORED):
+        self._buffer = _ChunkBuffer()
+        self._zip = zipfile.ZipFile(self._buffer, mode="w", compression=compression)
+
+    def add(self, name: str, data: bytes) -> bytes:
+        """
+        Add one file to the archive.
+
+        Args:
+            name: File name inside the archive
+            data: File content
+
+        Returns:
+            bytes: Archive bytes produced so far (send them to the client)
+        """
+        self._zip.writestr(name, data)
+        return self._buffer.take()
+
+    def close(self) -> bytes:
+        """
+        Finish the archive.
+
+        Returns:
+            bytes: The remaining archive bytes (the central directory)
+        """
+        self._zip.close()
+        return self._buffer.take()
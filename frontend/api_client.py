@@ -45,12 +45,39 @@ def get_auth_headers():
 def fetch_data(endpoint):
     """
     Fetch data from the API for the given endpoint with authentication.
+    Responses are kept in the session with their ETag, so on reruns the API
+    answers 304 Not Modified while the data is unchanged and the kept copy is used.
     """
     try:
         headers = get_auth_headers()
+        etag_cache = st.session_state.setdefault("etag_cache", {})
+        cached = etag_cache.get(endpoint)
+        if cached:
+            headers["If-None-Match"] = cached[0]
         response = requests.get(f"{BASE_URL}/{endpoint}", headers=headers)
+        if response.status_code == 304 and cached:
+            return cached[1]
         response.raise_for_status()
-        return response.json()
+        data = response.json()
+        if "ETag" in response.headers:
+            etag_cache[endpoint] = (response.headers["ETag"], data)
+        return data
+    except requests.exceptions.RequestException as e:
+        raise RuntimeError(f"Error fetching data from {endpoint}: {e}")
+
+def fetch_page(endpoint, limit, cursor=None):
+    """
+    Fetch one page of a list endpoint with authentication.
+    Returns the page data and the cursor of the next page (None on the last page).
+    """
+    try:
+        headers = get_auth_headers()
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        response = requests.get(f"{BASE_URL}/{endpoint}", headers=headers, params=params)
+        response.raise_for_status()
+        return response.json(), response.headers.get("X-Next-Cursor")
     except requests.exceptions.RequestException as e:
         raise RuntimeError(f"Error fetching data from {endpoint}: {e}")
 
@@ -1,5 +1,16 @@
 import streamlit as st
-from api_client import fetch_data
+from api_client import fetch_data, fetch_page
+
+PAGE_SIZE = 20  # Profiles downloaded per page
+
+def load_next_page():
+    """
+    Download the next page of profiles and append it to the ones already shown.
+    """
+    state = st.session_state["view_data"]
+    data, next_cursor = fetch_page(state["data_type"].lower(), PAGE_SIZE, state["cursor"])
+    state["entries"].extend(data)
+    state["cursor"] = next_cursor
 
 def view_data():
     st.subheader("📊 Elderly & Caregivers Overview")
@@ -45,8 +56,16 @@ def view_data():
     )
 
     if st.button("Show information"):
+        st.session_state["view_data"] = {"data_type": data_type, "entries": [], "cursor": None}
+        try:
+            load_next_page()
+        except RuntimeError as e:
+            st.error(str(e))
+
+    state = st.session_state.get("view_data")
+    if state and state["data_type"] == data_type:
         try:
-            data = fetch_data(data_type.lower())
+            data = state["entries"]
 
             if data_type == "Elderly":
                 st.write("### 🏡 Elderly List:")
@@ -136,5 +155,10 @@ def view_data():
                         total_bank = caregiver.get('total_bank', 'N/A')
                         st.markdown(f"#### 🏦 **Total Bank Balance:** {total_bank}")
 
+            # Only the next page is downloaded, not the whole collection
+            if state["cursor"] and st.button("Load more"):
+                load_next_page()
+                st.rerun()
+
         except RuntimeError as e:
             st.error(str(e))       
\ No newline at end of file